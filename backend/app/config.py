@@ -8,11 +8,37 @@ class Settings(BaseSettings):
 	APP_NAME: str = "Carp Connect Moderation API"
 	APP_VERSION: str = "0.1.0"
 	DEBUG: bool = os.getenv("DEBUG", "False") == "True"
+	# 起動時（uvicornのstartup/Lambdaの初回呼び出し）にクライアント作成などの初期化を済ませる
+	WARMUP_ON_STARTUP: bool = os.getenv("WARMUP_ON_STARTUP", "True") == "True"
+	# /metrics でPrometheus形式のメトリクス（処理段階ごとのレイテンシ・フォールバック回数など）を公開する（デフォルトは無効）
+	METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "False") == "True"
+	# 設定した場合、/metrics は Authorization: Bearer <METRICS_TOKEN> を付けたリクエストにだけ応答する
+	METRICS_TOKEN: str = os.getenv("METRICS_TOKEN", "")
+	# 処理時間の内訳（認証・LLM呼び出し・解析・DB書き込みのスパン）をServer-Timingヘッダーで返すリクエストの割合（0〜1、0で無効）
+	TRACING_SAMPLE_RATE: float = float(os.getenv("TRACING_SAMPLE_RATE", "0"))
+	# サンプリングしたリクエストのスパンを1行のJSONでログに出力する（TRACING_LOG_SLOW_MSミリ秒以上かかったものだけ）
+	TRACING_LOG_ENABLED: bool = os.getenv("TRACING_LOG_ENABLED", "False") == "True"
+	TRACING_LOG_SLOW_MS: float = float(os.getenv("TRACING_LOG_SLOW_MS", "0"))
+	# 実行中のプロセスをサンプリングしてCPU時間の使われ方を返す管理用エンドポイント（/api/admin/profile）
+	PROFILING_ENABLED: bool = os.getenv("PROFILING_ENABLED", "False") == "True"
+	# 1回のプロファイルの最大時間（秒）
+	PROFILING_MAX_SECONDS: float = float(os.getenv("PROFILING_MAX_SECONDS", "30"))
+	# 管理用エンドポイントの呼び出しに必要なBearerトークン（未設定の場合は管理用エンドポイントをすべて拒否する）
+	ADMIN_API_TOKEN: str = os.getenv("ADMIN_API_TOKEN", "")
 	
 	# AWS設定
 	AWS_REGION: str = os.getenv("AWS_REGION", "ap-northeast-1")
 	AWS_ACCESS_KEY_ID: str = os.getenv("AWS_ACCESS_KEY_ID", "")
 	AWS_SECRET_ACCESS_KEY: str = os.getenv("AWS_SECRET_ACCESS_KEY", "")
+	# AWSクライアント共通の接続設定（プロセス内で1つのクライアントを共有する）
+	# 接続プールの最大数（BEDROCK_MAX_CONCURRENCY/DYNAMODB_MAX_CONCURRENCYより小さい場合はそちらに合わせる）
+	AWS_MAX_POOL_CONNECTIONS: int = int(os.getenv("AWS_MAX_POOL_CONNECTIONS", "64"))
+	AWS_TCP_KEEPALIVE: bool = os.getenv("AWS_TCP_KEEPALIVE", "True") == "True"
+	AWS_CONNECT_TIMEOUT_SECONDS: float = float(os.getenv("AWS_CONNECT_TIMEOUT_SECONDS", "2"))
+	AWS_READ_TIMEOUT_SECONDS: float = float(os.getenv("AWS_READ_TIMEOUT_SECONDS", "10"))
+	# リトライ方式（adaptiveはスロットリング時にクライアント側で送信レートを抑える）と最大試行回数（初回を含む）
+	AWS_RETRY_MODE: str = os.getenv("AWS_RETRY_MODE", "adaptive")
+	AWS_MAX_ATTEMPTS: int = int(os.getenv("AWS_MAX_ATTEMPTS", "3"))
 	
 	# DynamoDB設定
 	DYNAMODB_USER_TABLE: str = os.getenv("DYNAMODB_USER_TABLE", "carp-connect-moderation-users")
@@ -20,9 +46,84 @@ class Settings(BaseSettings):
 	DYNAMODB_POST_TABLE: str = os.getenv("DYNAMODB_POST_TABLE", "carp-connect-moderation-posts")
 	DYNAMODB_COMMENT_TABLE: str = os.getenv("DYNAMODB_COMMENT_TABLE", "carp-connect-moderation-comments")
 	DYNAMODB_MODERATION_TABLE: str = os.getenv("DYNAMODB_MODERATION_TABLE", "carp-connect-moderation-moderation")
+	DYNAMODB_MODERATION_STATS_TABLE: str = os.getenv("DYNAMODB_MODERATION_STATS_TABLE", "carp-connect-moderation-moderation-stats")
+	# 履歴を新しい順に取得するためのGSI（日単位バケット + created_at）
+	DYNAMODB_MODERATION_HISTORY_INDEX: str = os.getenv("DYNAMODB_MODERATION_HISTORY_INDEX", "history-created_at-index")
+	# 履歴を遡る最大日数と、1ページで遡る最大バケット（日）数
+	MODERATION_HISTORY_RETENTION_DAYS: int = int(os.getenv("MODERATION_HISTORY_RETENTION_DAYS", "90"))
+	MODERATION_HISTORY_MAX_BUCKETS_PER_PAGE: int = int(os.getenv("MODERATION_HISTORY_MAX_BUCKETS_PER_PAGE", "31"))
+	MODERATION_HISTORY_MAX_LIMIT: int = int(os.getenv("MODERATION_HISTORY_MAX_LIMIT", "1000"))
+	# 集計カウンターのシャード数（書き込みが1項目に集中しないよう分散する。時間別ロールアップは分散しない）
+	MODERATION_STATS_SHARDS: int = int(os.getenv("MODERATION_STATS_SHARDS", "10"))
+	# 日別ロールアップの区切りに使うUTCからの時差（デフォルトは日本時間）
+	MODERATION_ROLLUP_UTC_OFFSET_HOURS: float = float(os.getenv("MODERATION_ROLLUP_UTC_OFFSET_HOURS", "9"))
+	# モックモードでメモリに保持する履歴の最大件数（古いものから上書き）
+	MOCK_HISTORY_CAPACITY: int = int(os.getenv("MOCK_HISTORY_CAPACITY", "100000"))
+	# AWSに接続せず、ローカル用のDynamoDB代替実装（キー/GSI/Query/一括操作に対応）を使う
+	DYNAMODB_USE_LOCAL_FAKE: bool = os.getenv("DYNAMODB_USE_LOCAL_FAKE", "False") == "True"
+	# ローカル用DynamoDBの1呼び出しあたりの遅延（ミリ秒）とスロットリング発生確率
+	DYNAMODB_FAKE_LATENCY_MS: float = float(os.getenv("DYNAMODB_FAKE_LATENCY_MS", "0"))
+	DYNAMODB_FAKE_THROTTLE_RATE: float = float(os.getenv("DYNAMODB_FAKE_THROTTLE_RATE", "0"))
+	# DynamoDB呼び出しを同時に実行できる最大数（専用スレッドプールのサイズ）
+	DYNAMODB_MAX_CONCURRENCY: int = int(os.getenv("DYNAMODB_MAX_CONCURRENCY", "32"))
+	# ライトビハインド（記録をキューに貯めてBatchWriteItemで書き込む。/checkがDynamoDBの往復を待たない）
+	WRITE_BEHIND_ENABLED: bool = os.getenv("WRITE_BEHIND_ENABLED", "False") == "True"
+	WRITE_BEHIND_FLUSH_INTERVAL_MS: float = float(os.getenv("WRITE_BEHIND_FLUSH_INTERVAL_MS", "200"))
+	WRITE_BEHIND_MAX_QUEUE: int = int(os.getenv("WRITE_BEHIND_MAX_QUEUE", "10000"))
+	WRITE_BEHIND_MAX_RETRIES: int = int(os.getenv("WRITE_BEHIND_MAX_RETRIES", "5"))
+	# 時系列統計で一度に返す最大バケット数
+	MODERATION_TIMESERIES_MAX_POINTS: int = int(os.getenv("MODERATION_TIMESERIES_MAX_POINTS", "1000"))
 	
 	# Bedrock設定
 	BEDROCK_MODEL_ID: str = os.getenv("BEDROCK_MODEL_ID", "anthropic.claude-v2")
+	# Bedrock呼び出しを同時に実行できる最大数（専用スレッドプールのサイズ）
+	BEDROCK_MAX_CONCURRENCY: int = int(os.getenv("BEDROCK_MAX_CONCURRENCY", "64"))
+	# Bedrockは応答生成に時間がかかるため読み取りタイムアウトを個別に設定する（秒）
+	BEDROCK_READ_TIMEOUT_SECONDS: float = float(os.getenv("BEDROCK_READ_TIMEOUT_SECONDS", "60"))
+	# invoke_model_with_response_streamで応答を受け取り、resultとscoreが揃った時点で判定を確定する
+	BEDROCK_STREAMING_ENABLED: bool = os.getenv("BEDROCK_STREAMING_ENABLED", "False") == "True"
+	# 判定確定後に残りの応答を受信せずストリームを閉じる（Falseの場合は読み切って接続を再利用する）
+	BEDROCK_STREAM_CANCEL_REMAINDER: bool = os.getenv("BEDROCK_STREAM_CANCEL_REMAINDER", "True") == "True"
+	
+	# 長文の分割判定（文の区切りで分割し、塊ごとに並行してLLMで判定する）
+	# 長文1件あたりのLLM呼び出しが増えるためオプトイン（無効でも入力の上限を超える分はMODERATION_OVERSIZE_STRATEGYに従う）
+	MODERATION_CHUNK_ENABLED: bool = os.getenv("MODERATION_CHUNK_ENABLED", "False") == "True"
+	# 1つの塊の最大文字数（これより長いコンテンツを分割する）
+	MODERATION_CHUNK_MAX_CHARS: int = int(os.getenv("MODERATION_CHUNK_MAX_CHARS", "800"))
+	# 1件のコンテンツについて同時に判定する塊の最大数
+	MODERATION_CHUNK_CONCURRENCY: int = int(os.getenv("MODERATION_CHUNK_CONCURRENCY", "4"))
+	# このスコア以下の拒否が出た時点で残りの塊の判定を打ち切る
+	MODERATION_CHUNK_REJECT_SCORE_THRESHOLD: float = float(os.getenv("MODERATION_CHUNK_REJECT_SCORE_THRESHOLD", "0.2"))
+	
+	# 1回のLLM呼び出しに渡すコンテンツの最大トークン数（概算）
+	MODERATION_MAX_INPUT_TOKENS: int = int(os.getenv("MODERATION_MAX_INPUT_TOKENS", "2000"))
+	# 最大トークン数を超えるコンテンツの扱い（chunk: 分割して判定する / truncate: 末尾を切り詰めて判定する）
+	MODERATION_OVERSIZE_STRATEGY: str = os.getenv("MODERATION_OVERSIZE_STRATEGY", "chunk")
+	
+	# モデレーション辞書（LLMの前段で判定するNGワード/定型フレーズ）
+	MODERATION_RULES_ENABLED: bool = os.getenv("MODERATION_RULES_ENABLED", "True") == "True"
+	MODERATION_RULES_PATH: str = os.getenv(
+		"MODERATION_RULES_PATH",
+		os.path.join(os.path.dirname(os.path.abspath(__file__)), "rules", "moderation_rules.tsv"),
+	)
+	# 辞書ファイルの更新を確認する間隔（秒）
+	MODERATION_RULES_RELOAD_INTERVAL_SECONDS: float = float(os.getenv("MODERATION_RULES_RELOAD_INTERVAL_SECONDS", "5"))
+	
+	# 判定キャッシュ設定（同一コンテンツの再投稿でLLMを呼ばない）
+	VERDICT_CACHE_ENABLED: bool = os.getenv("VERDICT_CACHE_ENABLED", "True") == "True"
+	VERDICT_CACHE_MAX_SIZE: int = int(os.getenv("VERDICT_CACHE_MAX_SIZE", "10000"))
+	VERDICT_CACHE_TTL_SECONDS: int = int(os.getenv("VERDICT_CACHE_TTL_SECONDS", "3600"))
+	
+	# 一括モデレーション設定
+	MODERATION_BATCH_MAX_ITEMS: int = int(os.getenv("MODERATION_BATCH_MAX_ITEMS", "500"))
+	# 短いコンテンツを1つのプロンプトにまとめて判定するか
+	BATCH_PACK_ENABLED: bool = os.getenv("BATCH_PACK_ENABLED", "False") == "True"
+	BATCH_PACK_SIZE: int = int(os.getenv("BATCH_PACK_SIZE", "10"))
+	BATCH_PACK_MAX_CHARS: int = int(os.getenv("BATCH_PACK_MAX_CHARS", "200"))
+	# 同時に届いた/checkを時間窓でまとめて1プロンプトで判定するか（BATCH_PACK_MAX_CHARS以下の短文のみ対象）
+	MICRO_BATCH_ENABLED: bool = os.getenv("MICRO_BATCH_ENABLED", "False") == "True"
+	MICRO_BATCH_WINDOW_MS: int = int(os.getenv("MICRO_BATCH_WINDOW_MS", "20"))
+	MICRO_BATCH_MAX_SIZE: int = int(os.getenv("MICRO_BATCH_MAX_SIZE", "10"))
 	
 	# CORS設定（カンマ区切りの文字列 or JSON配列の両方対応）
 	CORS_ORIGINS: List[str] = ["*"]
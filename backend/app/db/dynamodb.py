@@ -1,51 +1,804 @@
-from typing import Any, Dict, List, Optional
-from ...config import settings
+import bisect
+import importlib.util
+import random
+import re
+import threading
+import time
+import zlib
+from decimal import Decimal
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from ..config import settings
 
-try:
-    import boto3  # type: ignore
-except Exception:  # pragma: no cover
-    boto3 = None  # type: ignore
 
+# ---------------------------------------------------------------------------
+# ローカル用のDynamoDB代替実装
+# テーブルのキー/GSI、Query、ページング、一括読み書き、遅延・スロットリングを再現し、
+# AWSに接続せずにリポジトリの性能を計測できるようにする
+# ---------------------------------------------------------------------------
 
-_in_memory_store: List[Dict[str, Any]] = []
 
+class FakeThrottlingError(Exception):
+    """botocoreが無い環境で使うスロットリング例外"""
 
-class FakeDynamoDBClient:
-    def put_item(self, TableName: str, Item: Dict[str, Any]) -> None:
-        _in_memory_store.append(Item)
 
-    def scan(
+def _throttling_error(operation: str) -> Exception:
+    message = "The level of configured provisioned throughput for the table was exceeded."
+    try:
+        from botocore.exceptions import ClientError
+    except ImportError:
+        return FakeThrottlingError(message)
+    return ClientError(
+        {"Error": {"Code": "ProvisionedThroughputExceededException", "Message": message}},
+        operation,
+    )
+
+
+class FakeTransactionCanceledError(Exception):
+    """botocoreが無い環境で使う、TransactWriteItemsの条件を満たさなかった場合の例外"""
+
+    def __init__(self, message: str, reasons: List[str]):
+        super().__init__(message)
+        self.response = _transaction_canceled_response(message, reasons)
+
+
+def _transaction_canceled_response(message: str, reasons: List[str]) -> Dict[str, Any]:
+    return {
+        "Error": {"Code": "TransactionCanceledException", "Message": message},
+        "CancellationReasons": [{"Code": reason} for reason in reasons],
+    }
+
+
+def _transaction_canceled_error(reasons: List[str]) -> Exception:
+    message = f"Transaction cancelled, please refer cancellation reasons for specific reasons [{', '.join(reasons)}]"
+    try:
+        from botocore.exceptions import ClientError
+    except ImportError:
+        return FakeTransactionCanceledError(message, reasons)
+    return ClientError(_transaction_canceled_response(message, reasons), "TransactWriteItems")
+
+
+def serialize_value(value: Any) -> Dict[str, Any]:
+    """
+    Pythonの値をDynamoDBの型付き値（{"S": ...}など）に変換します。
+    """
+    if value is None:
+        return {"NULL": True}
+    if isinstance(value, bool):
+        return {"BOOL": value}
+    if isinstance(value, (int, Decimal)):
+        return {"N": str(value)}
+    if isinstance(value, float):
+        raise TypeError("Float types are not supported. Use Decimal types instead.")
+    if isinstance(value, str):
+        return {"S": value}
+    if isinstance(value, bytes):
+        return {"B": value}
+    if isinstance(value, dict):
+        return {"M": {k: serialize_value(v) for k, v in value.items()}}
+    if isinstance(value, (list, tuple)):
+        return {"L": [serialize_value(v) for v in value]}
+    if isinstance(value, set):
+        if all(isinstance(v, str) for v in value):
+            return {"SS": sorted(value)}
+        return {"NS": sorted(str(v) for v in value)}
+    raise TypeError(f"Unsupported type: {type(value).__name__}")
+
+
+def deserialize_value(value: Dict[str, Any]) -> Any:
+    """
+    DynamoDBの型付き値をPythonの値に変換します（数値はDecimal）。
+    """
+    (kind, raw), = value.items()
+    if kind == "NULL":
+        return None
+    if kind in ("S", "B", "BOOL"):
+        return raw
+    if kind == "N":
+        return Decimal(raw)
+    if kind == "M":
+        return {k: deserialize_value(v) for k, v in raw.items()}
+    if kind == "L":
+        return [deserialize_value(v) for v in raw]
+    if kind == "SS":
+        return set(raw)
+    if kind == "NS":
+        return {Decimal(v) for v in raw}
+    raise TypeError(f"Unsupported attribute type: {kind}")
+
+
+def _serialize_item(item: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: serialize_value(v) for k, v in item.items()}
+
+
+def _deserialize_item(item: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: deserialize_value(v) for k, v in item.items()}
+
+
+def _normalize_native(value: Any) -> Any:
+    # 型変換を1往復させ、boto3のresourceと同じ制約（float不可・数値はDecimal）を再現する
+    return deserialize_value(serialize_value(value))
+
+
+_CONDITION_RE = re.compile(
+    r"^\s*(?:"
+    r"begins_with\s*\(\s*(?P<bw_name>[#\w.]+)\s*,\s*(?P<bw_value>:\w+)\s*\)"
+    r"|attribute_(?P<exists>not_exists|exists)\s*\(\s*(?P<ex_name>[#\w.]+)\s*\)"
+    r"|(?P<bt_name>[#\w.]+)\s+BETWEEN\s+(?P<bt_low>:\w+)\s+AND\s+(?P<bt_high>:\w+)"
+    r"|(?P<name>[#\w.]+)\s*(?P<op>=|<>|<=|>=|<|>)\s*(?P<value>:\w+)"
+    r")\s*$",
+    re.IGNORECASE,
+)
+
+
+def _split_and(expression: str) -> List[str]:
+    """
+    AND区切りの条件を分割します（BETWEEN ... AND ... の中のANDは分割しない）。
+    """
+    parts: List[str] = []
+    tokens = re.split(r"\s+AND\s+", expression.strip(), flags=re.IGNORECASE)
+    index = 0
+    while index < len(tokens):
+        token = tokens[index]
+        if re.search(r"\sBETWEEN\s", f" {token} ", re.IGNORECASE) and index + 1 < len(tokens):
+            token = f"{token} AND {tokens[index + 1]}"
+            index += 1
+        parts.append(token)
+        index += 1
+    return parts
+
+
+class _Condition:
+    """
+    Key条件式・フィルター式の単純なサブセット（=, <, <=, >, >=, <>, BETWEEN, begins_with, attribute_(not_)exists のAND結合）。
+    """
+
+    def __init__(self, expression: str, names: Dict[str, str], values: Dict[str, Any]):
+        self.clauses: List[Tuple[str, str, List[Any]]] = []
+        for part in _split_and(expression):
+            match = _CONDITION_RE.match(part)
+            if not match:
+                raise ValueError(f"Unsupported expression: {part}")
+            if match.group("bw_name"):
+                self.clauses.append((
+                    _resolve_name(match.group("bw_name"), names), "begins_with",
+                    [values[match.group("bw_value")]],
+                ))
+            elif match.group("ex_name"):
+                self.clauses.append((
+                    _resolve_name(match.group("ex_name"), names), match.group("exists").lower(), [],
+                ))
+            elif match.group("bt_name"):
+                self.clauses.append((
+                    _resolve_name(match.group("bt_name"), names), "between",
+                    [values[match.group("bt_low")], values[match.group("bt_high")]],
+                ))
+            else:
+                self.clauses.append((
+                    _resolve_name(match.group("name"), names), match.group("op"),
+                    [values[match.group("value")]],
+                ))
+
+    def value_for(self, attribute: str, op: str = "=") -> Any:
+        for name, clause_op, operands in self.clauses:
+            if name == attribute and clause_op == op:
+                return operands[0]
+        return None
+
+    def matches(self, item: Dict[str, Any]) -> bool:
+        for name, op, operands in self.clauses:
+            if op == "exists":
+                if name not in item:
+                    return False
+                continue
+            if op == "not_exists":
+                if name in item:
+                    return False
+                continue
+            if name not in item:
+                return False
+            value = item[name]
+            try:
+                if op == "=" and not value == operands[0]:
+                    return False
+                if op == "<>" and not value != operands[0]:
+                    return False
+                if op == "<" and not value < operands[0]:
+                    return False
+                if op == "<=" and not value <= operands[0]:
+                    return False
+                if op == ">" and not value > operands[0]:
+                    return False
+                if op == ">=" and not value >= operands[0]:
+                    return False
+                if op == "between" and not operands[0] <= value <= operands[1]:
+                    return False
+                if op == "begins_with" and not str(value).startswith(str(operands[0])):
+                    return False
+            except TypeError:
+                return False
+        return True
+
+
+def _resolve_name(name: str, names: Dict[str, str]) -> str:
+    return names.get(name, name) if name.startswith("#") else name
+
+
+def _apply_update(item: Dict[str, Any], expression: str, names: Dict[str, str], values: Dict[str, Any]) -> None:
+    """
+    UpdateExpressionのSET/ADD/REMOVE句を適用します。
+    """
+    clauses = re.split(r"\b(SET|ADD|REMOVE)\b", expression, flags=re.IGNORECASE)
+    action = None
+    for chunk in clauses:
+        upper = chunk.strip().upper()
+        if upper in ("SET", "ADD", "REMOVE"):
+            action = upper
+            continue
+        if not chunk.strip() or action is None:
+            continue
+        for assignment in chunk.split(","):
+            assignment = assignment.strip()
+            if not assignment:
+                continue
+            if action == "SET":
+                name, value = [p.strip() for p in assignment.split("=", 1)]
+                item[_resolve_name(name, names)] = values[value]
+            elif action == "ADD":
+                name, value = assignment.split()
+                name = _resolve_name(name, names)
+                delta = values[value]
+                if isinstance(delta, set):
+                    item[name] = set(item.get(name, set())) | delta
+                else:
+                    item[name] = Decimal(item.get(name, 0)) + Decimal(delta)
+            else:
+                item.pop(_resolve_name(assignment, names), None)
+
+
+def _project(item: Dict[str, Any], projection: Optional[str], names: Dict[str, str]) -> Dict[str, Any]:
+    if not projection:
+        return dict(item)
+    wanted = [_resolve_name(p.strip(), names) for p in projection.split(",")]
+    return {k: item[k] for k in wanted if k in item}
+
+
+class FakeTableSchema:
+    def __init__(
+        self,
+        name: str,
+        hash_key: str,
+        range_key: Optional[str] = None,
+        indexes: Optional[Dict[str, Tuple[str, Optional[str]]]] = None,
+    ):
+        self.name = name
+        self.hash_key = hash_key
+        self.range_key = range_key
+        self.indexes = indexes or {}
+
+    def key_attributes(self, index_name: Optional[str] = None) -> Tuple[str, Optional[str]]:
+        if index_name is None:
+            return self.hash_key, self.range_key
+        if index_name not in self.indexes:
+            raise ValueError(f"The table does not have the specified index: {index_name}")
+        return self.indexes[index_name]
+
+
+class FakeDynamoDBBackend:
+    """
+    複数のクライアント/リソースで共有するインメモリのテーブル群。
+    latency_msで1呼び出しごとの遅延（スレッドをブロック）、throttle_rateでスロットリングの発生確率を指定します。
+    """
+
+    def __init__(self, latency_ms: float = 0.0, throttle_rate: float = 0.0, seed: Optional[int] = None):
+        self.latency_ms = latency_ms
+        self.throttle_rate = throttle_rate
+        self._random = random.Random(seed)
+        self._lock = threading.RLock()
+        self._schemas: Dict[str, FakeTableSchema] = {}
+        self._items: Dict[str, Dict[Tuple[Any, Any], Dict[str, Any]]] = {}
+        self.call_counts: Dict[str, int] = {}
+
+    # --- テーブル定義 ---
+
+    def create_table(
+        self,
+        name: str,
+        hash_key: str,
+        range_key: Optional[str] = None,
+        indexes: Optional[Dict[str, Tuple[str, Optional[str]]]] = None,
+    ) -> None:
+        with self._lock:
+            self._schemas[name] = FakeTableSchema(name, hash_key, range_key, indexes)
+            self._items.setdefault(name, {})
+
+    def create_moderation_tables(self) -> None:
+        """
+        アプリケーションが使うテーブル（terraformのdynamodbモジュールと同じキー構成）を作成します。
+        """
+        self.create_table(
+            settings.DYNAMODB_MODERATION_TABLE,
+            "moderation_id",
+            indexes={settings.DYNAMODB_MODERATION_HISTORY_INDEX: ("history_bucket", "created_at")},
+        )
+        self.create_table(settings.DYNAMODB_MODERATION_STATS_TABLE, "stat_key", "bucket")
+        for name, key in (
+            (settings.DYNAMODB_USER_TABLE, "user_id"),
+            (settings.DYNAMODB_BOARD_TABLE, "board_id"),
+            (settings.DYNAMODB_POST_TABLE, "post_id"),
+            (settings.DYNAMODB_COMMENT_TABLE, "comment_id"),
+        ):
+            self.create_table(name, key)
+
+    def schema(self, table: str) -> FakeTableSchema:
+        if table not in self._schemas:
+            raise ValueError(f"Requested resource not found: Table: {table} not found")
+        return self._schemas[table]
+
+    def table_items(self, table: str) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [dict(item) for item in self._items.get(table, {}).values()]
+
+    # --- 遅延とスロットリング ---
+
+    def _begin(self, operation: str, throttle: bool = True) -> None:
+        with self._lock:
+            self.call_counts[operation] = self.call_counts.get(operation, 0) + 1
+        if self.latency_ms > 0:
+            time.sleep(self.latency_ms / 1000.0)
+        if throttle and self._should_throttle():
+            raise _throttling_error(operation)
+
+    def _should_throttle(self) -> bool:
+        if self.throttle_rate <= 0:
+            return False
+        with self._lock:
+            return self._random.random() < self.throttle_rate
+
+    # --- キー操作 ---
+
+    def _primary_key(self, table: str, item: Dict[str, Any]) -> Tuple[Any, Any]:
+        schema = self.schema(table)
+        if schema.hash_key not in item or (schema.range_key and schema.range_key not in item):
+            raise ValueError("One of the required keys was not given a value")
+        return item[schema.hash_key], item.get(schema.range_key) if schema.range_key else None
+
+    def _key_of(self, table: str, item: Dict[str, Any], index_name: Optional[str] = None) -> Dict[str, Any]:
+        schema = self.schema(table)
+        attributes = [schema.hash_key, schema.range_key]
+        if index_name:
+            attributes.extend(schema.key_attributes(index_name))
+        return {a: item[a] for a in attributes if a and a in item}
+
+    # --- 単一項目の操作 ---
+
+    def put_item(self, table: str, item: Dict[str, Any]) -> None:
+        self._begin("PutItem")
+        self._put(table, item)
+
+    def _put(self, table: str, item: Dict[str, Any]) -> None:
+        item = {k: _normalize_native(v) for k, v in item.items()}
+        with self._lock:
+            self._items[table][self._primary_key(table, item)] = item
+
+    def get_item(self, table: str, key: Dict[str, Any], projection: Optional[str] = None,
+                 names: Optional[Dict[str, str]] = None) -> Optional[Dict[str, Any]]:
+        self._begin("GetItem")
+        return self._get(table, key, projection, names or {})
+
+    def _get(self, table: str, key: Dict[str, Any], projection: Optional[str],
+             names: Dict[str, str]) -> Optional[Dict[str, Any]]:
+        key = {k: _normalize_native(v) for k, v in key.items()}
+        with self._lock:
+            item = self._items[table].get(self._primary_key(table, key))
+            return _project(item, projection, names) if item is not None else None
+
+    def delete_item(self, table: str, key: Dict[str, Any]) -> None:
+        self._begin("DeleteItem")
+        key = {k: _normalize_native(v) for k, v in key.items()}
+        with self._lock:
+            self._items[table].pop(self._primary_key(table, key), None)
+
+    def update_item(self, table: str, key: Dict[str, Any], expression: str,
+                    names: Dict[str, str], values: Dict[str, Any]) -> Dict[str, Any]:
+        self._begin("UpdateItem")
+        key = {k: _normalize_native(v) for k, v in key.items()}
+        values = {k: _normalize_native(v) for k, v in values.items()}
+        with self._lock:
+            primary_key = self._primary_key(table, key)
+            item = dict(self._items[table].get(primary_key, key))
+            _apply_update(item, expression, names, values)
+            self._items[table][primary_key] = item
+            return dict(item)
+
+    def transact_write(self, transact_items: List[Dict[str, Any]]) -> None:
+        """
+        TransactWriteItemsのConditionCheck/Updateを原子的に適用します。
+        条件を満たさない操作が1つでもあれば何も書き込まず、TransactionCanceledExceptionを送出します。
+        """
+        if len(transact_items) > 100:
+            raise ValueError("Member must have length less than or equal to 100")
+        self._begin("TransactWriteItems")
+        with self._lock:
+            reasons: List[str] = []
+            updates: List[Tuple[str, Tuple[Any, Any], Dict[str, Any]]] = []
+            for entry in transact_items:
+                (action, params), = entry.items()
+                if action not in ("ConditionCheck", "Update"):
+                    raise ValueError(f"Unsupported transaction action: {action}")
+                table = params["TableName"]
+                key = {k: _normalize_native(v) for k, v in params["Key"].items()}
+                names = params.get("ExpressionAttributeNames", {})
+                values = {k: _normalize_native(v) for k, v in params.get("ExpressionAttributeValues", {}).items()}
+                primary_key = self._primary_key(table, key)
+                current = self._items[table].get(primary_key)
+                condition = params.get("ConditionExpression")
+                if condition and not _Condition(condition, names, values).matches(current or {}):
+                    reasons.append("ConditionalCheckFailed")
+                    continue
+                reasons.append("None")
+                if action == "Update":
+                    item = dict(current or key)
+                    _apply_update(item, params["UpdateExpression"], names, values)
+                    updates.append((table, primary_key, item))
+            if any(reason != "None" for reason in reasons):
+                raise _transaction_canceled_error(reasons)
+            for table, primary_key, item in updates:
+                self._items[table][primary_key] = item
+
+    # --- 一括操作 ---
+
+    def batch_write(self, request_items: Dict[str, List[Dict[str, Any]]]) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        PutRequest/DeleteRequestを適用し、スロットリングで処理されなかったものを返します。
+        """
+        total = sum(len(requests) for requests in request_items.values())
+        if total > 25:
+            raise ValueError("Too many items requested for the BatchWriteItem call")
+        self._begin("BatchWriteItem", throttle=False)
+        unprocessed: Dict[str, List[Dict[str, Any]]] = {}
+        for table, requests in request_items.items():
+            for request in requests:
+                if self._should_throttle():
+                    unprocessed.setdefault(table, []).append(request)
+                    continue
+                if "PutRequest" in request:
+                    self._put(table, request["PutRequest"]["Item"])
+                else:
+                    key = {k: _normalize_native(v) for k, v in request["DeleteRequest"]["Key"].items()}
+                    with self._lock:
+                        self._items[table].pop(self._primary_key(table, key), None)
+        return unprocessed
+
+    def batch_get(self, request_items: Dict[str, Dict[str, Any]]) -> Tuple[Dict[str, List[Dict[str, Any]]], Dict[str, Dict[str, Any]]]:
+        total = sum(len(request["Keys"]) for request in request_items.values())
+        if total > 100:
+            raise ValueError("Too many items requested for the BatchGetItem call")
+        self._begin("BatchGetItem", throttle=False)
+        responses: Dict[str, List[Dict[str, Any]]] = {}
+        unprocessed: Dict[str, Dict[str, Any]] = {}
+        for table, request in request_items.items():
+            names = request.get("ExpressionAttributeNames", {})
+            responses.setdefault(table, [])
+            for key in request["Keys"]:
+                if self._should_throttle():
+                    unprocessed.setdefault(table, {**request, "Keys": []})["Keys"].append(key)
+                    continue
+                item = self._get(table, key, request.get("ProjectionExpression"), names)
+                if item is not None:
+                    responses[table].append(item)
+        return responses, unprocessed
+
+    # --- 検索 ---
+
+    def query(self, table: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        self._begin("Query")
+        names = params.get("ExpressionAttributeNames", {})
+        values = {k: _normalize_native(v) for k, v in params.get("ExpressionAttributeValues", {}).items()}
+        index_name = params.get("IndexName")
+        hash_key, range_key = self.schema(table).key_attributes(index_name)
+        key_condition = _Condition(params["KeyConditionExpression"], names, values)
+        if key_condition.value_for(hash_key) is None:
+            raise ValueError("Query condition missed key schema element: " + hash_key)
+        filter_condition = (
+            _Condition(params["FilterExpression"], names, values) if params.get("FilterExpression") else None
+        )
+
+        with self._lock:
+            candidates = [
+                item for item in self._items[table].values()
+                if hash_key in item and (range_key is None or range_key in item) and key_condition.matches(item)
+            ]
+        primary_hash, primary_range = self.schema(table).key_attributes()
+
+        def sort_key(it: Dict[str, Any]) -> Tuple[Any, Any, Any]:
+            return (it.get(range_key) if range_key else 0, it[primary_hash], it.get(primary_range) if primary_range else 0)
+
+        descending = not params.get("ScanIndexForward", True)
+        candidates.sort(key=sort_key, reverse=descending)
+        return self._paginate(table, candidates, params, filter_condition, names, index_name, sort_key, descending)
+
+    def scan(self, table: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        self._begin("Scan")
+        names = params.get("ExpressionAttributeNames", {})
+        values = {k: _normalize_native(v) for k, v in params.get("ExpressionAttributeValues", {}).items()}
+        filter_condition = (
+            _Condition(params["FilterExpression"], names, values) if params.get("FilterExpression") else None
+        )
+        index_name = params.get("IndexName")
+        with self._lock:
+            candidates = list(self._items[table].values())
+        if index_name:
+            index_hash, index_range = self.schema(table).key_attributes(index_name)
+            candidates = [it for it in candidates if index_hash in it and (index_range is None or index_range in it)]
+        # 並列スキャン: 主キーのハッシュでセグメントに振り分ける
+        total_segments = params.get("TotalSegments")
+        if total_segments:
+            segment = params["Segment"]
+            candidates = [
+                it for it in candidates
+                if zlib.crc32(repr(self._primary_key(table, it)).encode("utf-8")) % total_segments == segment
+            ]
+
+        def sort_key(it: Dict[str, Any]) -> Tuple[int, str]:
+            primary = repr(self._primary_key(table, it))
+            return zlib.crc32(primary.encode("utf-8")), primary
+
+        candidates.sort(key=sort_key)
+        return self._paginate(table, candidates, params, filter_condition, names, index_name, sort_key, False)
+
+    def _paginate(
         self,
-        TableName: str,
-        Limit: Optional[int] = None,
-        Select: Optional[str] = None,
-        FilterExpression: Optional[str] = None,
-        ExpressionAttributeValues: Optional[Dict[str, Any]] = None,
+        table: str,
+        candidates: List[Dict[str, Any]],
+        params: Dict[str, Any],
+        filter_condition: Optional[_Condition],
+        names: Dict[str, str],
+        index_name: Optional[str],
+        sort_key: Callable[[Dict[str, Any]], Any],
+        descending: bool,
     ) -> Dict[str, Any]:
-        items = list(_in_memory_store)
+        start_key = params.get("ExclusiveStartKey")
+        if start_key:
+            # 開始キーの項目が削除されていても、並び順でその次に来る項目から再開する（DynamoDBと同じ）
+            start = sort_key({k: _normalize_native(v) for k, v in start_key.items()})
+            keys = [sort_key(item) for item in candidates]
+            if descending:
+                keys.reverse()
+                position = len(keys) - bisect.bisect_left(keys, start)
+            else:
+                position = bisect.bisect_right(keys, start)
+            candidates = candidates[position:]
+
+        # Limitはフィルター適用前の評価件数に対して効く（DynamoDBと同じ）
+        limit = params.get("Limit")
+        evaluated = candidates[:limit] if limit else candidates
+        last_key = None
+        if limit and len(candidates) > limit:
+            last_key = self._key_of(table, evaluated[-1], index_name)
+        matched = [it for it in evaluated if filter_condition is None or filter_condition.matches(it)]
+
+        response: Dict[str, Any] = {"Count": len(matched), "ScannedCount": len(evaluated)}
+        if params.get("Select") != "COUNT":
+            response["Items"] = [_project(it, params.get("ProjectionExpression"), names) for it in matched]
+        if last_key:
+            response["LastEvaluatedKey"] = last_key
+        return response
+
+
+class FakeDynamoDBClient:
+    """
+    boto3のdynamodbクライアント（低レベルAPI、型付きの値）と同じ呼び出し形式のローカル実装。
+    """
+
+    def __init__(self, backend: Optional["FakeDynamoDBBackend"] = None):
+        self.backend = backend or get_fake_backend()
+
+    def put_item(self, TableName: str, Item: Dict[str, Any], **kwargs: Any) -> Dict[str, Any]:
+        self.backend.put_item(TableName, _deserialize_item(Item))
+        return {}
+
+    def get_item(self, TableName: str, Key: Dict[str, Any], **kwargs: Any) -> Dict[str, Any]:
+        item = self.backend.get_item(
+            TableName, _deserialize_item(Key),
+            kwargs.get("ProjectionExpression"), kwargs.get("ExpressionAttributeNames"),
+        )
+        return {"Item": _serialize_item(item)} if item is not None else {}
+
+    def delete_item(self, TableName: str, Key: Dict[str, Any], **kwargs: Any) -> Dict[str, Any]:
+        self.backend.delete_item(TableName, _deserialize_item(Key))
+        return {}
+
+    def update_item(self, TableName: str, Key: Dict[str, Any], UpdateExpression: str, **kwargs: Any) -> Dict[str, Any]:
+        item = self.backend.update_item(
+            TableName, _deserialize_item(Key), UpdateExpression,
+            kwargs.get("ExpressionAttributeNames", {}),
+            _deserialize_item(kwargs.get("ExpressionAttributeValues", {})),
+        )
+        return {"Attributes": _serialize_item(item)} if kwargs.get("ReturnValues") == "ALL_NEW" else {}
+
+    def batch_write_item(self, RequestItems: Dict[str, List[Dict[str, Any]]], **kwargs: Any) -> Dict[str, Any]:
+        native: Dict[str, List[Dict[str, Any]]] = {}
+        for table, requests in RequestItems.items():
+            for request in requests:
+                if "PutRequest" in request:
+                    native.setdefault(table, []).append({"PutRequest": {"Item": _deserialize_item(request["PutRequest"]["Item"])}})
+                else:
+                    native.setdefault(table, []).append({"DeleteRequest": {"Key": _deserialize_item(request["DeleteRequest"]["Key"])}})
+        unprocessed = self.backend.batch_write(native)
+        return {"UnprocessedItems": {
+            table: [
+                {"PutRequest": {"Item": _serialize_item(r["PutRequest"]["Item"])}} if "PutRequest" in r
+                else {"DeleteRequest": {"Key": _serialize_item(r["DeleteRequest"]["Key"])}}
+                for r in requests
+            ]
+            for table, requests in unprocessed.items()
+        }}
+
+    def batch_get_item(self, RequestItems: Dict[str, Dict[str, Any]], **kwargs: Any) -> Dict[str, Any]:
+        native = {
+            table: {**request, "Keys": [_deserialize_item(key) for key in request["Keys"]]}
+            for table, request in RequestItems.items()
+        }
+        responses, unprocessed = self.backend.batch_get(native)
+        return {
+            "Responses": {table: [_serialize_item(it) for it in items] for table, items in responses.items()},
+            "UnprocessedKeys": {
+                table: {**request, "Keys": [_serialize_item(key) for key in request["Keys"]]}
+                for table, request in unprocessed.items()
+            },
+        }
+
+    def transact_write_items(self, TransactItems: List[Dict[str, Any]], **kwargs: Any) -> Dict[str, Any]:
+        native = []
+        for entry in TransactItems:
+            (action, params), = entry.items()
+            params = {**params, "Key": _deserialize_item(params["Key"])}
+            if params.get("ExpressionAttributeValues"):
+                params["ExpressionAttributeValues"] = _deserialize_item(params["ExpressionAttributeValues"])
+            native.append({action: params})
+        self.backend.transact_write(native)
+        return {}
+
+    def query(self, TableName: str, **kwargs: Any) -> Dict[str, Any]:
+        return self._typed_response(self.backend.query(TableName, self._native_params(kwargs)))
+
+    def scan(self, TableName: str, **kwargs: Any) -> Dict[str, Any]:
+        return self._typed_response(self.backend.scan(TableName, self._native_params(kwargs)))
+
+    def _native_params(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        params = dict(params)
+        for field in ("ExpressionAttributeValues", "ExclusiveStartKey"):
+            if params.get(field):
+                params[field] = _deserialize_item(params[field])
+        return params
+
+    def _typed_response(self, response: Dict[str, Any]) -> Dict[str, Any]:
+        if "Items" in response:
+            response["Items"] = [_serialize_item(it) for it in response["Items"]]
+        if "LastEvaluatedKey" in response:
+            response["LastEvaluatedKey"] = _serialize_item(response["LastEvaluatedKey"])
+        return response
 
-        # COUNT mode
-        if Select == "COUNT":
-            if FilterExpression and ExpressionAttributeValues:
-                expected = ExpressionAttributeValues.get(":result", {}).get("S")
-                count = sum(1 for it in items if it.get("moderation_result", {}).get("S") == expected)
-                return {"Count": count}
-            return {"Count": len(items)}
 
-        # Filter by moderation_result if requested
-        if FilterExpression and ExpressionAttributeValues:
-            expected = ExpressionAttributeValues.get(":result", {}).get("S")
-            items = [it for it in items if it.get("moderation_result", {}).get("S") == expected]
+class FakeBatchWriter:
+    """
+    Table.batch_writer() の代替。25件ずつ送信し、未処理分は再送します。
+    """
 
-        if Limit is not None:
-            items = items[:Limit]
+    def __init__(self, table: "FakeTable"):
+        self._table = table
+        self._buffer: List[Dict[str, Any]] = []
 
-        return {"Items": items}
+    def put_item(self, Item: Dict[str, Any]) -> None:
+        self._buffer.append({"PutRequest": {"Item": Item}})
+        if len(self._buffer) >= 25:
+            self._flush()
+
+    def delete_item(self, Key: Dict[str, Any]) -> None:
+        self._buffer.append({"DeleteRequest": {"Key": Key}})
+        if len(self._buffer) >= 25:
+            self._flush()
+
+    def _flush(self) -> None:
+        batch, self._buffer = self._buffer[:25], self._buffer[25:]
+        unprocessed = self._table.backend.batch_write({self._table.name: batch})
+        self._buffer.extend(unprocessed.get(self._table.name, []))
+
+    def __enter__(self) -> "FakeBatchWriter":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        while self._buffer:
+            self._flush()
+
+
+class FakeTable:
+    """
+    boto3のdynamodbリソースのTable（Pythonの値をそのまま扱うAPI）と同じ呼び出し形式のローカル実装。
+    """
+
+    def __init__(self, backend: FakeDynamoDBBackend, name: str):
+        self.backend = backend
+        self.name = name
+
+    def put_item(self, Item: Dict[str, Any], **kwargs: Any) -> Dict[str, Any]:
+        self.backend.put_item(self.name, Item)
+        return {}
+
+    def get_item(self, Key: Dict[str, Any], **kwargs: Any) -> Dict[str, Any]:
+        item = self.backend.get_item(
+            self.name, Key, kwargs.get("ProjectionExpression"), kwargs.get("ExpressionAttributeNames"),
+        )
+        return {"Item": item} if item is not None else {}
+
+    def delete_item(self, Key: Dict[str, Any], **kwargs: Any) -> Dict[str, Any]:
+        self.backend.delete_item(self.name, Key)
+        return {}
+
+    def update_item(self, Key: Dict[str, Any], UpdateExpression: str, **kwargs: Any) -> Dict[str, Any]:
+        item = self.backend.update_item(
+            self.name, Key, UpdateExpression,
+            kwargs.get("ExpressionAttributeNames", {}), kwargs.get("ExpressionAttributeValues", {}),
+        )
+        return {"Attributes": item} if kwargs.get("ReturnValues") == "ALL_NEW" else {}
+
+    def query(self, **kwargs: Any) -> Dict[str, Any]:
+        return self.backend.query(self.name, kwargs)
+
+    def scan(self, **kwargs: Any) -> Dict[str, Any]:
+        return self.backend.scan(self.name, kwargs)
+
+    def batch_writer(self) -> FakeBatchWriter:
+        return FakeBatchWriter(self)
+
+
+class FakeDynamoDBResource:
+    """
+    boto3.resource("dynamodb") の代替。Table()と、リソースレベルの一括読み書きを提供します。
+    低レベルAPI（トランザクションなど）はboto3と同じくmeta.clientから使います。
+    """
+
+    def __init__(self, backend: Optional[FakeDynamoDBBackend] = None):
+        self.backend = backend or get_fake_backend()
+        self.meta = SimpleNamespace(client=FakeDynamoDBClient(self.backend))
+
+    def Table(self, name: str) -> FakeTable:
+        self.backend.schema(name)
+        return FakeTable(self.backend, name)
+
+    def batch_write_item(self, RequestItems: Dict[str, List[Dict[str, Any]]], **kwargs: Any) -> Dict[str, Any]:
+        return {"UnprocessedItems": self.backend.batch_write(RequestItems)}
+
+    def batch_get_item(self, RequestItems: Dict[str, Dict[str, Any]], **kwargs: Any) -> Dict[str, Any]:
+        responses, unprocessed = self.backend.batch_get(RequestItems)
+        return {"Responses": responses, "UnprocessedKeys": unprocessed}
+
+
+_fake_backend: Optional[FakeDynamoDBBackend] = None
+_fake_backend_lock = threading.Lock()
+
+
+def get_fake_backend() -> FakeDynamoDBBackend:
+    """
+    プロセス内で共有するローカル用バックエンドを返します（初回にアプリのテーブルを作成）。
+    """
+    global _fake_backend
+    with _fake_backend_lock:
+        if _fake_backend is None:
+            _fake_backend = FakeDynamoDBBackend(
+                latency_ms=settings.DYNAMODB_FAKE_LATENCY_MS,
+                throttle_rate=settings.DYNAMODB_FAKE_THROTTLE_RATE,
+            )
+            _fake_backend.create_moderation_tables()
+        return _fake_backend
 
 
 def _should_use_fake() -> bool:
     # Use fake when boto3 is unavailable or creds are missing
-    if boto3 is None:
+    if settings.DYNAMODB_USE_LOCAL_FAKE:
+        return True
+    if importlib.util.find_spec("boto3") is None:
         return True
     if not settings.AWS_ACCESS_KEY_ID or not settings.AWS_SECRET_ACCESS_KEY:
         return True
@@ -55,9 +808,15 @@ def _should_use_fake() -> bool:
 def get_dynamodb_client():
     if _should_use_fake():
         return FakeDynamoDBClient()
-    return boto3.client(
-        "dynamodb",
-        region_name=settings.AWS_REGION,
-        aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-        aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-    )
\ No newline at end of file
+    # boto3が無い環境でもローカル実装だけで動くよう、共有クライアントは必要になった時点で読み込む
+    from ..utils.aws import get_client
+
+    return get_client("dynamodb")
+
+
+def get_dynamodb_resource():
+    if _should_use_fake():
+        return FakeDynamoDBResource()
+    from ..utils.aws import get_resource
+
+    return get_resource("dynamodb")
@@ -0,0 +1,82 @@
+import sys
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+
+class CompactModerationRecord:
+    """
+    メモリ上に保持するモデレーション記録（__slots__で1件あたりのメモリを抑える）。
+    """
+
+    __slots__ = (
+        "moderation_id",
+        "content_id",
+        "content_type",
+        "original_content",
+        "moderation_result",
+        "moderation_reason",
+        "moderation_score",
+        "created_at",
+    )
+
+    def __init__(self, record: Dict[str, Any]):
+        self.moderation_id = record["moderation_id"]
+        self.content_id = record.get("content_id", "")
+        # 種別・判定・理由は値の種類が少ないため同じ文字列オブジェクトを共有する
+        self.content_type = sys.intern(record.get("content_type", ""))
+        self.original_content = record.get("original_content", "")
+        self.moderation_result = sys.intern(record.get("moderation_result", ""))
+        self.moderation_reason = sys.intern(record.get("moderation_reason", ""))
+        self.moderation_score = float(record.get("moderation_score", 0.0))
+        self.created_at = int(record.get("created_at", 0))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class InMemoryModerationStore:
+    """
+    モックモード用の固定長リングバッファ。
+    容量を超えると最も古い記録から上書きし、新しい順のページングはlimit件分の処理で済みます。
+    各記録には追記順の通し番号（seq）があり、ページ位置として使います。
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = max(1, int(capacity))
+        self._slots: List[Optional[CompactModerationRecord]] = [None] * self.capacity
+        self._next_seq = 0
+
+    def __len__(self) -> int:
+        return min(self._next_seq, self.capacity)
+
+    @property
+    def newest_seq(self) -> int:
+        return self._next_seq - 1
+
+    @property
+    def oldest_seq(self) -> int:
+        return max(0, self._next_seq - self.capacity)
+
+    def append(self, record: Dict[str, Any]) -> None:
+        self._slots[self._next_seq % self.capacity] = CompactModerationRecord(record)
+        self._next_seq += 1
+
+    def extend(self, records: List[Dict[str, Any]]) -> None:
+        for record in records:
+            self.append(record)
+
+    def page(self, start_seq: Optional[int], limit: int) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """
+        start_seqから古い方向にlimit件を返します。続きがあれば次の開始seqを、なければNoneを返します。
+        """
+        start = self.newest_seq if start_seq is None else min(start_seq, self.newest_seq)
+        oldest = self.oldest_seq
+        end = max(oldest - 1, start - limit)
+        items = [self._slots[seq % self.capacity].to_dict() for seq in range(start, end, -1)]
+        return items, end if end >= oldest else None
+
+    def iter_records(self) -> Iterator[Dict[str, Any]]:
+        """
+        保持している記録を古い順に返します。
+        """
+        for seq in range(self.oldest_seq, self._next_seq):
+            yield self._slots[seq % self.capacity].to_dict()
@@ -1,32 +1,182 @@
-import boto3
+import json
+import asyncio
+import functools
+import time
+import base64
+import random
 import logging
-from typing import List, Dict, Any
+from decimal import Decimal
+from typing import List, Dict, Any, Optional, Tuple
 from ...config import settings
+from .memory_store import InMemoryModerationStore
+from .write_behind import WriteBehindBuffer
+from ..dynamodb import FakeDynamoDBResource, serialize_value
+from ...utils.executor import BoundedExecutor
+from ...utils.aws import get_resource
+from ...utils.metrics import REGISTRY
+from ...utils.tracing import span
 
 logger = logging.getLogger(__name__)
 
+OPERATION_LATENCY = REGISTRY.histogram(
+    "moderation_repository_duration_seconds",
+    "ModerationRepositoryの操作ごとの所要時間（秒）",
+    ("operation",),
+)
+WRITE_BEHIND_QUEUE_DEPTH = REGISTRY.gauge(
+    "moderation_write_behind_queue_depth",
+    "ライトビハインドバッファで書き込みを待っている記録数",
+)
+
+
+def _observed(func):
+    """
+    リポジトリの非同期メソッドの所要時間をメソッド名ごとに記録します（サンプリング中のリクエストではdbスパンとしても記録します）。
+    """
+    operation = func.__name__.lstrip("_")
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        with OPERATION_LATENCY.time(operation=operation), span("db", operation):
+            return await func(*args, **kwargs)
+    return wrapper
+
+# 集計テーブルのカウンター項目（stat_key + bucket="shard#NN" で分散させる）
+COUNTERS_STAT_KEY = "counters"
+COUNTER_FIELDS = ("total_count", "approved_count", "rejected_count")
+
+# 時間別ロールアップ（stat_key="rollup#<粒度>#<content_type>" + bucket=バケット開始時刻）
+# 時系列は1回のQueryで読めるようシャードに分けない。書き込みはwrite-behindのフラッシュごとに
+# バケット単位でまとめてから加算するため、同じ項目への更新はフラッシュ1回につき1回に収まる
+ROLLUP_GRANULARITIES = {"hour": 3600, "day": 86400}
+ROLLUP_ALL_CONTENT_TYPES = "*"
+
+# 記録のうちfloatとして返す属性（その他の数値属性は整数値ならintに戻す）
+FLOAT_ATTRIBUTES = frozenset({"moderation_score"})
+
+# 履歴用GSIのパーティション属性（日単位のバケット）。新しい順の取得はこのバケットを遡って行う
+HISTORY_BUCKET_ATTRIBUTE = "history_bucket"
+HISTORY_BUCKET_SECONDS = ROLLUP_GRANULARITIES["day"]
+
+# BatchGetItemで一度に読める最大件数
+MAX_BATCH_GET_KEYS = 100
+# TransactWriteItemsで一度に扱える最大件数（カウンターの補正は全シャードを1つのトランザクションで扱う）
+MAX_TRANSACT_ITEMS = 100
+# カウンターの再構築で、スキャン中にカウンターが更新されていた場合にやり直す最大回数
+RECONCILE_MAX_ATTEMPTS = 5
+
+
+def encode_page_token(position: Dict[str, Any]) -> str:
+    """
+    ページ位置を不透明な継続トークンにエンコードします。
+    """
+    raw = json.dumps(position, separators=(",", ":"), default=_json_default)
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_page_token(token: str) -> Dict[str, Any]:
+    """
+    継続トークンをデコードします。不正なトークンの場合はValueErrorを送出します。
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        position = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8"))
+    except Exception:
+        raise ValueError("next_tokenが不正です")
+    if not isinstance(position, dict):
+        raise ValueError("next_tokenが不正です")
+    return position
+
+
+def _is_transaction_canceled(error: Exception) -> bool:
+    response = getattr(error, "response", None) or {}
+    return response.get("Error", {}).get("Code") == "TransactionCanceledException"
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
 class ModerationRepository:
-    def __init__(self):
+    def __init__(self, dynamodb: Any = None):
+        """
+        dynamodbにリソース（boto3.resource("dynamodb")互換）を渡すと、それを使って実際のコードパスで動作します。
+        DYNAMODB_USE_LOCAL_FAKEが有効な場合はローカル用のDynamoDB代替実装を使います。
+        """
+        if dynamodb is None and settings.DYNAMODB_USE_LOCAL_FAKE:
+            dynamodb = FakeDynamoDBResource()
         # モックモード（ローカル開発用）
-        self.mock_mode = (
+        self.mock_mode = dynamodb is None and (
             settings.DEBUG
             or not settings.AWS_ACCESS_KEY_ID
             or not settings.AWS_SECRET_ACCESS_KEY
         )
-        self._mock_records: List[Dict[str, Any]] = []
-
-        if not self.mock_mode:
-            self.dynamodb = boto3.resource(
-                'dynamodb',
-                region_name=settings.AWS_REGION,
-                aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-                aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY
+        # モックモードの記録は容量固定のリングバッファに保持する（長時間の負荷試験でもメモリが増え続けない）
+        self._mock_records = InMemoryModerationStore(settings.MOCK_HISTORY_CAPACITY)
+        self._mock_counters: Dict[str, int] = {field: 0 for field in COUNTER_FIELDS}
+        self._mock_rollups: Dict[Tuple[str, str], Dict[str, int]] = {}
+        self.counter_shards = max(1, settings.MODERATION_STATS_SHARDS)
+        self.rollup_offset_seconds = int(settings.MODERATION_ROLLUP_UTC_OFFSET_HOURS * 3600)
+
+        # DynamoDBのリソースとテーブルは最初の呼び出し時に作成する（コールドスタートを短くするため）
+        self._dynamodb = dynamodb
+        self._table = None
+        self._stats_table = None
+        # boto3の呼び出しはブロッキングのため、イベントループを止めないよう専用スレッドプールで実行する
+        self._io = (
+            BoundedExecutor(settings.DYNAMODB_MAX_CONCURRENCY, thread_name_prefix="dynamodb")
+            if not self.mock_mode
+            else None
+        )
+
+        # 書き込みをまとめてBatchWriteItemで行うライトビハインドバッファ（オプトイン）
+        self.write_behind = (
+            WriteBehindBuffer(
+                self._write_batch_async,
+                on_flushed=self._update_aggregates,
+                flush_interval_ms=settings.WRITE_BEHIND_FLUSH_INTERVAL_MS,
+                max_queue=settings.WRITE_BEHIND_MAX_QUEUE,
+                max_retries=settings.WRITE_BEHIND_MAX_RETRIES,
             )
-            self.table = self.dynamodb.Table(settings.DYNAMODB_MODERATION_TABLE)
-        else:
-            self.dynamodb = None
-            self.table = None
+            if settings.WRITE_BEHIND_ENABLED and not self.mock_mode
+            else None
+        )
+        if self.write_behind is not None:
+            write_behind = self.write_behind
+            WRITE_BEHIND_QUEUE_DEPTH.collect = lambda: {(): write_behind.queue_depth}
+
+    @property
+    def dynamodb(self) -> Any:
+        if self._dynamodb is None and not self.mock_mode:
+            self._dynamodb = get_resource('dynamodb')
+        return self._dynamodb
+
+    @property
+    def table(self) -> Any:
+        if self._table is None and not self.mock_mode:
+            self._table = self.dynamodb.Table(settings.DYNAMODB_MODERATION_TABLE)
+        return self._table
 
+    @property
+    def stats_table(self) -> Any:
+        if self._stats_table is None and not self.mock_mode:
+            self._stats_table = self.dynamodb.Table(settings.DYNAMODB_MODERATION_STATS_TABLE)
+        return self._stats_table
+
+    async def warm_up(self) -> None:
+        """
+        DynamoDBのリソースとテーブルを作成し、集計テーブルを1件読んで接続（TLS）を確立しておきます。
+        """
+        if self.mock_mode:
+            return
+        try:
+            self.table
+            await self._io.run(self.stats_table.get_item, Key=self._counter_key(0))
+        except Exception as e:
+            logger.warning(f"DynamoDBのウォームアップ中にエラーが発生しました: {str(e)}")
+
+    @_observed
     async def create_moderation_record(self, record: Dict[str, Any]) -> bool:
         """
         モデレーション記録を作成します。
@@ -34,75 +184,498 @@ class ModerationRepository:
         try:
             if self.mock_mode:
                 self._mock_records.append(record)
+                await self._update_aggregates([record])
+                return True
+            if self.write_behind is not None:
+                # 書き込みはバッファに任せ、DynamoDBの往復を待たずに返す
+                await self.write_behind.put(record)
                 return True
-            self.table.put_item(Item=record)
+            await self._io.run(self.table.put_item, Item=self._to_item(record))
+            await self._update_aggregates([record])
             return True
         except Exception as e:
             logger.error(f"モデレーション記録の作成中にエラーが発生しました: {str(e)}")
             return False
 
-    async def get_moderation_history(self, limit: int = 10, offset: int = 0) -> List[Dict[str, Any]]:
+    @_observed
+    async def create_moderation_records(self, records: List[Dict[str, Any]]) -> bool:
         """
-        モデレーション履歴を取得します。
+        複数のモデレーション記録を一括で作成します。
         """
         try:
             if self.mock_mode:
-                # offsetは単純なページングとして扱う
-                start = offset
-                end = offset + limit
-                return list(reversed(self._mock_records))[start:end]
-            response = self.table.scan(
-                Limit=limit,
-                ExclusiveStartKey={'moderation_id': str(offset)} if offset > 0 else None
-            )
-            return response.get('Items', [])
+                self._mock_records.extend(records)
+                await self._update_aggregates(records)
+                return True
+            if self.write_behind is not None:
+                for record in records:
+                    await self.write_behind.put(record)
+                return True
+            await self._io.run(self._put_records, records)
+            # 集計は一括分をまとめて加算する
+            await self._update_aggregates(records)
+            return True
         except Exception as e:
-            logger.error(f"モデレーション履歴の取得中にエラーが発生しました: {str(e)}")
-            return []
+            logger.error(f"モデレーション記録の一括作成中にエラーが発生しました: {str(e)}")
+            return False
 
-    async def get_total_moderation_count(self) -> int:
+    @_observed
+    async def flush(self) -> None:
         """
-        総モデレーション数を取得します。
+        ライトビハインドバッファに残っている記録を書き込みます（停止時に呼び出します）。
         """
+        if self.write_behind is not None:
+            await self.write_behind.close()
+
+    def get_write_behind_stats(self) -> Dict[str, Any]:
+        """
+        ライトビハインドバッファのキュー長・書き込みレイテンシなどを取得します。
+        """
+        if self.write_behind is None:
+            return {"enabled": False}
+        return {"enabled": True, **self.write_behind.stats()}
+
+    def _put_records(self, records: List[Dict[str, Any]]) -> None:
+        # batch_writerが25件ずつのBatchWriteItemと未処理分の再送を行う
+        with self.table.batch_writer() as batch:
+            for record in records:
+                batch.put_item(Item=self._to_item(record))
+
+    @_observed
+    async def _write_batch_async(self, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return await self._io.run(self._batch_write_records, records)
+
+    def _batch_write_records(self, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        1回のBatchWriteItemで記録を書き込み、未処理（UnprocessedItems）になった記録を返します。
+        """
+        by_id = {record["moderation_id"]: record for record in records}
+        response = self.dynamodb.batch_write_item(RequestItems={
+            self.table.name: [{"PutRequest": {"Item": self._to_item(record)}} for record in records]
+        })
+        unprocessed = response.get("UnprocessedItems", {}).get(self.table.name, [])
+        return [by_id[request["PutRequest"]["Item"]["moderation_id"]] for request in unprocessed]
+
+    @_observed
+    async def get_moderation_history(
+        self,
+        limit: int = 10,
+        next_token: Optional[str] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        モデレーション履歴を新しい順に取得します。
+        続きがある場合は継続トークンを返し、次回のnext_tokenに渡すと続きから取得できます。
+        """
+        position = decode_page_token(next_token) if next_token else None
         try:
             if self.mock_mode:
-                return len(self._mock_records)
-            response = self.table.scan(Select='COUNT')
-            return response.get('Count', 0)
+                return self._get_mock_history(limit, position)
+            return await self._io.run(self._query_history, limit, position)
         except Exception as e:
-            logger.error(f"総モデレーション数の取得中にエラーが発生しました: {str(e)}")
-            return 0
+            logger.error(f"モデレーション履歴の取得中にエラーが発生しました: {str(e)}")
+            return [], None
+
+    def _get_mock_history(
+        self,
+        limit: int,
+        position: Optional[Dict[str, Any]],
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        # 位置は追記順の通し番号で持つため、新しい記録が追加されてもページがずれない
+        items, next_seq = self._mock_records.page(int(position["p"]) if position else None, limit)
+        return items, encode_page_token({"p": next_seq}) if next_seq is not None else None
 
-    async def get_approved_moderation_count(self) -> int:
+    def _query_history(
+        self,
+        limit: int,
+        position: Optional[Dict[str, Any]],
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
         """
-        承認されたモデレーション数を取得します。
+        履歴用GSI（日単位のバケット + created_at）を新しいバケットから順にQueryします。
+        読み込むのはlimit件までで、空のバケットを遡る回数は1ページあたり上限を設けています。
+        """
+        now = int(time.time())
+        oldest_bucket = self.bucket_start("day", now - settings.MODERATION_HISTORY_RETENTION_DAYS * 86400)
+        bucket = int(position["b"]) if position else self.bucket_start("day", now)
+        start_key = position.get("k") if position else None
+
+        items: List[Dict[str, Any]] = []
+        buckets_read = 0
+        while bucket >= oldest_bucket and buckets_read < settings.MODERATION_HISTORY_MAX_BUCKETS_PER_PAGE:
+            query_kwargs: Dict[str, Any] = {
+                "IndexName": settings.DYNAMODB_MODERATION_HISTORY_INDEX,
+                "KeyConditionExpression": f"{HISTORY_BUCKET_ATTRIBUTE} = :bucket",
+                "ExpressionAttributeValues": {":bucket": self._bucket_id(bucket)},
+                "ScanIndexForward": False,
+                "Limit": limit - len(items),
+            }
+            if start_key:
+                query_kwargs["ExclusiveStartKey"] = start_key
+            response = self.table.query(**query_kwargs)
+            items.extend(self._from_item(item) for item in response.get("Items", []))
+            start_key = response.get("LastEvaluatedKey")
+            buckets_read += 1
+            if start_key:
+                # 同じバケットの途中で上限に達した
+                if len(items) >= limit:
+                    return items, encode_page_token({"b": bucket, "k": start_key})
+                continue
+            bucket -= HISTORY_BUCKET_SECONDS
+            if len(items) >= limit:
+                break
+
+        if bucket < oldest_bucket:
+            return items, None
+        return items, encode_page_token({"b": bucket, "k": start_key})
+
+    def _to_item(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        記録をDynamoDBの項目に変換します（floatはDecimalに変換し、履歴用GSIのバケットを付与）。
+        """
+        item = {
+            key: Decimal(str(value)) if isinstance(value, float) else value
+            for key, value in record.items()
+        }
+        item[HISTORY_BUCKET_ATTRIBUTE] = self._bucket_id(self.bucket_start("day", int(record["created_at"])))
+        return item
+
+    def _from_item(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        DynamoDBの項目を記録に変換します（Decimalはスキーマどおりの型に戻し、履歴用GSIのバケットを除く）。
+        スコアは1.0のような整数値でもfloatのまま返します（レスポンスはresponse_modelで再検証しないため）。
+        """
+        record = {}
+        for key, value in item.items():
+            if isinstance(value, Decimal):
+                value = float(value) if key in FLOAT_ATTRIBUTES else _json_default(value)
+            record[key] = value
+        record.pop(HISTORY_BUCKET_ATTRIBUTE, None)
+        return record
+
+    @_observed
+    async def get_moderation_counters(self) -> Dict[str, int]:
+        """
+        書き込み時に更新しているカウンター（総数・承認数・拒否数）を取得します。
+        テーブルの件数に関係なく、シャード数分の項目を読むだけで済みます。
         """
         try:
-            if self.mock_mode:
-                return sum(1 for r in self._mock_records if r.get('moderation_result') == 'approved')
-            response = self.table.scan(
-                FilterExpression='moderation_result = :result',
-                ExpressionAttributeValues={':result': 'approved'},
-                Select='COUNT'
-            )
-            return response.get('Count', 0)
+            return await self._read_counter_totals()
         except Exception as e:
-            logger.error(f"承認されたモデレーション数の取得中にエラーが発生しました: {str(e)}")
-            return 0
+            logger.error(f"モデレーション集計の取得中にエラーが発生しました: {str(e)}")
+            return {field: 0 for field in COUNTER_FIELDS}
+
+    async def _read_counter_totals(self) -> Dict[str, int]:
+        # 読み込みに失敗した場合は例外をそのまま送出する（再構築で0を読んだものとして扱わないように）
+        if self.mock_mode:
+            return dict(self._mock_counters)
+        return self._sum_counter_items(await self._read_counter_items())
+
+    async def _read_counter_items(self) -> List[Dict[str, Any]]:
+        keys = [self._counter_key(shard) for shard in range(self.counter_shards)]
+        # BatchGetItemの上限（100件）ごとに分け、分割した読み込みは同時に発行する
+        chunks = await asyncio.gather(*(
+            self._io.run(self._batch_get_stats, keys[i:i + MAX_BATCH_GET_KEYS])
+            for i in range(0, len(keys), MAX_BATCH_GET_KEYS)
+        ))
+        return [item for items in chunks for item in items]
+
+    def _sum_counter_items(self, items: List[Dict[str, Any]]) -> Dict[str, int]:
+        totals = {field: 0 for field in COUNTER_FIELDS}
+        for item in items:
+            for field in COUNTER_FIELDS:
+                totals[field] += int(item.get(field, 0))
+        return totals
 
-    async def get_rejected_moderation_count(self) -> int:
+    def _batch_get_stats(self, keys: List[Dict[str, str]]) -> List[Dict[str, Any]]:
+        items: List[Dict[str, Any]] = []
+        request = {self.stats_table.name: {"Keys": keys}}
+        while request:
+            response = self.dynamodb.batch_get_item(RequestItems=request)
+            items.extend(response.get("Responses", {}).get(self.stats_table.name, []))
+            request = response.get("UnprocessedKeys") or None
+        return items
+
+    @_observed
+    async def reconcile_moderation_counters(
+        self,
+        segments: int = 4,
+        max_attempts: int = RECONCILE_MAX_ATTEMPTS,
+    ) -> Dict[str, int]:
+        """
+        モデレーションテーブル全体をスキャンしてカウンターを再構築し、スキャンで数えた件数を返します。
+        カウンターと実データがずれた場合の修復用です（全件読み込みになるため定期ジョブで実行してください）。
+        スキャンはsegments個の並列スキャンに分けて同時に実行します。
+
+        カウンターは上書きせず、スキャン前に読んだ値とスキャン結果の差分を加算します。補正は全シャードが
+        スキャン前に読んだ値のままであることを条件にしたトランザクションで書き込み、スキャン中にカウンターが
+        更新された場合（その記録をスキャンでも数えて二重に補正しうる）は読み込みからやり直します。
+        max_attempts回とも更新と重なった場合はRuntimeErrorを送出します。
+
+        モックモードの記録は容量固定のリングバッファにしか残らず全件を数えられないため、再構築せずに現在の値を返します。
+        """
+        if self.mock_mode:
+            logger.warning("モックモードでは記録の全件を保持していないため、モデレーション集計の再構築は行いません")
+            return await self._read_counter_totals()
+        if self.counter_shards > MAX_TRANSACT_ITEMS:
+            raise ValueError(f"再構築できるのはシャード数が{MAX_TRANSACT_ITEMS}以下の場合だけです")
+        segments = max(1, int(segments))
+        for attempt in range(1, max_attempts + 1):
+            items = await self._read_counter_items()
+            before = self._sum_counter_items(items)
+            totals = {field: 0 for field in COUNTER_FIELDS}
+            partials = await asyncio.gather(*(
+                self._io.run(self._count_segment, segment, segments) for segment in range(segments)
+            ))
+            for partial in partials:
+                for field, value in partial.items():
+                    totals[field] += value
+
+            adjustment = {field: totals[field] - before[field] for field in COUNTER_FIELDS}
+            if any(adjustment.values()):
+                try:
+                    await self._io.run(self._adjust_counters_if_unchanged, items, adjustment)
+                except Exception as e:
+                    if not _is_transaction_canceled(e):
+                        raise
+                    logger.warning(f"再構築中にカウンターが更新されたため、読み込みからやり直します（{attempt}回目）")
+                    continue
+            logger.info(f"モデレーション集計を再構築しました: {totals}（補正: {adjustment}）")
+            return totals
+        raise RuntimeError(f"カウンターの更新が続いたため、{max_attempts}回試行しても再構築できませんでした")
+
+    def _adjust_counters_if_unchanged(self, items: List[Dict[str, Any]], adjustment: Dict[str, int]) -> None:
         """
-        拒否されたモデレーション数を取得します。
+        全シャードの値がitems（読み込んだ値）のままであれば、シャード0に補正を加算します。
         """
+        by_bucket = {item["bucket"]: item for item in items}
+        transact_items = []
+        for shard in range(self.counter_shards):
+            key = self._counter_key(shard)
+            item = by_bucket.get(key["bucket"], {})
+            conditions = []
+            values: Dict[str, Any] = {}
+            for field in COUNTER_FIELDS:
+                if field in item:
+                    conditions.append(f"{field} = :read_{field}")
+                    values[f":read_{field}"] = serialize_value(int(item[field]))
+                else:
+                    conditions.append(f"attribute_not_exists({field})")
+            params: Dict[str, Any] = {
+                "TableName": self.stats_table.name,
+                "Key": {name: serialize_value(value) for name, value in key.items()},
+                "ConditionExpression": " AND ".join(conditions),
+            }
+            if shard == 0:
+                params["UpdateExpression"] = "ADD total_count :total, approved_count :approved, rejected_count :rejected"
+                values.update({
+                    ":total": serialize_value(adjustment["total_count"]),
+                    ":approved": serialize_value(adjustment["approved_count"]),
+                    ":rejected": serialize_value(adjustment["rejected_count"]),
+                })
+            if values:
+                params["ExpressionAttributeValues"] = values
+            transact_items.append({"Update" if shard == 0 else "ConditionCheck": params})
+        self.dynamodb.meta.client.transact_write_items(TransactItems=transact_items)
+
+    def _count_segment(self, segment: int, total_segments: int) -> Dict[str, int]:
+        totals = {field: 0 for field in COUNTER_FIELDS}
+        scan_kwargs: Dict[str, Any] = {
+            "ProjectionExpression": "moderation_result",
+            "Segment": segment,
+            "TotalSegments": total_segments,
+        }
+        while True:
+            response = self.table.scan(**scan_kwargs)
+            for field, value in self._counter_deltas(response.get("Items", [])).items():
+                totals[field] += value
+            last_key = response.get("LastEvaluatedKey")
+            if not last_key:
+                return totals
+            scan_kwargs["ExclusiveStartKey"] = last_key
+
+    @_observed
+    async def get_moderation_rollups(
+        self,
+        granularity: str,
+        start: int,
+        end: int,
+        content_type: Optional[str] = None,
+    ) -> List[Dict[str, int]]:
+        """
+        指定期間の時間別ロールアップを取得します（1回のQueryで期間分のバケットを読みます）。
+        データのないバケットは含まれません。取得に失敗した場合は例外を送出します（0件の系列と区別するため）。
+        """
+        stat_key = self._rollup_stat_key(granularity, content_type)
+        first = self.bucket_start(granularity, start)
+        last = self.bucket_start(granularity, end)
+        if self.mock_mode:
+            points = [
+                {"bucket_start": int(bucket), **counts}
+                for (key, bucket), counts in self._mock_rollups.items()
+                if key == stat_key and self._bucket_id(first) <= bucket <= self._bucket_id(last)
+            ]
+            return sorted(points, key=lambda p: p["bucket_start"])
         try:
-            if self.mock_mode:
-                return sum(1 for r in self._mock_records if r.get('moderation_result') == 'rejected')
-            response = self.table.scan(
-                FilterExpression='moderation_result = :result',
-                ExpressionAttributeValues={':result': 'rejected'},
-                Select='COUNT'
+            return await self._io.run(self._query_rollups, stat_key, first, last)
+        except Exception as e:
+            logger.error(f"モデレーションのロールアップ取得中にエラーが発生しました: {str(e)}")
+            raise
+
+    def _query_rollups(self, stat_key: str, first: int, last: int) -> List[Dict[str, int]]:
+        points = []
+        query_kwargs: Dict[str, Any] = {
+            "KeyConditionExpression": "stat_key = :key AND #bucket BETWEEN :first AND :last",
+            "ExpressionAttributeNames": {"#bucket": "bucket"},
+            "ExpressionAttributeValues": {
+                ":key": stat_key,
+                ":first": self._bucket_id(first),
+                ":last": self._bucket_id(last),
+            },
+        }
+        while True:
+            response = self.stats_table.query(**query_kwargs)
+            for item in response.get("Items", []):
+                points.append({
+                    "bucket_start": int(item["bucket"]),
+                    **{field: int(item.get(field, 0)) for field in COUNTER_FIELDS},
+                })
+            last_key = response.get("LastEvaluatedKey")
+            if not last_key:
+                return points
+            query_kwargs["ExclusiveStartKey"] = last_key
+
+    def bucket_start(self, granularity: str, timestamp: int) -> int:
+        """
+        タイムスタンプが属するバケットの開始時刻を返します（日単位はMODERATION_ROLLUP_UTC_OFFSET_HOURSの時差で区切る）。
+        """
+        size = ROLLUP_GRANULARITIES[granularity]
+        return timestamp - ((timestamp + self.rollup_offset_seconds) % size)
+
+    def _bucket_id(self, bucket_start: int) -> str:
+        # 文字列の範囲検索で時刻順になるよう桁数を揃える
+        return f"{bucket_start:010d}"
+
+    def _rollup_stat_key(self, granularity: str, content_type: Optional[str]) -> str:
+        return f"rollup#{granularity}#{content_type or ROLLUP_ALL_CONTENT_TYPES}"
+
+    async def _update_aggregates(self, records: List[Dict[str, Any]]) -> None:
+        """
+        書き込んだ記録をカウンターと時間別ロールアップに反映します。
+        各項目への加算は互いに独立しているため、DynamoDBには同時に発行します。
+        """
+        counter_deltas = self._counter_deltas(records)
+        rollup_deltas = self._rollup_deltas(records)
+        if self.mock_mode:
+            self._apply_counter_deltas(counter_deltas)
+            for (stat_key, bucket), counts in rollup_deltas.items():
+                self._apply_rollup_delta(stat_key, bucket, counts)
+            return
+        await asyncio.gather(
+            self._io.run(self._apply_counter_deltas, counter_deltas),
+            *(
+                self._io.run(self._apply_rollup_delta, stat_key, bucket, counts)
+                for (stat_key, bucket), counts in rollup_deltas.items()
+            ),
+        )
+
+    def _rollup_deltas(self, records: List[Dict[str, Any]]) -> Dict[Tuple[str, str], Dict[str, int]]:
+        """
+        記録を（stat_key, bucket）ごとにまとめた加算量を返します。
+        1件につき「全種別」と「content_type別」の各粒度のバケットが対象になります。
+        """
+        grouped: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+        for record in records:
+            created_at = int(record.get("created_at", 0))
+            for granularity in ROLLUP_GRANULARITIES:
+                bucket = self._bucket_id(self.bucket_start(granularity, created_at))
+                for content_type in (None, record.get("content_type")):
+                    key = (self._rollup_stat_key(granularity, content_type), bucket)
+                    grouped.setdefault(key, []).append(record)
+        return {key: self._counter_deltas(group) for key, group in grouped.items()}
+
+    def _apply_rollup_delta(self, stat_key: str, bucket: str, counts: Dict[str, int]) -> None:
+        if self.mock_mode:
+            current = self._mock_rollups.setdefault((stat_key, bucket), {field: 0 for field in COUNTER_FIELDS})
+            for field, value in counts.items():
+                current[field] += value
+            return
+        try:
+            self.stats_table.update_item(
+                Key={"stat_key": stat_key, "bucket": bucket},
+                UpdateExpression="ADD total_count :total, approved_count :approved, rejected_count :rejected",
+                ExpressionAttributeValues={
+                    ":total": counts["total_count"],
+                    ":approved": counts["approved_count"],
+                    ":rejected": counts["rejected_count"],
+                },
             )
-            return response.get('Count', 0)
         except Exception as e:
-            logger.error(f"拒否されたモデレーション数の取得中にエラーが発生しました: {str(e)}")
+            logger.error(f"モデレーションのロールアップ更新中にエラーが発生しました: {str(e)}")
+
+    @_observed
+    async def backfill_history_buckets(self) -> int:
+        """
+        履歴用GSIのバケット属性を持たない既存の記録にバケットを付与し、付与した件数を返します。
+        """
+        if self.mock_mode:
             return 0
+        updated = 0
+        scan_kwargs: Dict[str, Any] = {
+            "ProjectionExpression": "moderation_id, created_at",
+            "FilterExpression": f"attribute_not_exists({HISTORY_BUCKET_ATTRIBUTE})",
+        }
+        while True:
+            response = await self._io.run(self.table.scan, **scan_kwargs)
+            items = response.get("Items", [])
+            # 1ページ分の更新は同時に発行する（同時実行数は専用スレッドプールのサイズで抑えられる）
+            await asyncio.gather(*(
+                self._io.run(
+                    self.table.update_item,
+                    Key={"moderation_id": item["moderation_id"]},
+                    UpdateExpression=f"SET {HISTORY_BUCKET_ATTRIBUTE} = :bucket",
+                    ExpressionAttributeValues={
+                        ":bucket": self._bucket_id(self.bucket_start("day", int(item["created_at"]))),
+                    },
+                )
+                for item in items
+            ))
+            updated += len(items)
+            last_key = response.get("LastEvaluatedKey")
+            if not last_key:
+                break
+            scan_kwargs["ExclusiveStartKey"] = last_key
+        return updated
+
+    def _counter_key(self, shard: int) -> Dict[str, str]:
+        return {"stat_key": COUNTERS_STAT_KEY, "bucket": f"shard#{shard:02d}"}
+
+    def _counter_deltas(self, records: List[Dict[str, Any]]) -> Dict[str, int]:
+        return {
+            "total_count": len(records),
+            "approved_count": sum(1 for r in records if r.get('moderation_result') == 'approved'),
+            "rejected_count": sum(1 for r in records if r.get('moderation_result') == 'rejected'),
+        }
+
+    def _apply_counter_deltas(self, deltas: Dict[str, int]) -> None:
+        """
+        カウンターに加算します。ホットキーを避けるため、ランダムに選んだシャードへADDで原子的に加算します。
+        """
+        if self.mock_mode:
+            for field, value in deltas.items():
+                self._mock_counters[field] += value
+            return
+        try:
+            self._add_to_counter_shard(random.randrange(self.counter_shards), deltas)
+        except Exception as e:
+            # 記録自体は保存済みのため、カウンターのずれは再構築ジョブで修復する
+            logger.error(f"モデレーション集計の更新中にエラーが発生しました: {str(e)}")
+
+    def _add_to_counter_shard(self, shard: int, deltas: Dict[str, int]) -> None:
+        self.stats_table.update_item(
+            Key=self._counter_key(shard),
+            UpdateExpression="ADD total_count :total, approved_count :approved, rejected_count :rejected",
+            ExpressionAttributeValues={
+                ":total": deltas["total_count"],
+                ":approved": deltas["approved_count"],
+                ":rejected": deltas["rejected_count"],
+            },
+        )
@@ -0,0 +1,166 @@
+import asyncio
+import logging
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# BatchWriteItemで一度に送れる最大件数
+MAX_BATCH_WRITE_ITEMS = 25
+
+BatchWriteFn = Callable[[List[Dict[str, Any]]], Awaitable[List[Dict[str, Any]]]]
+FlushedFn = Callable[[List[Dict[str, Any]]], Awaitable[None]]
+
+
+class WriteBehindBuffer:
+    """
+    記録をメモリ上のキューに貯め、BatchWriteItem（最大25件）でまとめて書き込むバッファ。
+    件数がbatch_sizeに達したとき・flush_interval_msが経過したとき・停止時に書き込みます。
+    write_batchは未処理（UnprocessedItems）の記録を返し、それらはバックオフしながら再送します。
+    write_batch・on_flushedはコルーチン関数で、ブロッキングI/Oは呼び出し側の専用スレッドプールで実行してください。
+    """
+
+    def __init__(
+        self,
+        write_batch: BatchWriteFn,
+        on_flushed: Optional[FlushedFn] = None,
+        batch_size: int = MAX_BATCH_WRITE_ITEMS,
+        flush_interval_ms: float = 200.0,
+        max_queue: int = 10000,
+        max_retries: int = 5,
+        base_backoff_ms: float = 50.0,
+    ):
+        self._write_batch = write_batch
+        self._on_flushed = on_flushed
+        self.batch_size = max(1, min(MAX_BATCH_WRITE_ITEMS, int(batch_size)))
+        self.flush_interval_seconds = max(0.001, float(flush_interval_ms) / 1000.0)
+        self.max_queue = max(self.batch_size, int(max_queue))
+        self.max_retries = max(0, int(max_retries))
+        self.base_backoff_seconds = max(0.0, float(base_backoff_ms) / 1000.0)
+
+        self._queue: List[Dict[str, Any]] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._stopping = False
+
+        self.flushed_records = 0
+        self.failed_records = 0
+        self.flush_count = 0
+        self.retry_count = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+        self._total_flush_ms = 0.0
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._queue)
+
+    def _ensure_running(self) -> None:
+        loop = asyncio.get_running_loop()
+        # イベントループが変わった場合（Lambdaの呼び出しごとなど）はタスクを作り直す
+        if self._loop is not loop:
+            self._loop = loop
+            self._wakeup = asyncio.Event()
+            self._flush_lock = asyncio.Lock()
+            self._task = None
+        if self._task is None or self._task.done():
+            self._task = loop.create_task(self._run())
+
+    async def put(self, record: Dict[str, Any]) -> None:
+        """
+        記録をキューに追加します。キューが上限に達している場合は書き込みが進むまで待ちます。
+        """
+        self._ensure_running()
+        if len(self._queue) >= self.max_queue:
+            # メモリを際限なく使わないよう、呼び出し元で書き込みを待つ（バックプレッシャー）
+            await self.flush()
+        self._queue.append(record)
+        if len(self._queue) >= self.batch_size:
+            self._wakeup.set()
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            if self._queue:
+                try:
+                    await self.flush()
+                except Exception as e:
+                    logger.error(f"ライトビハインドの書き込み中にエラーが発生しました: {str(e)}")
+
+    async def flush(self) -> None:
+        """
+        キューにある記録をすべて書き込みます。
+        """
+        if self._flush_lock is None:
+            self._ensure_running()
+        async with self._flush_lock:
+            while self._queue:
+                batch = self._queue[:self.batch_size]
+                del self._queue[:self.batch_size]
+                await self._write_with_retry(batch)
+
+    async def _write_with_retry(self, batch: List[Dict[str, Any]]) -> None:
+        started = time.perf_counter()
+        pending = batch
+        attempt = 0
+        while pending:
+            try:
+                pending = await self._write_batch(pending)
+            except Exception as e:
+                logger.error(f"BatchWriteItemの実行中にエラーが発生しました: {str(e)}")
+            if not pending:
+                break
+            if attempt >= self.max_retries:
+                self.failed_records += len(pending)
+                logger.error(f"再送の上限に達したため{len(pending)}件の記録を書き込めませんでした")
+                break
+            attempt += 1
+            self.retry_count += 1
+            # 指数バックオフ + ジッター
+            await asyncio.sleep(self.base_backoff_seconds * (2 ** (attempt - 1)) * (0.5 + random.random()))
+
+        written = [record for record in batch if not any(record is p for p in pending)]
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.flush_count += 1
+        self.flushed_records += len(written)
+        self.last_flush_ms = elapsed_ms
+        self.max_flush_ms = max(self.max_flush_ms, elapsed_ms)
+        self._total_flush_ms += elapsed_ms
+        if written and self._on_flushed is not None:
+            await self._on_flushed(written)
+
+    async def close(self) -> None:
+        """
+        バックグラウンドの書き込みタスクを止め、残っている記録を書き込みます。
+        書き込み中のバッチはキャンセルせず完了を待ちます。次にputされた時点でタスクは再開します。
+        """
+        task = self._task
+        if task is not None and not task.done() and self._loop is asyncio.get_running_loop():
+            self._stopping = True
+            self._wakeup.set()
+            try:
+                await task
+            finally:
+                self._stopping = False
+        self._task = None
+        if self._queue:
+            await self.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queue_depth": self.queue_depth,
+            "flush_count": self.flush_count,
+            "flushed_records": self.flushed_records,
+            "failed_records": self.failed_records,
+            "retry_count": self.retry_count,
+            "last_flush_ms": round(self.last_flush_ms, 3),
+            "max_flush_ms": round(self.max_flush_ms, 3),
+            "avg_flush_ms": round(self._total_flush_ms / self.flush_count, 3) if self.flush_count > 0 else 0,
+        }
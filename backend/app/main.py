@@ -1,8 +1,16 @@
-from fastapi import FastAPI, Depends, HTTPException
+import asyncio
+import logging
+from typing import Any, Dict, Optional
+from fastapi import FastAPI, Depends, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
 from mangum import Mangum
 from .routes import moderation
 from .config import settings
+from .middleware.auth_middleware import verify_metrics_token
+from .middleware.tracing_middleware import TracingMiddleware
+from .utils.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, REGISTRY
+
+logger = logging.getLogger(__name__)
 
 app = FastAPI(title="Carp Connect Moderation API")
 
@@ -15,15 +23,98 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 処理時間の内訳の記録（CORSを含む全体を計測するため最後に追加して最も外側に置く）
+if settings.TRACING_SAMPLE_RATE > 0:
+    app.add_middleware(
+        TracingMiddleware,
+        sample_rate=settings.TRACING_SAMPLE_RATE,
+        log_enabled=settings.TRACING_LOG_ENABLED,
+        log_slow_ms=settings.TRACING_LOG_SLOW_MS,
+    )
+
 # ルーターの登録
 app.include_router(moderation.router, prefix="/api/moderation", tags=["moderation"])
+if settings.PROFILING_ENABLED:
+    # 管理用のルーター（プロファイラー）は有効な場合だけ読み込む
+    from .routes import admin
+    app.include_router(admin.router, prefix="/api/admin", tags=["admin"])
+
+@app.on_event("startup")
+async def startup():
+    # 最初のリクエストでクライアント作成などを待たないよう、起動時に初期化を済ませる
+    # （Lambdaではlifespanを使わず、handlerが実行環境ごとに1回ウォームアップする）
+    if settings.WARMUP_ON_STARTUP:
+        await moderation.warm_up_moderation_service()
+
+@app.on_event("shutdown")
+async def shutdown():
+    # ライトビハインドで書き込み待ちの記録を失わないようにフラッシュする
+    await moderation.shutdown_moderation_service()
 
 @app.get("/")
 def read_root():
     return {"message": "Welcome to Carp Connect Moderation API"}
 
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False, dependencies=[Depends(verify_metrics_token)])
+    def metrics():
+        # Prometheusのテキスト形式で、このプロセス（Lambdaの場合は実行環境）のメトリクスを返す
+        return Response(REGISTRY.render(), headers={"Content-Type": METRICS_CONTENT_TYPE})
+
 # Lambda関数用ハンドラー
-handler = Mangum(app)
+# startup/shutdownを呼び出しごとに実行しないようlifespanは使わず、handlerでウォームアップとフラッシュを行う
+asgi_handler = Mangum(app, lifespan="off")
+
+# 実行環境ごとに1つのイベントループを使い続ける（Mangumも現在のイベントループで処理する）
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_warmed_up = False
+
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    global _loop
+    if _loop is None or _loop.is_closed():
+        _loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(_loop)
+    return _loop
+
+
+def _warm_up_once(loop: asyncio.AbstractEventLoop) -> Dict[str, float]:
+    """
+    実行環境ごとに1回だけウォームアップし、処理ごとの所要時間を返します（2回目以降は空）。
+    """
+    global _warmed_up
+    if _warmed_up:
+        return {}
+    timings = loop.run_until_complete(moderation.warm_up_moderation_service())
+    _warmed_up = True
+    return timings
+
+
+def is_warmup_event(event: Any) -> bool:
+    """
+    EventBridgeのスケジュールイベント、または {"warmup": true} をウォームアップ用の呼び出しとみなします。
+    """
+    if not isinstance(event, dict):
+        return False
+    if event.get("warmup") is True:
+        return True
+    return event.get("source") == "aws.events" and event.get("detail-type") == "Scheduled Event"
+
+
+def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    loop = _get_loop()
+    if is_warmup_event(event):
+        # 業務処理は行わず、初期化だけ済ませてすぐに返す
+        timings = _warm_up_once(loop)
+        logger.info(f"ウォームアップが完了しました: {timings}")
+        return {"warmed_up": True, "timings_ms": timings}
+    if settings.WARMUP_ON_STARTUP:
+        _warm_up_once(loop)
+    try:
+        return asgi_handler(event, context)
+    finally:
+        # 呼び出しが終わると実行環境は凍結されるため、書き込み待ちの記録はここで書き込む
+        loop.run_until_complete(moderation.shutdown_moderation_service())
 
 if __name__ == "__main__":
     import uvicorn
@@ -1,26 +1,63 @@
+import hmac
+from typing import Optional
+
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-import jwt
 from ..config import settings
+from ..utils.tracing import span
 
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
 
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
     """
     簡易的な認証チェック（開発用）
     本番環境では適切な認証システムを実装してください
     """
-    try:
-        # 開発用：Bearerトークンが"dev-token"の場合のみ許可
-        if credentials.credentials == "dev-token":
-            return {"user_id": "dev-user", "username": "developer"}
-        else:
+    with span("auth"):
+        try:
+            # 開発用：Bearerトークンが"dev-token"の場合のみ許可
+            if credentials.credentials == "dev-token":
+                return {"user_id": "dev-user", "username": "developer"}
+            else:
+                raise HTTPException(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    detail="無効な認証トークンです"
+                )
+        except Exception:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="無効な認証トークンです"
+                detail="認証に失敗しました"
+            )
+
+
+async def get_admin_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    """
+    管理用エンドポイントの認可チェック。
+    開発用のトークンでは許可せず、ADMIN_API_TOKENと一致するBearerトークンだけを許可します。
+    """
+    with span("auth"):
+        if not settings.ADMIN_API_TOKEN:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="管理用トークンが設定されていないため、管理用エンドポイントは使えません"
+            )
+        if not hmac.compare_digest(credentials.credentials, settings.ADMIN_API_TOKEN):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="管理用エンドポイントを呼び出す権限がありません"
             )
-    except Exception:
+        return {"user_id": "admin", "username": "admin"}
+
+async def verify_metrics_token(credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security)):
+    """
+    METRICS_TOKENが設定されている場合、/metrics へのリクエストのBearerトークンを検証します。
+    """
+    if not settings.METRICS_TOKEN:
+        return
+    if credentials is None or not hmac.compare_digest(credentials.credentials, settings.METRICS_TOKEN):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="認証に失敗しました"
+            detail="無効な認証トークンです",
+            headers={"WWW-Authenticate": "Bearer"},
         )
@@ -0,0 +1,50 @@
+import json
+import logging
+import random
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..utils import tracing
+
+logger = logging.getLogger(__name__)
+
+
+class TracingMiddleware:
+    """
+    サンプリングしたリクエストの処理時間の内訳（スパン）を記録し、
+    Server-Timingレスポンスヘッダーと（有効な場合は）1行のJSONログとして出力します。
+    サンプリングされなかったリクエストは乱数を1回引くだけで、そのまま次に渡します。
+    """
+
+    def __init__(self, app: ASGIApp, sample_rate: float = 1.0, log_enabled: bool = False, log_slow_ms: float = 0.0):
+        self.app = app
+        self.sample_rate = min(max(sample_rate, 0.0), 1.0)
+        self.log_enabled = log_enabled
+        self.log_slow_ms = log_slow_ms
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or random.random() >= self.sample_rate:
+            await self.app(scope, receive, send)
+            return
+
+        with tracing.start_trace() as trace:
+            status_code = 500
+
+            async def send_with_timing(message: Message) -> None:
+                nonlocal status_code
+                if message["type"] == "http.response.start":
+                    status_code = message["status"]
+                    headers = MutableHeaders(scope=message)
+                    headers.append("Server-Timing", trace.server_timing(trace.elapsed_ms()))
+                    if self.log_enabled:
+                        # ログの行とレスポンスを突き合わせられるようにする
+                        headers.append("X-Trace-Id", trace.trace_id)
+                await send(message)
+
+            await self.app(scope, receive, send_with_timing)
+
+        total_ms = trace.elapsed_ms()
+        if self.log_enabled and total_ms >= self.log_slow_ms:
+            log = trace.to_log(total_ms, method=scope["method"], path=scope["path"], status=status_code)
+            logger.info(json.dumps(log, ensure_ascii=False))
@@ -0,0 +1,47 @@
+import asyncio
+
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+
+from ..middleware.auth_middleware import get_admin_user
+from ..utils.profiler import ProfilerBusyError, format_collapsed, get_profiler
+from ..utils.responses import FastJSONResponse
+from ..config import settings
+
+router = APIRouter(default_response_class=FastJSONResponse)
+
+
+@router.get("/profile", response_class=Response)
+async def profile_process(
+    admin_user = Depends(get_admin_user),
+    seconds: float = 10.0,
+    interval_ms: float = 10.0,
+    include_idle: bool = False
+):
+    """
+    実行中のプロセスをseconds秒間（最大PROFILING_MAX_SECONDS秒）サンプリングし、
+    折りたたみ形式のスタック（flamegraph.pl / speedscope で読み込める「スタック 回数」の行）を返します。
+    同時に実行できるプロファイルは1つだけで、実行中に呼び出すと409を返します。
+    Lambdaでは呼び出し中に他のリクエストを処理しないため、常駐するサーバー（uvicorn）で使ってください。
+    呼び出しにはADMIN_API_TOKENのBearerトークンが必要です。
+    """
+    profiler = get_profiler(settings.PROFILING_MAX_SECONDS)
+    if profiler.running:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="プロファイルは既に実行中です")
+    loop = asyncio.get_running_loop()
+    try:
+        # サンプリングはブロッキングのため、イベントループ（プロファイル対象）を止めないよう別スレッドで実行する
+        result = await loop.run_in_executor(None, profiler.profile, seconds, interval_ms / 1000, include_idle)
+    except ProfilerBusyError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return Response(
+        format_collapsed(result["stacks"]),
+        media_type="text/plain",
+        headers={
+            "X-Profile-Duration-Seconds": str(result["duration_seconds"]),
+            "X-Profile-Interval-Seconds": str(result["interval_seconds"]),
+            "X-Profile-Samples": str(result["samples"]),
+            "X-Profile-Idle-Samples": str(result["idle_samples"]),
+        },
+    )
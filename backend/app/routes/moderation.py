@@ -1,19 +1,85 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
+from typing import Dict, List, Optional
+import time
 from ..schemas.moderation import (
     ModerationCheck,
-    ModerationResult,
-    ModerationHistory,
+    ModerationBatchCheck,
+    ModerationBatchResponse,
     ModerationResultResponse,
     ModerationHistoryResponse,
     ModerationStatsResponse,
-    ModerationStats,
+    ModerationTimeseriesResponse,
+    TokenUsageStatsResponse,
+    VerdictCacheInvalidation,
+    VerdictCacheInvalidationResponse,
+    VerdictCacheStatsResponse,
+    WriteBehindStatsResponse,
 )
 from ..services.moderation_service import ModerationService
-from ..middleware.auth_middleware import get_current_user
+from ..middleware.auth_middleware import get_admin_user, get_current_user
+from ..utils.responses import FastJSONResponse, success_response
+from ..config import settings
+
+router = APIRouter(default_response_class=FastJSONResponse)
+_moderation_service: Optional[ModerationService] = None
+
+
+def get_moderation_service() -> ModerationService:
+    """
+    ModerationServiceを最初のリクエスト時に作成して返します（インポート時に作成しないことでコールドスタートを短くする）。
+    """
+    global _moderation_service
+    if _moderation_service is None:
+        _moderation_service = ModerationService()
+    return _moderation_service
+
+
+async def warm_up_moderation_service() -> Dict[str, float]:
+    """
+    ModerationServiceを作成してウォームアップし、/checkと/historyが実際に使うレスポンス生成
+    （success_responseによるresponse_modelでの検証とJSONへの変換）も一度通しておきます。
+    処理ごとの所要時間（ミリ秒）を返します（ウォームアップ済みの場合は空）。
+    """
+    started = time.perf_counter()
+    service = get_moderation_service()
+    created_ms = round((time.perf_counter() - started) * 1000, 3)
+    timings = await service.warm_up()
+    if not timings:
+        return timings
+    timings["service"] = created_ms
+
+    started = time.perf_counter()
+    now = int(time.time())
+    success_response(ModerationResultResponse, {
+        "moderation_id": "warmup",
+        "content": "",
+        "result": "approved",
+        "reason": "",
+        "score": 1.0,
+        "created_at": now,
+        "usage": {"input_tokens": 0, "output_tokens": 0, "estimated": False, "input_truncated": False},
+    })
+    success_response(ModerationHistoryResponse, [{
+        "moderation_id": "warmup",
+        "content_id": "warmup",
+        "content_type": "post",
+        "original_content": "",
+        "moderation_result": "approved",
+        "moderation_reason": "",
+        "moderation_score": 1.0,
+        "created_at": now,
+    }], next_token=None)
+    timings["responses"] = round((time.perf_counter() - started) * 1000, 3)
+    return timings
+
+
+async def shutdown_moderation_service() -> None:
+    """
+    作成済みのModerationServiceを停止します（未作成の場合は何もしません）。
+    """
+    if _moderation_service is not None:
+        await _moderation_service.shutdown()
 
-router = APIRouter()
-moderation_service = ModerationService()
 
 @router.post("/check", response_model=ModerationResultResponse)
 async def check_content(
@@ -24,26 +90,56 @@ async def check_content(
     コンテンツのモデレーションチェックを実行します。
     """
     try:
-        result = await moderation_service.check_content(check_data.content, check_data.content_type)
-        return {"status": "success", "data": result}
+        result = await get_moderation_service().check_content(check_data.content, check_data.content_type)
+        return success_response(ModerationResultResponse, result)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"モデレーションチェック中にエラーが発生しました: {str(e)}"
         )
 
+@router.post("/check/batch", response_model=ModerationBatchResponse)
+async def check_content_batch(
+    batch_data: ModerationBatchCheck,
+    current_user = Depends(get_current_user)
+):
+    """
+    複数コンテンツのモデレーションチェックを一括で実行します。
+    アイテムごとの失敗はerrorに設定され、他のアイテムの処理は継続します。
+    """
+    if len(batch_data.items) > settings.MODERATION_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"一度にチェックできるのは{settings.MODERATION_BATCH_MAX_ITEMS}件までです"
+        )
+    try:
+        items = [{"content": item.content, "content_type": item.content_type} for item in batch_data.items]
+        results = await get_moderation_service().check_content_batch(items)
+        return success_response(ModerationBatchResponse, results)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"一括モデレーションチェック中にエラーが発生しました: {str(e)}"
+        )
+
 @router.get("/history", response_model=ModerationHistoryResponse)
 async def get_moderation_history(
     current_user = Depends(get_current_user),
     limit: int = 10,
-    offset: int = 0
+    next_token: Optional[str] = None
 ):
     """
-    モデレーション履歴を取得します。
+    モデレーション履歴を新しい順に取得します。
+    レスポンスのnext_tokenを次のリクエストに渡すと続きのページを取得できます。
     """
     try:
-        history = await moderation_service.get_moderation_history(limit, offset)
-        return {"status": "success", "data": history}
+        history = await get_moderation_service().get_moderation_history(limit, next_token)
+        return success_response(ModerationHistoryResponse, history["items"], next_token=history["next_token"])
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -58,10 +154,77 @@ async def get_moderation_stats(
     モデレーション統計情報を取得します。
     """
     try:
-        stats = await moderation_service.get_moderation_stats()
-        return {"status": "success", "data": stats}
+        stats = await get_moderation_service().get_moderation_stats()
+        return success_response(ModerationStatsResponse, stats)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"モデレーション統計情報の取得中にエラーが発生しました: {str(e)}"
         )
+
+@router.get("/stats/timeseries", response_model=ModerationTimeseriesResponse)
+async def get_moderation_timeseries(
+    current_user = Depends(get_current_user),
+    granularity: str = "hour",
+    start: Optional[int] = None,
+    end: Optional[int] = None,
+    content_type: Optional[str] = None
+):
+    """
+    時間別（hour/day）・content_type別のモデレーション統計を取得します。
+    start/endはUNIX時刻（秒）で、省略時は直近24時間です。
+    """
+    end = end if end is not None else int(time.time())
+    start = start if start is not None else end - 24 * 3600
+    try:
+        timeseries = await get_moderation_service().get_moderation_timeseries(granularity, start, end, content_type)
+        return success_response(ModerationTimeseriesResponse, timeseries)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"モデレーション時系列統計の取得中にエラーが発生しました: {str(e)}"
+        )
+
+@router.get("/cache/stats", response_model=VerdictCacheStatsResponse)
+async def get_verdict_cache_stats(
+    admin_user = Depends(get_admin_user)
+):
+    """
+    判定キャッシュの統計情報（ヒット率など）を取得します（管理用。ADMIN_API_TOKENが必要です）。
+    """
+    return success_response(VerdictCacheStatsResponse, get_moderation_service().get_verdict_cache_stats())
+
+@router.post("/cache/invalidate", response_model=VerdictCacheInvalidationResponse)
+async def invalidate_verdict_cache(
+    invalidation: VerdictCacheInvalidation,
+    admin_user = Depends(get_admin_user)
+):
+    """
+    判定キャッシュを無効化します。contentを省略するとすべて、content_typeを省略するとそのコンテンツのすべての種別の判定を削除します。
+    すべて無効化するとLLMの呼び出しが増えるため、管理用（ADMIN_API_TOKENが必要）です。
+    """
+    count = get_moderation_service().invalidate_verdict_cache(invalidation.content, invalidation.content_type)
+    return success_response(VerdictCacheInvalidationResponse, {"invalidated_count": count})
+
+@router.get("/write-behind/stats", response_model=WriteBehindStatsResponse)
+async def get_write_behind_stats(
+    admin_user = Depends(get_admin_user)
+):
+    """
+    ライトビハインドバッファの状態（キュー長・書き込みレイテンシなど）を取得します（管理用。ADMIN_API_TOKENが必要です）。
+    """
+    return success_response(WriteBehindStatsResponse, get_moderation_service().get_write_behind_stats())
+
+@router.get("/usage/stats", response_model=TokenUsageStatsResponse)
+async def get_token_usage_stats(
+    admin_user = Depends(get_admin_user)
+):
+    """
+    LLM呼び出しのトークン使用量の累計を取得します（管理用。ADMIN_API_TOKENが必要です）。
+    """
+    return success_response(TokenUsageStatsResponse, get_moderation_service().get_token_usage_stats())
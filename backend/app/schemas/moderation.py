@@ -5,6 +5,12 @@ class ModerationCheck(BaseModel):
     content: str
     content_type: str
 
+class TokenUsage(BaseModel):
+    input_tokens: int = 0
+    output_tokens: int = 0
+    estimated: bool = False
+    input_truncated: bool = False
+
 class ModerationResult(BaseModel):
     moderation_id: str
     content: str
@@ -12,6 +18,7 @@ class ModerationResult(BaseModel):
     reason: str
     score: float
     created_at: int
+    usage: Optional[TokenUsage] = None
 
 class ModerationHistory(BaseModel):
     moderation_id: str
@@ -30,6 +37,7 @@ class ModerationResultResponse(BaseModel):
 class ModerationHistoryResponse(BaseModel):
     status: str
     data: List[ModerationHistory]
+    next_token: Optional[str] = None
 
 class ModerationStats(BaseModel):
     total_count: int
@@ -40,3 +48,90 @@ class ModerationStats(BaseModel):
 class ModerationStatsResponse(BaseModel):
     status: str
     data: ModerationStats
+
+class ModerationTimeseriesPoint(BaseModel):
+    bucket_start: int
+    total_count: int
+    approved_count: int
+    rejected_count: int
+    rejection_rate: float
+
+class ModerationTimeseries(BaseModel):
+    granularity: str
+    content_type: Optional[str] = None
+    start: int
+    end: int
+    points: List[ModerationTimeseriesPoint]
+
+class ModerationTimeseriesResponse(BaseModel):
+    status: str
+    data: ModerationTimeseries
+
+class ModerationBatchCheck(BaseModel):
+    items: List[ModerationCheck]
+
+class ModerationBatchItemResult(BaseModel):
+    index: int
+    status: str
+    data: Optional[ModerationResult] = None
+    error: Optional[str] = None
+
+class ModerationBatchResponse(BaseModel):
+    status: str
+    data: List[ModerationBatchItemResult]
+
+class VerdictCacheInvalidation(BaseModel):
+    content: Optional[str] = None
+    content_type: Optional[str] = None
+
+class VerdictCacheInvalidationResult(BaseModel):
+    invalidated_count: int
+
+class VerdictCacheInvalidationResponse(BaseModel):
+    status: str
+    data: VerdictCacheInvalidationResult
+
+class VerdictCacheStats(BaseModel):
+    enabled: bool
+    size: int = 0
+    max_size: int = 0
+    ttl_seconds: float = 0
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    hit_rate: float = 0
+
+class VerdictCacheStatsResponse(BaseModel):
+    status: str
+    data: VerdictCacheStats
+
+class WriteBehindStats(BaseModel):
+    enabled: bool
+    queue_depth: int = 0
+    flush_count: int = 0
+    flushed_records: int = 0
+    failed_records: int = 0
+    retry_count: int = 0
+    last_flush_ms: float = 0
+    max_flush_ms: float = 0
+    avg_flush_ms: float = 0
+
+class WriteBehindStatsResponse(BaseModel):
+    status: str
+    data: WriteBehindStats
+
+class TokenUsageStats(BaseModel):
+    bedrock_model_id: str
+    prompt_family: str
+    llm_calls: int = 0
+    estimated_calls: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    avg_input_tokens: float = 0
+    avg_output_tokens: float = 0
+    max_input_tokens: int = 0
+    oversize_strategy: str
+
+class TokenUsageStatsResponse(BaseModel):
+    status: str
+    data: TokenUsageStats
@@ -0,0 +1,78 @@
+import re
+from typing import Any, Dict, List
+
+# 文の区切り（日本語の句点・感嘆符・疑問符、英語の終止符、改行）。区切り文字は直前の文に含める
+# 英語の終止符（.）は直後が空白か末尾の場合だけ区切りとみなす（3.14などの小数や.comでは区切らない）
+_SENTENCE_END_RE = re.compile(r"[。．！？!?]+[」』）)]*|\.+[\"')\]]*(?=\s|$)|\n+")
+# 終止符の直前の語（略語の判定用）
+_WORD_BEFORE_DOT_RE = re.compile(r"[A-Za-z][A-Za-z.]*$")
+# 直後で文を区切らない略語（小文字で比較する）
+_ABBREVIATIONS = frozenset({"mr", "mrs", "ms", "dr", "prof", "sr", "jr", "st", "vs", "no", "fig", "approx"})
+
+
+def _is_abbreviation(text: str, dot: int) -> bool:
+    match = _WORD_BEFORE_DOT_RE.search(text, max(0, dot - 16), dot)
+    if match is None:
+        return False
+    word = match.group()
+    # 1文字の頭文字（J. Smith）や、e.g. / U.S. のように途中に.を含む語も略語とみなす
+    return (len(word) == 1 and word.isupper()) or "." in word or word.lower() in _ABBREVIATIONS
+
+
+def split_sentences(text: str) -> List[str]:
+    """
+    テキストを文単位に分割します（空白のみの文は除きます）。
+    """
+    sentences: List[str] = []
+    start = 0
+    for match in _SENTENCE_END_RE.finditer(text):
+        if match.group()[0] == "." and _is_abbreviation(text, match.start()):
+            continue
+        sentences.append(text[start:match.end()])
+        start = match.end()
+    sentences.append(text[start:])
+    return [sentence for sentence in sentences if sentence.strip()]
+
+
+def chunk_content(text: str, max_chars: int) -> List[str]:
+    """
+    文の区切りを保ったまま、1つあたりmax_chars文字以下の塊にまとめます。
+    1文がmax_charsを超える場合だけ、その文を文字数で分割します。
+    """
+    max_chars = max(1, int(max_chars))
+    if len(text) <= max_chars:
+        return [text]
+    chunks: List[str] = []
+    current = ""
+    for sentence in split_sentences(text):
+        if len(current) + len(sentence) <= max_chars:
+            current += sentence
+            continue
+        if current:
+            chunks.append(current)
+            current = ""
+        while len(sentence) > max_chars:
+            chunks.append(sentence[:max_chars])
+            sentence = sentence[max_chars:]
+        current = sentence
+    if current.strip():
+        chunks.append(current)
+    return chunks
+
+
+def aggregate_verdicts(verdicts: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    分割した各塊の判定を1つにまとめます。
+    1つでも拒否があれば拒否（スコアが最も低い拒否の理由を採用）、すべて承認なら承認とし、
+    スコアはいずれも最小値を使います。フォールバックの判定が含まれる場合はその旨を引き継ぎます。
+    """
+    rejected = [v for v in verdicts if v.get("result") == "rejected"]
+    worst = min(rejected or verdicts, key=lambda v: float(v.get("score", 0.5)))
+    aggregated = {
+        "result": "rejected" if rejected else "approved",
+        "reason": worst.get("reason", ""),
+        "score": min(float(v.get("score", 0.5)) for v in verdicts),
+    }
+    if any(v.get("fallback") for v in verdicts):
+        aggregated["fallback"] = True
+    return aggregated
@@ -0,0 +1,221 @@
+import json
+import math
+import re
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:  # orjsonがない環境では標準のjsonを使う
+    orjson = None
+
+# ストリーミング中の部分的な応答から各項目を取り出す（値が閉じたものだけに一致する）
+_RESULT_RE = re.compile(r'"result"\s*:\s*"(approved|rejected)"')
+# 数値は後ろに区切り文字が来るまで確定しない（"0.9" が "0." の時点で一致しないようにする）
+_SCORE_RE = re.compile(r'"score"\s*:\s*(-?\d+(?:\.\d+)?(?:[eE][+-]?\d+)?)\s*[,}\n]')
+_REASON_RE = re.compile(r'"reason"\s*:\s*"((?:[^"\\]|\\.)*)"')
+
+# JSONとしてあり得る書き出し（「{比較的}」のような説明文中の括弧は候補にしない）
+_JSON_START_RE = {
+    "{": re.compile(r'\{\s*["}]'),
+    "[": re.compile(r'\[\s*[\[{\]"\-\dtfn]'),
+}
+_CLOSERS = {"{": "}", "[": "]"}
+# 応答の先頭からこの文字数までしかJSONの書き出しを探さない（長い説明文が続いても走査量が増えないようにする）
+MAX_SCAN_CHARS = 16384
+# 判定1件のJSONは通常数百文字なので、最初と最後の括弧の間がこれより長い場合は説明文を含むとみなす
+# （判定のJSONの書き出しも、"result"キーからこの文字数より前にはないものとして探す）
+MAX_VERDICT_CHARS = 2048
+# 判定のJSON（一括の場合は配列の各要素）が必ず含むキー。これがない応答は括弧を探さずに失敗とする
+VERDICT_ANCHOR = '"result"'
+_decoder = json.JSONDecoder()
+
+VALID_RESULTS = ("approved", "rejected")
+DEFAULT_REASON = "理由が提供されていません"
+STREAM_EARLY_REASON = "判定理由の受信前に判定を確定しました"
+
+
+class VerdictParseError(ValueError):
+    """LLMの応答から判定を取り出せない（JSONがない・形式が不正）場合の例外"""
+
+
+def _unescape(value: str) -> str:
+    if "\\" not in value:
+        return value
+    try:
+        return json.loads(f'"{value}"')
+    except ValueError:
+        return value
+
+
+
+def loads(text: str) -> Any:
+    """
+    JSONを読み込みます。orjsonがあればそれを使います。
+    """
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
+def iter_json_values(text: str, opener: str = "{", max_chars: int = MAX_SCAN_CHARS, start: int = 0) -> Iterator[Any]:
+    """
+    テキスト中のJSONらしい書き出しの位置から、JSONの値（opener="["の場合は配列）を1つずつ読み込み、先頭から順に返します。
+    raw_decodeは括弧の対応が取れた値の終わりまでしか読まないため、後ろに説明文や別のJSONが続いていても読み込めます。
+    読み込めた値の内側は候補にせず、読み込めなかった場合も読み込みが失敗した位置より後ろから探し直します。
+    """
+    search = _JSON_START_RE[opener].search
+    limit = min(len(text), max_chars)
+    match = search(text, start, limit)
+    while match is not None:
+        try:
+            value, end = _decoder.raw_decode(text, match.start())
+        except json.JSONDecodeError as e:
+            # 失敗した位置までは読み込めた途中の値なので、その内側の入れ子は候補にせず1文字ずつ探し直さない
+            match = search(text, max(e.pos, match.start() + 1), limit)
+            continue
+        yield value
+        match = search(text, end, limit)
+
+
+def _first_valid(text: str, opener: str, validate: Callable[[Any], Any], fast_path_chars: int) -> Any:
+    """
+    テキストから、validateを通る最初のJSONを探して検証結果を返します。
+    最初と最後の括弧の間がfast_path_chars文字以下の場合は、その範囲をまとめて読み込むことを先に試します。
+    """
+    start = text.find(opener)
+    end = text.rfind(_CLOSERS[opener], start + 1) if start >= 0 else -1
+    if end < 0:
+        raise VerdictParseError("応答にJSONが含まれていません")
+    # 応答の大半はJSONのみか、前置き・コードブロックで囲まれたJSONなので、最初と最後の括弧の間をまず読み込む
+    # （読み込めた場合は他の候補はその内側にしかないため、検証に失敗してもそのまま失敗とする）
+    if end - start < fast_path_chars:
+        try:
+            data = loads(text[start:end + 1])
+        except ValueError as e:
+            failed_at = getattr(e, "pos", 0)
+        else:
+            return validate(data)
+        # 最初の値の後ろに別のJSONが続く場合は、失敗した位置（最初の値の終わり）までを読み込み直す
+        # （これが判定として不正でも、後ろの値が判定の場合があるため下の探索に進む）
+        if failed_at:
+            try:
+                return validate(loads(text[start:start + failed_at]))
+            except ValueError:
+                pass
+    # 後ろに説明文や別のJSONが続く場合は、書き出しの位置から値を1つずつ読み込んで試す
+    # 判定のJSONは"result"キーの少し前から始まるため、それより前の長い説明文は探さない
+    anchor = text.find(VERDICT_ANCHOR, start, end)
+    if anchor < 0:
+        raise VerdictParseError("応答に判定のJSONが含まれていません")
+    first_error: Optional[VerdictParseError] = None
+    for value in iter_json_values(text, opener, start=max(start, anchor - MAX_VERDICT_CHARS)):
+        try:
+            return validate(value)
+        except VerdictParseError as e:
+            first_error = first_error or e
+    raise first_error or VerdictParseError("応答に読み込めるJSONが含まれていません")
+
+
+def validate_verdict(data: Any) -> Dict[str, Any]:
+    """
+    判定のJSONを検証し、result/reason/scoreだけを持つ辞書にして返します。
+    resultがapproved/rejected以外、scoreが0.0〜1.0の数値でない場合はVerdictParseErrorを送出します。
+    """
+    if not isinstance(data, dict):
+        raise VerdictParseError("判定がJSONオブジェクトではありません")
+    result = data.get("result")
+    if result not in VALID_RESULTS:
+        raise VerdictParseError(f"resultが不正です: {result!r}")
+    score = data.get("score")
+    if isinstance(score, bool) or not isinstance(score, (int, float)):
+        raise VerdictParseError(f"scoreが数値ではありません: {score!r}")
+    score = float(score)
+    if math.isnan(score) or not 0.0 <= score <= 1.0:
+        raise VerdictParseError(f"scoreが0.0〜1.0の範囲外です: {score}")
+    reason = data.get("reason")
+    verdict = {
+        "result": result,
+        "reason": reason if isinstance(reason, str) and reason else DEFAULT_REASON,
+        "score": score,
+    }
+    if data.get("fallback"):
+        verdict["fallback"] = True
+    return verdict
+
+
+def parse_verdict(response: str) -> Dict[str, Any]:
+    """
+    LLMの応答から判定を取り出します。
+    判定のJSONの前後に説明文やコードブロックの記号があっても読み込めます。
+    """
+    return _first_valid(response, "{", validate_verdict, MAX_VERDICT_CHARS)
+
+
+def _validate_verdict_entry(entry: Any) -> Tuple[int, Dict[str, Any]]:
+    verdict = validate_verdict(entry)
+    verdict.pop("fallback", None)
+    entry_id = entry.get("id")
+    if isinstance(entry_id, bool) or not isinstance(entry_id, int):
+        raise VerdictParseError(f"idが不正です: {entry_id!r}")
+    return entry_id, verdict
+
+
+def _validate_verdict_entries(entries: Any) -> Dict[int, Dict[str, Any]]:
+    if not isinstance(entries, list):
+        raise VerdictParseError("判定がJSON配列ではありません")
+    return dict(_validate_verdict_entry(entry) for entry in entries)
+
+
+def parse_verdict_list(response: str, expected_count: int) -> List[Dict[str, Any]]:
+    """
+    一括プロンプトの応答（idを持つ判定のJSON配列）を、id順の判定のリストにします。
+    件数やidが合わない場合はVerdictParseErrorを送出します。
+    """
+    by_id = _first_valid(response, "[", _validate_verdict_entries, MAX_SCAN_CHARS)
+    if sorted(by_id) != list(range(1, expected_count + 1)):
+        raise VerdictParseError(f"件数またはidが一致しません（期待値: {expected_count}件）")
+    return [by_id[i] for i in range(1, expected_count + 1)]
+
+
+class IncrementalVerdictParser:
+    """
+    ストリーミングで届くLLMの応答を逐次受け取り、resultとscoreが揃った時点で判定を返すパーサー。
+    応答の残り（判定理由の続きや説明文）を待たずに判定を確定できます。
+    """
+
+    def __init__(self):
+        self.text = ""
+        self._object_start = -1
+        self.verdict: Optional[Dict[str, Any]] = None
+
+    def feed(self, chunk: str) -> Optional[Dict[str, Any]]:
+        """
+        応答の断片を追加します。判定が初めて確定したときにその判定を返し、それ以外はNoneを返します。
+        """
+        if not chunk:
+            return None
+        self.text += chunk
+        if self.verdict is not None:
+            return None
+        if self._object_start < 0:
+            self._object_start = self.text.find("{")
+            if self._object_start < 0:
+                return None
+
+        result_match = _RESULT_RE.search(self.text, self._object_start)
+        if result_match is None:
+            return None
+        score_match = _SCORE_RE.search(self.text, self._object_start)
+        if score_match is None:
+            return None
+        score = float(score_match.group(1))
+        if not 0.0 <= score <= 1.0:
+            return None
+
+        reason_match = _REASON_RE.search(self.text, self._object_start)
+        self.verdict = {
+            "result": result_match.group(1),
+            "reason": _unescape(reason_match.group(1)) if reason_match else STREAM_EARLY_REASON,
+            "score": score,
+        }
+        return self.verdict
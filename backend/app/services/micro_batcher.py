@@ -0,0 +1,74 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+BatchHandler = Callable[[List[str]], Awaitable[List[Dict[str, Any]]]]
+
+
+class MicroBatcher:
+    """
+    同時に届いた判定要求を短い時間窓でまとめ、1回のハンドラ呼び出し（1プロンプト）で処理します。
+    窓が閉じるか件数がmax_sizeに達した時点でまとめて送信し、結果を各呼び出し元に返します。
+    """
+
+    def __init__(self, handler: BatchHandler, window_ms: float = 20.0, max_size: int = 10):
+        self._handler = handler
+        self.window_seconds = max(0.0, float(window_ms)) / 1000.0
+        self.max_size = max(1, int(max_size))
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: "set[asyncio.Task]" = set()
+        self.batches_sent = 0
+        self.items_sent = 0
+
+    async def submit(self, content: str) -> Dict[str, Any]:
+        """
+        判定要求を登録し、まとめて処理された結果を待ちます。
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((content, future))
+        if len(self._pending) >= self.max_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window_seconds, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, []
+        task = asyncio.get_running_loop().create_task(self._run(batch))
+        # 実行中のタスクがGCされないよう参照を保持する
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[Tuple[str, asyncio.Future]]) -> None:
+        self.batches_sent += 1
+        self.items_sent += len(batch)
+        try:
+            verdicts = await self._handler([content for content, _ in batch])
+            if len(verdicts) != len(batch):
+                raise ValueError(f"判定件数が一致しません: {len(verdicts)} != {len(batch)}")
+        except Exception as e:
+            logger.error(f"まとめて判定中にエラーが発生しました: {str(e)}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), verdict in zip(batch, verdicts):
+            if not future.done():
+                future.set_result(verdict)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pending": len(self._pending),
+            "batches_sent": self.batches_sent,
+            "items_sent": self.items_sent,
+            "average_batch_size": self.items_sent / self.batches_sent if self.batches_sent > 0 else 0,
+        }
@@ -1,14 +1,67 @@
 import uuid
 import time
+import asyncio
 import json
-import boto3
 import logging
-from typing import List, Dict, Any
-from ..db.repositories.moderation_repository import ModerationRepository
+import re
+from contextlib import contextmanager
+from typing import Callable, Iterator, List, Dict, Any, Optional, Tuple
+from ..db.repositories.moderation_repository import ModerationRepository, ROLLUP_GRANULARITIES
+from ..utils.executor import BoundedExecutor
+from ..utils.aws import get_client, resolve_credentials
+from ..utils.metrics import REGISTRY
+from ..utils.tracing import span
+from .verdict_cache import VerdictCache, make_cache_key, make_content_key
+from .micro_batcher import MicroBatcher
+from .single_flight import SingleFlight
+from .llm_parser import IncrementalVerdictParser, parse_verdict, parse_verdict_list
+from .chunker import aggregate_verdicts, chunk_content
+from .prompts import get_model_family
+from .token_estimator import empty_usage, estimate_tokens, make_usage, split_usage, sum_usage, truncate_to_tokens
 from ..config import settings
 
 logger = logging.getLogger(__name__)
 
+# プロンプトの内容を変更したら更新すること（判定キャッシュのキーに含まれる）
+PROMPT_VERSION = "2"
+# 一括プロンプトで1件あたりに確保する最大出力トークン数
+BATCH_MAX_TOKENS_PER_ITEM = 120
+# モックモードで拒否と判定するキーワード（開発用。本番の辞書ルールには含めない）
+MOCK_REJECT_RE = re.compile(r"\b(?:violence|hate|discrimination|spam|harassment)\b", re.IGNORECASE)
+# ウォームアップで各処理を一度通すためのサンプル（結果は保存しない）
+WARMUP_SAMPLE_CONTENT = "ウォームアップ"
+
+STAGE_LATENCY = REGISTRY.histogram(
+    "moderation_stage_duration_seconds",
+    "モデレーションの処理段階（precheck/prompt/llm/parse/store/total）ごとの所要時間（秒）",
+    ("stage",),
+)
+IN_FLIGHT = REGISTRY.gauge("moderation_in_flight_requests", "処理中のモデレーションチェック数", ("operation",))
+RESULTS = REGISTRY.counter("moderation_results_total", "保存したモデレーション結果の件数", ("result",))
+FALLBACKS = REGISTRY.counter(
+    "moderation_fallbacks_total",
+    "LLM呼び出しの失敗・応答の解析失敗でフォールバックした回数",
+    ("reason",),
+)
+CACHE_LOOKUPS = REGISTRY.counter("moderation_verdict_cache_lookups_total", "判定キャッシュの参照回数", ("result",))
+RULE_MATCHES = REGISTRY.counter("moderation_rule_matches_total", "辞書ルールで判定を確定した回数", ("result",))
+LLM_CALLS = REGISTRY.counter("moderation_llm_calls_total", "LLMの呼び出し回数")
+LLM_TOKENS = REGISTRY.counter("moderation_llm_tokens_total", "LLMのトークン使用量", ("direction",))
+# 発生前でも0として出力されるよう、既知のラベルの系列を作っておく
+for _reason in ("llm_error", "parse_error", "batch_parse_error"):
+    FALLBACKS.inc(0, reason=_reason)
+for _result in ("hit", "miss"):
+    CACHE_LOOKUPS.inc(0, result=_result)
+
+
+@contextmanager
+def _stage(stage: str) -> Iterator[None]:
+    """
+    処理段階の所要時間をメトリクスに記録し、サンプリング中のリクエストではスパンとしても記録します。
+    """
+    with STAGE_LATENCY.time(stage=stage), span(stage):
+        yield
+
 class ModerationService:
     def __init__(self):
         self.moderation_repository = ModerationRepository()
@@ -18,60 +71,450 @@ class ModerationService:
             or not settings.AWS_ACCESS_KEY_ID
             or not settings.AWS_SECRET_ACCESS_KEY
         )
-        if not self.mock_mode:
-            self.bedrock_client = boto3.client(
-                service_name='bedrock-runtime',
-                region_name=settings.AWS_REGION,
-                aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-                aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY
-            )
-        else:
-            self.bedrock_client = None
+        # Bedrockクライアントは最初の呼び出し時に作成する（コールドスタートを短くするため）
+        self._bedrock_client = None
         self.model_id = settings.BEDROCK_MODEL_ID
+        # モデルファミリーごとのプロンプトテンプレート・リクエスト形式
+        self.model_family = get_model_family(self.model_id)
+        # LLM呼び出しのトークン使用量の累計
+        self._token_usage = {"llm_calls": 0, "estimated_calls": 0, "input_tokens": 0, "output_tokens": 0}
+        # boto3のinvoke_modelはブロッキングなので、イベントループを止めないよう専用プールで実行する
+        self._llm_executor = BoundedExecutor(
+            max_workers=settings.BEDROCK_MAX_CONCURRENCY,
+            thread_name_prefix="bedrock",
+        )
+        # LLMの前段で明らかな拒否/承認を確定する辞書ルール（モジュールはインポート時間を抑えるため使う場合だけ読み込む）
+        self.rule_engine = None
+        if settings.MODERATION_RULES_ENABLED:
+            from .rule_engine import RuleEngine
+            self.rule_engine = RuleEngine(
+                settings.MODERATION_RULES_PATH,
+                reload_interval_seconds=settings.MODERATION_RULES_RELOAD_INTERVAL_SECONDS,
+            )
+        self.verdict_cache = (
+            VerdictCache(
+                max_size=settings.VERDICT_CACHE_MAX_SIZE,
+                ttl_seconds=settings.VERDICT_CACHE_TTL_SECONDS,
+            )
+            if settings.VERDICT_CACHE_ENABLED
+            else None
+        )
+        self.single_flight = SingleFlight()
+        # 同時に届いた/checkをまとめて1プロンプトで判定するスケジューラ（オプトイン）
+        self.micro_batcher = (
+            MicroBatcher(
+                self._moderate_micro_batch,
+                window_ms=settings.MICRO_BATCH_WINDOW_MS,
+                max_size=settings.MICRO_BATCH_MAX_SIZE,
+            )
+            if settings.MICRO_BATCH_ENABLED
+            else None
+        )
+        self._warmed_up = False
+
+    @property
+    def bedrock_client(self):
+        if self._bedrock_client is None and not self.mock_mode:
+            self._bedrock_client = get_client('bedrock-runtime', read_timeout=settings.BEDROCK_READ_TIMEOUT_SECONDS)
+        return self._bedrock_client
+
+    @bedrock_client.setter
+    def bedrock_client(self, client) -> None:
+        self._bedrock_client = client
 
     async def check_content(self, content: str, content_type: str) -> Dict[str, Any]:
         """
         コンテンツをLLMでモデレーションチェックします。
         """
         try:
-            # LLMにプロンプトを送信
-            prompt = self._create_moderation_prompt(content)
-            response = self._invoke_llm(prompt, content)
-            
-            # レスポンスを解析
-            moderation_result = self._parse_llm_response(response)
-            
-            # モデレーション結果をデータベースに保存
-            moderation_id = str(uuid.uuid4())
-            await self.moderation_repository.create_moderation_record({
-                "moderation_id": moderation_id,
-                "content_id": "temp-" + moderation_id,  # 一時的なID
-                "content_type": content_type,
-                "original_content": content,
-                "moderation_result": moderation_result["result"],
-                "moderation_reason": moderation_result["reason"],
-                "moderation_score": moderation_result["score"],
-                "created_at": int(time.time())
-            })
-            
+            with IN_FLIGHT.track_in_progress(operation="check"), STAGE_LATENCY.time(stage="total"):
+                moderation_result = await self._moderate(content, content_type)
+
+                # モデレーション結果をデータベースに保存
+                moderation_id = str(uuid.uuid4())
+                created_at = int(time.time())
+                with _stage("store"):
+                    await self.moderation_repository.create_moderation_record({
+                        "moderation_id": moderation_id,
+                        "content_id": "temp-" + moderation_id,  # 一時的なID
+                        "content_type": content_type,
+                        "original_content": content,
+                        "moderation_result": moderation_result["result"],
+                        "moderation_reason": moderation_result["reason"],
+                        "moderation_score": moderation_result["score"],
+                        "created_at": created_at
+                    })
+            RESULTS.inc(result=moderation_result["result"])
+
             return {
                 "moderation_id": moderation_id,
                 "content": content,
                 "result": moderation_result["result"],
                 "reason": moderation_result["reason"],
                 "score": moderation_result["score"],
-                "created_at": int(time.time())
+                "created_at": created_at,
+                "usage": moderation_result.get("usage") or empty_usage(),
             }
         except Exception as e:
             logger.error(f"モデレーションチェック中にエラーが発生しました: {str(e)}")
             raise
 
-    async def get_moderation_history(self, limit: int = 10, offset: int = 0) -> List[Dict[str, Any]]:
+    async def check_content_batch(self, items: List[Dict[str, str]]) -> List[Dict[str, Any]]:
         """
-        モデレーション履歴を取得します。
+        複数のコンテンツをまとめてモデレーションチェックします。
+        各アイテムは並行して判定し、結果は一括で保存します。失敗したアイテムはerrorに理由を設定します。
         """
+        with IN_FLIGHT.track_in_progress(operation="check_batch"):
+            return await self._check_content_batch(items)
+
+    async def _check_content_batch(self, items: List[Dict[str, str]]) -> List[Dict[str, Any]]:
+        verdicts: List[Any] = [None] * len(items)
+        pending: List[int] = []
+
+        # 辞書で判定できるもの・キャッシュ済みのものはLLMを呼ばずに確定
+        for index, item in enumerate(items):
+            precheck = self._precheck_verdict(item["content"], item["content_type"])
+            if precheck is not None:
+                verdicts[index] = precheck
+            else:
+                pending.append(index)
+
+        async def moderate_single(index: int) -> None:
+            try:
+                # 辞書・キャッシュは上で確認済みなので、もう一度引かない（キャッシュミスを二重に数えない）
+                verdicts[index] = await self._moderate_after_precheck(items[index]["content"], items[index]["content_type"])
+            except Exception as e:
+                verdicts[index] = e
+
+        async def moderate_packed(indexes: List[int]) -> None:
+            try:
+                packed = await self._moderate_packed([items[i]["content"] for i in indexes])
+            except Exception as e:
+                logger.error(f"一括プロンプトでのモデレーション中にエラーが発生しました: {str(e)}")
+                packed = None
+            if packed is None:
+                # 解析できなかった場合は1件ずつ判定し直す
+                await asyncio.gather(*(moderate_single(i) for i in indexes))
+                return
+            for i, verdict in zip(indexes, packed):
+                verdicts[i] = verdict
+                self._store_cached_verdict(items[i]["content"], items[i]["content_type"], verdict)
+
+        tasks = []
+        if settings.BATCH_PACK_ENABLED:
+            short = [i for i in pending if len(items[i]["content"]) <= settings.BATCH_PACK_MAX_CHARS]
+            long = [i for i in pending if len(items[i]["content"]) > settings.BATCH_PACK_MAX_CHARS]
+            size = max(1, settings.BATCH_PACK_SIZE)
+            for start in range(0, len(short), size):
+                group = short[start:start + size]
+                tasks.append(moderate_packed(group) if len(group) > 1 else moderate_single(group[0]))
+            tasks.extend(moderate_single(i) for i in long)
+        else:
+            tasks.extend(moderate_single(i) for i in pending)
+        await asyncio.gather(*tasks)
+
+        created_at = int(time.time())
+        records: List[Dict[str, Any]] = []
+        results: List[Dict[str, Any]] = []
+        for index, (item, verdict) in enumerate(zip(items, verdicts)):
+            if isinstance(verdict, Exception) or verdict is None:
+                results.append({
+                    "index": index,
+                    "status": "error",
+                    "data": None,
+                    "error": f"モデレーションチェック中にエラーが発生しました: {str(verdict)}",
+                })
+                continue
+            moderation_id = str(uuid.uuid4())
+            records.append({
+                "moderation_id": moderation_id,
+                "content_id": "temp-" + moderation_id,  # 一時的なID
+                "content_type": item["content_type"],
+                "original_content": item["content"],
+                "moderation_result": verdict["result"],
+                "moderation_reason": verdict["reason"],
+                "moderation_score": verdict["score"],
+                "created_at": created_at
+            })
+            results.append({
+                "index": index,
+                "status": "success",
+                "data": {
+                    "moderation_id": moderation_id,
+                    "content": item["content"],
+                    "result": verdict["result"],
+                    "reason": verdict["reason"],
+                    "score": verdict["score"],
+                    "created_at": created_at,
+                    "usage": verdict.get("usage") or empty_usage(),
+                },
+                "error": None,
+            })
+
+        if records:
+            with _stage("store"):
+                await self.moderation_repository.create_moderation_records(records)
+            for record in records:
+                RESULTS.inc(result=record["moderation_result"])
+        return results
+
+    async def _moderate(self, content: str, content_type: str) -> Dict[str, Any]:
+        """
+        コンテンツの判定結果（result/reason/score）を返します。
+        辞書で判定できる場合やキャッシュにある場合はLLMを呼び出しません。
+        """
+        with _stage("precheck"):
+            precheck = self._precheck_verdict(content, content_type)
+        if precheck is not None:
+            return precheck
+        return await self._moderate_after_precheck(content, content_type)
+
+    async def _moderate_after_precheck(self, content: str, content_type: str) -> Dict[str, Any]:
+        """
+        辞書ルール・判定キャッシュで確定しなかったコンテンツをLLMで判定します。
+        """
+        # 同じコンテンツの判定が実行中なら、そのLLM呼び出しの結果を共有する
+        cache_key = make_cache_key(content, content_type, self.model_id, PROMPT_VERSION)
+        moderation_result, leader = await self.single_flight.do(
+            cache_key, lambda: self._moderate_and_store(content, content_type)
+        )
+        # 呼び出し元ごとに独立したdictを返す
+        moderation_result = dict(moderation_result)
+        if leader and "usage" in moderation_result:
+            moderation_result["usage"] = dict(moderation_result["usage"])
+        else:
+            # LLMを呼び出したのは最初の呼び出し元だけなので、結果を共有した呼び出し元のトークン使用量は
+            # キャッシュヒットと同じく0にする（同時に届いたN件でN回分の使用量を報告しない）
+            moderation_result["usage"] = empty_usage()
+        return moderation_result
+
+    async def _moderate_and_store(self, content: str, content_type: str) -> Dict[str, Any]:
+        if self.micro_batcher is not None and len(content) <= settings.BATCH_PACK_MAX_CHARS:
+            # 同時に届いた短いコンテンツと1つのプロンプトにまとめる
+            moderation_result = await self.micro_batcher.submit(content)
+        elif self._should_chunk(content):
+            moderation_result = await self._moderate_chunked(content)
+        elif estimate_tokens(content) > settings.MODERATION_MAX_INPUT_TOKENS:
+            # 入力の上限を超える分は切り詰めて判定する
+            moderation_result = await self._moderate_uncached(
+                truncate_to_tokens(content, settings.MODERATION_MAX_INPUT_TOKENS)
+            )
+            moderation_result["usage"]["input_truncated"] = True
+        else:
+            moderation_result = await self._moderate_uncached(content)
+        self._store_cached_verdict(content, content_type, moderation_result)
+        return moderation_result
+
+    def _should_chunk(self, content: str) -> bool:
+        if settings.MODERATION_CHUNK_ENABLED and len(content) > settings.MODERATION_CHUNK_MAX_CHARS:
+            return True
+        # 入力の上限を超えるコンテンツは、分割判定を無効にしていても分割に回す設定にできる
+        return (
+            settings.MODERATION_OVERSIZE_STRATEGY == "chunk"
+            and estimate_tokens(content) > settings.MODERATION_MAX_INPUT_TOKENS
+        )
+
+    async def _moderate_uncached(self, content: str) -> Dict[str, Any]:
+        """
+        キャッシュを使わずに1件のコンテンツをLLMで判定します。
+        """
+        # LLMにプロンプトを送信
+        with _stage("prompt"):
+            prompt = self._create_moderation_prompt(content)
+        with _stage("llm"):
+            if settings.BEDROCK_STREAMING_ENABLED:
+                response, usage = await self._invoke_llm_stream_async(prompt, content)
+            else:
+                response, usage = await self._invoke_llm_async(prompt, content)
+        self._record_usage(usage)
+
+        # レスポンスを解析
+        with _stage("parse"):
+            verdict = self._parse_llm_response(response)
+        verdict["usage"] = usage
+        return verdict
+
+    async def _moderate_chunked(self, content: str) -> Dict[str, Any]:
+        """
+        長いコンテンツを文の区切りで分割し、塊ごとに並行して判定した結果を1つにまとめます。
+        確信度の高い拒否（スコアが閾値以下）が出た時点で残りの判定は打ち切ります。
+        """
+        # 1文字は概算で多くても1トークンなので、文字数で区切れば各塊は入力の上限に収まる
+        max_chars = min(settings.MODERATION_CHUNK_MAX_CHARS, settings.MODERATION_MAX_INPUT_TOKENS)
+        chunks = chunk_content(content, max_chars)
+        if len(chunks) == 1:
+            return await self._moderate_uncached(chunks[0])
+        semaphore = asyncio.Semaphore(max(1, settings.MODERATION_CHUNK_CONCURRENCY))
+
+        async def _moderate_chunk(chunk: str) -> Dict[str, Any]:
+            async with semaphore:
+                return await self._moderate_uncached(chunk)
+
+        tasks = [asyncio.ensure_future(_moderate_chunk(chunk)) for chunk in chunks]
+        verdicts: List[Dict[str, Any]] = []
+        try:
+            for completed in asyncio.as_completed(tasks):
+                verdict = await completed
+                verdicts.append(verdict)
+                if (
+                    verdict.get("result") == "rejected"
+                    and not verdict.get("fallback")
+                    and float(verdict.get("score", 1.0)) <= settings.MODERATION_CHUNK_REJECT_SCORE_THRESHOLD
+                ):
+                    break
+        finally:
+            # 打ち切った場合・呼び出し元がキャンセルされた場合は、未着手/実行中の塊の判定を止める
+            for task in tasks:
+                task.cancel()
+        aggregated = aggregate_verdicts(verdicts)
+        aggregated["usage"] = sum_usage([v["usage"] for v in verdicts if "usage" in v])
+        return aggregated
+
+    async def _moderate_micro_batch(self, contents: List[str]) -> List[Dict[str, Any]]:
+        """
+        マイクロバッチでまとめられたコンテンツを判定します。
+        一括プロンプトの応答を解析できなかった場合は1件ずつの呼び出しに切り替えます。
+        """
+        if len(contents) == 1:
+            return [await self._moderate_uncached(contents[0])]
+        packed = None
         try:
-            return await self.moderation_repository.get_moderation_history(limit, offset)
+            packed = await self._moderate_packed(contents)
+        except Exception as e:
+            logger.error(f"一括プロンプトでのモデレーション中にエラーが発生しました: {str(e)}")
+        if packed is not None:
+            return packed
+        return list(await asyncio.gather(*(self._moderate_uncached(content) for content in contents)))
+
+    async def _moderate_packed(self, contents: List[str]) -> Optional[List[Dict[str, Any]]]:
+        """
+        複数のコンテンツを1つのプロンプトにまとめて判定します。
+        応答を件数どおりに解析できなかった場合はNoneを返します。
+        """
+        with _stage("prompt"):
+            prompt = self._create_batch_moderation_prompt(contents)
+        with _stage("llm"):
+            response, usage = await self._invoke_llm_batch_async(prompt, contents)
+        self._record_usage(usage)
+        with _stage("parse"):
+            verdicts = self._parse_llm_batch_response(response, len(contents))
+        if verdicts is not None:
+            # 1回の呼び出しのトークン使用量を件数で按分する
+            for verdict, share in zip(verdicts, split_usage(usage, len(verdicts))):
+                verdict["usage"] = share
+        return verdicts
+
+    def _precheck_verdict(self, content: str, content_type: str) -> Optional[Dict[str, Any]]:
+        """
+        LLMを呼ばずに確定できる判定（辞書ルール → 判定キャッシュの順）を返します。
+        """
+        if self.rule_engine is not None:
+            rule_verdict = self.rule_engine.evaluate(content)
+            if rule_verdict is not None:
+                RULE_MATCHES.inc(result=rule_verdict["result"])
+                return rule_verdict
+        return self._get_cached_verdict(content, content_type)
+
+    def _get_cached_verdict(self, content: str, content_type: str) -> Optional[Dict[str, Any]]:
+        if self.verdict_cache is None:
+            return None
+        verdict = self.verdict_cache.get(make_cache_key(content, content_type, self.model_id, PROMPT_VERSION))
+        CACHE_LOOKUPS.inc(result="hit" if verdict is not None else "miss")
+        return verdict
+
+    def _store_cached_verdict(self, content: str, content_type: str, verdict: Dict[str, Any]) -> None:
+        # フォールバック（LLM失敗・解析失敗）の結果はキャッシュしない
+        if self.verdict_cache is None or verdict.get("fallback"):
+            return
+        # トークン使用量はLLMを呼び出したリクエストにだけ付ける
+        cached = {key: value for key, value in verdict.items() if key != "usage"}
+        self.verdict_cache.set(
+            make_cache_key(content, content_type, self.model_id, PROMPT_VERSION),
+            cached,
+            group=make_content_key(content, self.model_id, PROMPT_VERSION),
+        )
+
+    def invalidate_verdict_cache(self, content: Optional[str] = None, content_type: Optional[str] = None) -> int:
+        """
+        判定キャッシュを無効化します。contentを省略した場合はすべて削除し、
+        content_typeを省略した場合はそのコンテンツのすべての種別の判定を削除します。
+        """
+        if self.verdict_cache is None:
+            return 0
+        if content is None:
+            return self.verdict_cache.clear()
+        if content_type is None:
+            return self.verdict_cache.invalidate_group(make_content_key(content, self.model_id, PROMPT_VERSION))
+        cache_key = make_cache_key(content, content_type, self.model_id, PROMPT_VERSION)
+        return 1 if self.verdict_cache.invalidate(cache_key) else 0
+
+    def get_verdict_cache_stats(self) -> Dict[str, Any]:
+        """
+        判定キャッシュの統計情報を取得します。
+        """
+        if self.verdict_cache is None:
+            return {"enabled": False}
+        return {"enabled": True, **self.verdict_cache.stats()}
+
+    async def warm_up(self) -> Dict[str, float]:
+        """
+        最初のリクエストで発生する初期化（クライアント作成・認証情報の解決・DynamoDBへの接続・
+        正規表現やプロンプト生成の初回処理）を先に済ませ、処理ごとの所要時間（ミリ秒）を返します。
+        モデレーションの判定や記録の保存は行いません。2回目以降は何もしません。
+        """
+        if self._warmed_up:
+            return {}
+        timings: Dict[str, float] = {}
+
+        def _timed(name: str, started: float) -> None:
+            timings[name] = round((time.perf_counter() - started) * 1000, 3)
+
+        started = time.perf_counter()
+        if not self.mock_mode:
+            try:
+                resolve_credentials()
+                self.bedrock_client
+            except Exception as e:
+                logger.warning(f"Bedrockクライアントのウォームアップ中にエラーが発生しました: {str(e)}")
+        _timed("bedrock_client", started)
+
+        started = time.perf_counter()
+        await self.moderation_repository.warm_up()
+        _timed("dynamodb", started)
+
+        started = time.perf_counter()
+        make_cache_key(WARMUP_SAMPLE_CONTENT, "post", self.model_id, PROMPT_VERSION)
+        self._create_moderation_prompt(WARMUP_SAMPLE_CONTENT)
+        # 辞書判定と、前置きの付いた応答からJSONを抜き出す経路を一度通す
+        if self.rule_engine is not None:
+            self.rule_engine.evaluate(WARMUP_SAMPLE_CONTENT)
+        sample = json.dumps(self._mock_verdict(WARMUP_SAMPLE_CONTENT), ensure_ascii=False)
+        self._parse_llm_response(f"判定結果: {sample}")
+        _timed("prompt_and_parser", started)
+
+        self._warmed_up = True
+        return timings
+
+    async def shutdown(self) -> None:
+        """
+        停止時の後処理（書き込み待ちの記録をフラッシュ）を行います。
+        """
+        await self.moderation_repository.flush()
+
+    def get_write_behind_stats(self) -> Dict[str, Any]:
+        return self.moderation_repository.get_write_behind_stats()
+
+    async def get_moderation_history(self, limit: int = 10, next_token: Optional[str] = None) -> Dict[str, Any]:
+        """
+        モデレーション履歴を新しい順に取得します。続きがある場合はnext_tokenを返します。
+        """
+        if limit < 1 or limit > settings.MODERATION_HISTORY_MAX_LIMIT:
+            raise ValueError(f"limitは1〜{settings.MODERATION_HISTORY_MAX_LIMIT}の範囲で指定してください")
+        try:
+            items, token = await self.moderation_repository.get_moderation_history(limit, next_token)
+            return {"items": items, "next_token": token}
+        except ValueError:
+            raise
         except Exception as e:
             logger.error(f"モデレーション履歴の取得中にエラーが発生しました: {str(e)}")
             raise
@@ -81,121 +524,292 @@ class ModerationService:
         モデレーション統計情報を取得します。
         """
         try:
-            total_count = await self.moderation_repository.get_total_moderation_count()
-            approved_count = await self.moderation_repository.get_approved_moderation_count()
-            rejected_count = await self.moderation_repository.get_rejected_moderation_count()
+            counters = await self.moderation_repository.get_moderation_counters()
+            total_count = counters["total_count"]
+            approved_count = counters["approved_count"]
+            rejected_count = counters["rejected_count"]
             
             return {
                 "total_count": total_count,
                 "approved_count": approved_count,
                 "rejected_count": rejected_count,
-                "approval_rate": approved_count / total_count if total_count > 0 else 0
+                "approval_rate": approved_count / total_count if total_count > 0 else 0.0
             }
         except Exception as e:
             logger.error(f"モデレーション統計情報の取得中にエラーが発生しました: {str(e)}")
             raise
 
+    async def get_moderation_timeseries(
+        self,
+        granularity: str,
+        start: int,
+        end: int,
+        content_type: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        時間別（hour/day）のモデレーション統計を取得します。データのないバケットは0件として埋めます。
+        """
+        if granularity not in ROLLUP_GRANULARITIES:
+            raise ValueError(f"granularityは{', '.join(ROLLUP_GRANULARITIES)}のいずれかを指定してください")
+        if end < start:
+            raise ValueError("endはstart以降の時刻を指定してください")
+        size = ROLLUP_GRANULARITIES[granularity]
+        first = self.moderation_repository.bucket_start(granularity, start)
+        last = self.moderation_repository.bucket_start(granularity, end)
+        if (last - first) // size + 1 > settings.MODERATION_TIMESERIES_MAX_POINTS:
+            raise ValueError(f"一度に取得できるのは{settings.MODERATION_TIMESERIES_MAX_POINTS}バケットまでです")
+
+        try:
+            rollups = await self.moderation_repository.get_moderation_rollups(granularity, start, end, content_type)
+            by_bucket = {point["bucket_start"]: point for point in rollups}
+            points = []
+            for bucket_start in range(first, last + 1, size):
+                point = by_bucket.get(bucket_start, {})
+                total_count = point.get("total_count", 0)
+                rejected_count = point.get("rejected_count", 0)
+                points.append({
+                    "bucket_start": bucket_start,
+                    "total_count": total_count,
+                    "approved_count": point.get("approved_count", 0),
+                    "rejected_count": rejected_count,
+                    "rejection_rate": rejected_count / total_count if total_count > 0 else 0.0
+                })
+            return {
+                "granularity": granularity,
+                "content_type": content_type,
+                "start": first,
+                "end": last,
+                "points": points
+            }
+        except Exception as e:
+            logger.error(f"モデレーション時系列統計の取得中にエラーが発生しました: {str(e)}")
+            raise
+
     def _create_moderation_prompt(self, content: str) -> str:
         """
         モデレーション用のプロンプトを作成します。
         """
-        return f"""
-        あなたはカープファンのコミュニティサイト「カープコネクト」のコンテンツモデレーターです。
-        以下のコンテンツが適切かどうかを判断してください。
+        return self.model_family.single_template.render(content)
+
+    def _create_batch_moderation_prompt(self, contents: List[str]) -> str:
+        """
+        複数コンテンツをまとめて判定するためのプロンプトを作成します。
+        """
+        numbered = "\n".join(
+            f"[{i}] {json.dumps(content, ensure_ascii=False)}" for i, content in enumerate(contents, start=1)
+        )
+        return self.model_family.batch_template.render(numbered)
+
+    async def _invoke_llm_async(self, prompt: str, content: str) -> Tuple[str, Dict[str, Any]]:
+        """
+        LLM呼び出しを専用スレッドプールで実行し、イベントループをブロックせずに結果を待ちます。
+        """
+        if self.mock_mode:
+            # モックはCPUのみで即座に終わるため、スレッド切り替えのコストを避ける
+            return self._invoke_llm(prompt, content)
+        return await self._llm_executor.run(self._invoke_llm, prompt, content)
+
+    async def _invoke_llm_stream_async(self, prompt: str, content: str) -> Tuple[str, Dict[str, Any]]:
+        """
+        ストリーミングでLLMを呼び出し、判定が確定した時点で結果を返します。
+        残りの応答を読み切る設定の場合、受信は専用スレッドプール上で続きます。
+        """
+        if self.mock_mode:
+            return await self._invoke_llm_async(prompt, content)
+        loop = asyncio.get_running_loop()
+        early: asyncio.Future = loop.create_future()
+
+        def _deliver(result: Tuple[str, Dict[str, Any]]) -> None:
+            if not early.done():
+                early.set_result(result)
+
+        def _on_verdict(response: str, usage: Dict[str, Any]) -> None:
+            loop.call_soon_threadsafe(_deliver, (response, usage))
+
+        stream_task = asyncio.ensure_future(
+            self._llm_executor.run(self._invoke_llm_stream, prompt, _on_verdict)
+        )
+        await asyncio.wait({early, stream_task}, return_when=asyncio.FIRST_COMPLETED)
+        if early.done():
+            return early.result()
+        return stream_task.result()
+
+    async def _invoke_llm_batch_async(self, prompt: str, contents: List[str]) -> Tuple[str, Dict[str, Any]]:
+        """
+        複数コンテンツをまとめたプロンプトでLLMを呼び出します。
+        """
+        if self.mock_mode:
+            response = json.dumps(
+                [{"id": i, **self._mock_verdict(content)} for i, content in enumerate(contents, start=1)],
+                ensure_ascii=False,
+            )
+            return response, self._estimate_usage(prompt, response)
+        max_tokens = BATCH_MAX_TOKENS_PER_ITEM * len(contents)
+        return await self._llm_executor.run(self._invoke_llm, prompt, "", max_tokens)
+
+    def _mock_verdict(self, content: str) -> Dict[str, Any]:
+        """
+        モックモード用の擬似判定を返します。
+        """
+        # 辞書ルールとは独立させ、MODERATION_RULES_ENABLED=Falseでも拒否の経路を確認できるようにする
+        is_rejected = MOCK_REJECT_RE.search(content or "") is not None
+        return {
+            "result": "rejected" if is_rejected else "approved",
+            "reason": "開発モード（モック）で自動判定しました",
+            "score": 0.3 if is_rejected else 0.9,
+        }
 
-        不適切なコンテンツの例：
-        - 暴力的な表現
-        - 差別的な表現
-        - 性的な表現
-        - 誹謗中傷
-        - スパム
-        - 個人情報の漏洩
+    def _estimate_usage(self, prompt: str, completion: str) -> Dict[str, Any]:
+        """
+        Bedrockからトークン数が得られない場合に、文字数からトークン使用量を概算します。
+        """
+        return make_usage(estimate_tokens(prompt), estimate_tokens(completion), estimated=True)
 
-        コンテンツ：
+    def _extract_usage(self, response: Dict[str, Any], payload: Dict[str, Any], prompt: str, completion: str) -> Dict[str, Any]:
         """
-        {content}
+        invoke_modelの応答からトークン使用量を取り出します。
+        応答ヘッダー、応答本文、概算の順に使います。
         """
+        headers = response.get('ResponseMetadata', {}).get('HTTPHeaders', {})
+        input_tokens = headers.get('x-amzn-bedrock-input-token-count')
+        output_tokens = headers.get('x-amzn-bedrock-output-token-count')
+        if input_tokens is not None and output_tokens is not None:
+            return make_usage(int(input_tokens), int(output_tokens), estimated=False)
+        counted = self.model_family.extract_usage(payload)
+        if counted is not None:
+            return make_usage(counted["input_tokens"], counted["output_tokens"], estimated=False)
+        return self._estimate_usage(prompt, completion)
 
-        以下の形式でJSON形式で回答してください：
-        {{
-          "result": "approved" または "rejected",
-          "reason": "判断理由を簡潔に説明",
-          "score": 0.0から1.0の数値（1.0が最も適切）
-        }}
+    def _record_usage(self, usage: Dict[str, Any]) -> None:
+        LLM_CALLS.inc()
+        LLM_TOKENS.inc(usage["input_tokens"], direction="input")
+        LLM_TOKENS.inc(usage["output_tokens"], direction="output")
+        self._token_usage["llm_calls"] += 1
+        if usage.get("estimated"):
+            self._token_usage["estimated_calls"] += 1
+        self._token_usage["input_tokens"] += usage["input_tokens"]
+        self._token_usage["output_tokens"] += usage["output_tokens"]
+
+    def get_token_usage_stats(self) -> Dict[str, Any]:
+        """
+        このプロセスでのLLM呼び出しのトークン使用量の累計を返します。
         """
+        calls = self._token_usage["llm_calls"]
+        return {
+            "bedrock_model_id": self.model_id,
+            "prompt_family": self.model_family.name,
+            **self._token_usage,
+            "avg_input_tokens": self._token_usage["input_tokens"] / calls if calls > 0 else 0,
+            "avg_output_tokens": self._token_usage["output_tokens"] / calls if calls > 0 else 0,
+            "max_input_tokens": settings.MODERATION_MAX_INPUT_TOKENS,
+            "oversize_strategy": settings.MODERATION_OVERSIZE_STRATEGY,
+        }
 
-    def _invoke_llm(self, prompt: str, content: str) -> str:
+    def _invoke_llm(self, prompt: str, content: str, max_tokens: int = 500) -> Tuple[str, Dict[str, Any]]:
         """
-        AWS Bedrock経由でLLMを呼び出します。モックモードではローカルで擬似結果を返します。
+        AWS Bedrock経由でLLMを呼び出し、応答テキストとトークン使用量を返します。
+        モックモードではローカルで擬似結果を返します。
         """
         try:
             if self.mock_mode:
-                lowered = (content or "").lower()
-                is_rejected = any(kw in lowered for kw in [
-                    "violence", "hate", "discrimination", "spam", "harassment"
-                ])
-                mock = {
-                    "result": "rejected" if is_rejected else "approved",
-                    "reason": "開発モード（モック）で自動判定しました",
-                    "score": 0.3 if is_rejected else 0.9,
-                }
-                return json.dumps(mock)
-
-            body = json.dumps({
-                "prompt": prompt,
-                "max_tokens_to_sample": 500,
-                "temperature": 0.1,
-                "top_p": 0.9,
-            })
-            
+                completion = json.dumps(self._mock_verdict(content))
+                return completion, self._estimate_usage(prompt, completion)
+
             response = self.bedrock_client.invoke_model(
                 modelId=self.model_id,
-                body=body
+                body=self.model_family.build_body(prompt, max_tokens)
             )
             
             response_body = json.loads(response.get('body').read())
-            return response_body.get('completion', '')
+            completion = self.model_family.extract_completion(response_body)
+            return completion, self._extract_usage(response, response_body, prompt, completion)
         except Exception as e:
             logger.error(f"LLM呼び出し中にエラーが発生しました: {str(e)}")
+            FALLBACKS.inc(reason="llm_error")
             # フォールバック: デフォルト承認のJSONを返して処理を継続
             return json.dumps({
                 "result": "approved",
                 "reason": "LLM呼び出しに失敗したためデフォルトで承認しました。",
-                "score": 0.5
-            })
+                "score": 0.5,
+                "fallback": True
+            }), empty_usage()
 
-    def _parse_llm_response(self, response: str) -> Dict[str, Any]:
+    def _invoke_llm_stream(
+        self,
+        prompt: str,
+        on_verdict: Callable[[str, Dict[str, Any]], None],
+        max_tokens: int = 500,
+    ) -> Tuple[str, Dict[str, Any]]:
         """
-        LLMのレスポンスを解析します。
+        invoke_model_with_response_streamでLLMを呼び出します。
+        resultとscoreが揃った時点でon_verdictに判定（JSON文字列）とその時点のトークン使用量を渡し、
+        応答全体とトークン使用量を返します。
         """
+        stream = None
         try:
-            # JSON部分を抽出
-            json_str = response.strip()
-            if not json_str.startswith('{'):
-                # JSONが見つからない場合、テキスト内からJSONを探す
-                import re
-                json_match = re.search(r'\{.*\}', json_str, re.DOTALL)
-                if json_match:
-                    json_str = json_match.group(0)
-                else:
-                    # JSONが見つからない場合はデフォルト値を返す
-                    return {
-                        "result": "approved",
-                        "reason": "モデレーション結果の解析に失敗しました。デフォルトで承認します。",
-                        "score": 0.5
-                    }
-            
-            result = json.loads(json_str)
-            return {
-                "result": result.get("result", "approved"),
-                "reason": result.get("reason", "理由が提供されていません"),
-                "score": float(result.get("score", 0.5))
-            }
+            response = self.bedrock_client.invoke_model_with_response_stream(
+                modelId=self.model_id,
+                body=self.model_family.build_body(prompt, max_tokens)
+            )
+            stream = response.get('body')
+            parser = IncrementalVerdictParser()
+            usage = None
+            for event in stream:
+                chunk = event.get('chunk')
+                if not chunk:
+                    continue
+                payload = json.loads(chunk['bytes'])
+                # 最後のイベントにはトークン数（invocationMetrics）が含まれる
+                counted = self.model_family.extract_usage(payload)
+                if counted is not None:
+                    usage = make_usage(counted["input_tokens"], counted["output_tokens"], estimated=False)
+                verdict = parser.feed(self.model_family.extract_stream_text(payload))
+                if verdict is not None:
+                    completion = json.dumps(verdict, ensure_ascii=False)
+                    # 応答の途中で返すため、この時点までの出力で概算する
+                    early_usage = self._estimate_usage(prompt, parser.text)
+                    on_verdict(completion, early_usage)
+                    if settings.BEDROCK_STREAM_CANCEL_REMAINDER:
+                        # 残りの応答（判定理由の続きなど）は受信しない
+                        return completion, early_usage
+            return parser.text, usage or self._estimate_usage(prompt, parser.text)
         except Exception as e:
+            logger.error(f"LLMのストリーミング呼び出し中にエラーが発生しました: {str(e)}")
+            FALLBACKS.inc(reason="llm_error")
+            return json.dumps({
+                "result": "approved",
+                "reason": "LLM呼び出しに失敗したためデフォルトで承認しました。",
+                "score": 0.5,
+                "fallback": True
+            }), empty_usage()
+        finally:
+            if stream is not None and hasattr(stream, 'close'):
+                stream.close()
+
+    def _parse_llm_response(self, response: str) -> Dict[str, Any]:
+        """
+        LLMのレスポンスを解析します。判定を取り出せない場合はデフォルトで承認します。
+        """
+        try:
+            return parse_verdict(response)
+        except ValueError as e:
             logger.error(f"LLMレスポンスの解析中にエラーが発生しました: {str(e)}")
-            # エラーが発生した場合はデフォルト値を返す
+            FALLBACKS.inc(reason="parse_error")
             return {
                 "result": "approved",
                 "reason": f"モデレーション結果の解析に失敗しました: {str(e)}",
-                "score": 0.5
+                "score": 0.5,
+                "fallback": True
             }
+
+    def _parse_llm_batch_response(self, response: str, expected_count: int) -> Optional[List[Dict[str, Any]]]:
+        """
+        一括プロンプトに対するLLMのレスポンス（JSON配列）を解析します。
+        件数が合わない・形式が不正な場合はNoneを返します。
+        """
+        try:
+            return parse_verdict_list(response, expected_count)
+        except ValueError as e:
+            logger.error(f"一括モデレーション結果の解析中にエラーが発生しました: {str(e)}")
+            FALLBACKS.inc(reason="batch_parse_error")
+            return None
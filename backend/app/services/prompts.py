@@ -0,0 +1,177 @@
+import json
+from typing import Any, Dict, Optional
+
+# プロンプトの本文（モデルファミリー共通）。インデントや余分な空白を含めないことで入力トークンを抑える
+SINGLE_INSTRUCTIONS = (
+    "あなたはカープファンのコミュニティサイト「カープコネクト」のコンテンツモデレーターです。\n"
+    "次のコンテンツが適切か判断してください。\n"
+    "不適切な例：暴力的な表現、差別的な表現、性的な表現、誹謗中傷、スパム、個人情報の漏洩\n"
+    "コンテンツ：\n"
+    "<content>{content}</content>\n"
+    '次の形式のJSONのみで回答してください：{"result":"approved"または"rejected",'
+    '"reason":"判断理由（簡潔に）","score":0.0〜1.0（1.0が最も適切）}'
+)
+
+BATCH_INSTRUCTIONS = (
+    "あなたはカープファンのコミュニティサイト「カープコネクト」のコンテンツモデレーターです。\n"
+    "次の番号付きコンテンツそれぞれが適切か判断してください。\n"
+    "不適切な例：暴力的な表現、差別的な表現、性的な表現、誹謗中傷、スパム、個人情報の漏洩\n"
+    "コンテンツ：\n"
+    "{content}\n"
+    '次の形式のJSON配列のみで回答してください：[{"id":番号,"result":"approved"または"rejected",'
+    '"reason":"判断理由（簡潔に）","score":0.0〜1.0（1.0が最も適切）}]'
+)
+
+CONTENT_PLACEHOLDER = "{content}"
+
+
+class PromptTemplate:
+    """
+    プレースホルダーの前後を事前に分割しておき、連結だけでプロンプトを生成するテンプレート。
+    """
+
+    __slots__ = ("_prefix", "_suffix")
+
+    def __init__(self, template: str):
+        self._prefix, self._suffix = template.split(CONTENT_PLACEHOLDER, 1)
+
+    def render(self, content: str) -> str:
+        return self._prefix + content + self._suffix
+
+
+class ModelFamily:
+    """
+    Bedrockのモデルファミリーごとのプロンプト形式・リクエスト本文・応答の取り出し方。
+    """
+
+    name = "base"
+
+    def __init__(self):
+        self.single_template = PromptTemplate(self.wrap(SINGLE_INSTRUCTIONS))
+        self.batch_template = PromptTemplate(self.wrap(BATCH_INSTRUCTIONS))
+
+    def wrap(self, text: str) -> str:
+        return text
+
+    def build_body(self, prompt: str, max_tokens: int) -> str:
+        raise NotImplementedError
+
+    def extract_completion(self, payload: Dict[str, Any]) -> str:
+        raise NotImplementedError
+
+    def extract_stream_text(self, payload: Dict[str, Any]) -> str:
+        raise NotImplementedError
+
+    def extract_usage(self, payload: Dict[str, Any]) -> Optional[Dict[str, int]]:
+        """
+        応答本文に含まれるトークン数を返します（含まれない場合はNone）。
+        """
+        metrics = payload.get("amazon-bedrock-invocationMetrics")
+        if metrics and "inputTokenCount" in metrics:
+            return {
+                "input_tokens": int(metrics["inputTokenCount"]),
+                "output_tokens": int(metrics.get("outputTokenCount", 0)),
+            }
+        return None
+
+
+class AnthropicCompletionFamily(ModelFamily):
+    """Claude v2 / Instant（Text Completions API）"""
+
+    name = "anthropic-completion"
+
+    def wrap(self, text: str) -> str:
+        return f"\n\nHuman: {text}\n\nAssistant:"
+
+    def build_body(self, prompt: str, max_tokens: int) -> str:
+        return json.dumps({
+            "prompt": prompt,
+            "max_tokens_to_sample": max_tokens,
+            "temperature": 0.1,
+            "top_p": 0.9,
+        })
+
+    def extract_completion(self, payload: Dict[str, Any]) -> str:
+        return payload.get("completion", "")
+
+    def extract_stream_text(self, payload: Dict[str, Any]) -> str:
+        return payload.get("completion", "")
+
+
+class AnthropicMessagesFamily(ModelFamily):
+    """Claude 3以降（Messages API）"""
+
+    name = "anthropic-messages"
+
+    def build_body(self, prompt: str, max_tokens: int) -> str:
+        return json.dumps({
+            "anthropic_version": "bedrock-2023-05-31",
+            "max_tokens": max_tokens,
+            "temperature": 0.1,
+            "top_p": 0.9,
+            "messages": [{"role": "user", "content": prompt}],
+        })
+
+    def extract_completion(self, payload: Dict[str, Any]) -> str:
+        return "".join(block.get("text", "") for block in payload.get("content", []) if block.get("type") == "text")
+
+    def extract_stream_text(self, payload: Dict[str, Any]) -> str:
+        if payload.get("type") == "content_block_delta":
+            return payload.get("delta", {}).get("text", "")
+        return ""
+
+    def extract_usage(self, payload: Dict[str, Any]) -> Optional[Dict[str, int]]:
+        usage = payload.get("usage")
+        if usage and "input_tokens" in usage:
+            return {"input_tokens": int(usage["input_tokens"]), "output_tokens": int(usage.get("output_tokens", 0))}
+        return super().extract_usage(payload)
+
+
+class TitanTextFamily(ModelFamily):
+    """Amazon Titan Text"""
+
+    name = "titan"
+
+    def wrap(self, text: str) -> str:
+        return f"User: {text}\nBot:"
+
+    def build_body(self, prompt: str, max_tokens: int) -> str:
+        return json.dumps({
+            "inputText": prompt,
+            "textGenerationConfig": {"maxTokenCount": max_tokens, "temperature": 0.1, "topP": 0.9},
+        })
+
+    def extract_completion(self, payload: Dict[str, Any]) -> str:
+        results = payload.get("results") or [{}]
+        return results[0].get("outputText", "")
+
+    def extract_stream_text(self, payload: Dict[str, Any]) -> str:
+        return payload.get("outputText", "")
+
+    def extract_usage(self, payload: Dict[str, Any]) -> Optional[Dict[str, int]]:
+        if "inputTextTokenCount" in payload:
+            results = payload.get("results") or [{}]
+            return {
+                "input_tokens": int(payload["inputTextTokenCount"]),
+                "output_tokens": int(results[0].get("tokenCount", 0)),
+            }
+        return super().extract_usage(payload)
+
+
+_FAMILIES = {
+    "anthropic-completion": AnthropicCompletionFamily(),
+    "anthropic-messages": AnthropicMessagesFamily(),
+    "titan": TitanTextFamily(),
+}
+
+
+def get_model_family(model_id: str) -> ModelFamily:
+    """
+    モデルIDからモデルファミリーを判定します（不明なモデルはClaude v2と同じ形式として扱います）。
+    """
+    model = (model_id or "").lower()
+    if "amazon.titan-text" in model:
+        return _FAMILIES["titan"]
+    if "anthropic.claude" in model and "claude-v2" not in model and "claude-instant" not in model:
+        return _FAMILIES["anthropic-messages"]
+    return _FAMILIES["anthropic-completion"]
@@ -0,0 +1,218 @@
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
+
+from .verdict_cache import normalize_content
+
+logger = logging.getLogger(__name__)
+
+ACTION_REJECT = "reject"
+ACTION_APPROVE = "approve"
+
+DEFAULT_REJECT_SCORE = 0.1
+DEFAULT_APPROVE_SCORE = 0.95
+
+
+def _is_word_char(ch: str) -> bool:
+    # 英数字とアンダースコアだけを単語の構成文字とみなす（日本語は単語の区切りがないため部分一致で判定する）
+    return ch.isascii() and (ch.isalnum() or ch == "_")
+
+
+class Rule:
+    __slots__ = ("pattern", "action", "score", "reason", "bounded_start", "bounded_end")
+
+    def __init__(self, pattern: str, action: str, score: float, reason: str):
+        self.pattern = pattern
+        self.action = action
+        self.score = score
+        self.reason = reason
+        # 英数字で始まる/終わるパターンは、前後が英数字でない位置（単語の境界）でのみ一致させる
+        self.bounded_start = _is_word_char(pattern[0])
+        self.bounded_end = _is_word_char(pattern[-1])
+
+    def matches_at(self, text: str, end: int) -> bool:
+        """
+        textのend文字目で終わる一致が単語の境界を満たすかどうかを返します。
+        """
+        start = end - len(self.pattern) + 1
+        if self.bounded_start and start > 0 and _is_word_char(text[start - 1]):
+            return False
+        if self.bounded_end and end + 1 < len(text) and _is_word_char(text[end + 1]):
+            return False
+        return True
+
+
+class AhoCorasick:
+    """
+    複数パターンを1回の走査で検出するAho-Corasickオートマトン。
+    パターン数に依存せず、入力長に比例した時間で全一致を列挙します。
+    """
+
+    def __init__(self, patterns: List[str]):
+        # 状態ごとの遷移表・失敗遷移・出力（一致したパターン番号）
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[Tuple[int, ...]] = [()]
+        for index, pattern in enumerate(patterns):
+            self._add(pattern, index)
+        self._build()
+
+    def _add(self, pattern: str, index: int) -> None:
+        state = 0
+        for ch in pattern:
+            next_state = self._goto[state].get(ch)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][ch] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(())
+            state = next_state
+        self._out[state] = self._out[state] + (index,)
+
+    def _build(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(ch, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                if self._out[self._fail[next_state]]:
+                    self._out[next_state] = self._out[next_state] + self._out[self._fail[next_state]]
+
+    @property
+    def state_count(self) -> int:
+        return len(self._goto)
+
+    def iter_matches(self, text: str):
+        """
+        (終了位置, パターン番号) を一致した順に返します。
+        """
+        goto = self._goto
+        fail = self._fail
+        out = self._out
+        state = 0
+        for position, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                for index in out[state]:
+                    yield position, index
+
+
+def load_rules(path: str) -> List[Rule]:
+    """
+    辞書ファイルを読み込みます。
+    1行1ルールのタブ区切り形式: パターン<TAB>reject|approve<TAB>スコア（省略可）<TAB>理由（省略可）
+    空行と#で始まる行は無視します。
+    """
+    rules: List[Rule] = []
+    with open(path, encoding="utf-8") as f:
+        for line_no, line in enumerate(f, start=1):
+            line = line.rstrip("\n")
+            if not line.strip() or line.lstrip().startswith("#"):
+                continue
+            fields = line.split("\t")
+            pattern = normalize_content(fields[0])
+            action = fields[1].strip().lower() if len(fields) > 1 and fields[1].strip() else ACTION_REJECT
+            if not pattern or action not in (ACTION_REJECT, ACTION_APPROVE):
+                logger.warning(f"モデレーション辞書の{line_no}行目を読み飛ばしました: {line}")
+                continue
+            default_score = DEFAULT_REJECT_SCORE if action == ACTION_REJECT else DEFAULT_APPROVE_SCORE
+            try:
+                score = float(fields[2]) if len(fields) > 2 and fields[2].strip() else default_score
+            except ValueError:
+                score = default_score
+            reason = fields[3].strip() if len(fields) > 3 and fields[3].strip() else "モデレーション辞書に一致しました"
+            rules.append(Rule(pattern, action, score, reason))
+    return rules
+
+
+class RuleEngine:
+    """
+    LLMの前段で動く辞書ベースの判定エンジン。
+    明らかな拒否（NGワードを含む）と明らかな承認（定型の応援フレーズそのもの）をLLMなしで確定します。
+    辞書ファイルの更新は一定間隔で検知し、再起動せずに反映します。
+    """
+
+    def __init__(self, path: str, reload_interval_seconds: float = 5.0):
+        self.path = path
+        self.reload_interval_seconds = reload_interval_seconds
+        # ルール一覧とオートマトンは1つのタプルで保持し、読み手が不整合な組を見ないようにする
+        self._compiled: Tuple[List[Rule], AhoCorasick] = ([], AhoCorasick([]))
+        self._mtime: Optional[float] = None
+        self._last_checked = 0.0
+        self._reload_lock = threading.Lock()
+        self.reload()
+
+    @property
+    def rule_count(self) -> int:
+        return len(self._compiled[0])
+
+    def reload(self) -> bool:
+        """
+        辞書ファイルを読み込み直してオートマトンを再構築します。
+        構築中も古いオートマトンで判定を続け、完成後に差し替えます。
+        """
+        with self._reload_lock:
+            try:
+                mtime = os.stat(self.path).st_mtime
+                rules = load_rules(self.path)
+                automaton = AhoCorasick([rule.pattern for rule in rules])
+            except Exception as e:
+                logger.error(f"モデレーション辞書の読み込み中にエラーが発生しました: {str(e)}")
+                return False
+            self._compiled = (rules, automaton)
+            self._mtime = mtime
+            logger.info(f"モデレーション辞書を読み込みました: {len(rules)}件")
+            return True
+
+    def _maybe_reload(self) -> None:
+        now = time.monotonic()
+        if now - self._last_checked < self.reload_interval_seconds:
+            return
+        self._last_checked = now
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except OSError:
+            return
+        if mtime != self._mtime and not self._reload_lock.locked():
+            # 大きな辞書の再構築でリクエスト処理を止めないよう別スレッドで行う
+            threading.Thread(target=self.reload, name="rule-engine-reload", daemon=True).start()
+
+    def evaluate(self, content: str) -> Optional[Dict[str, Any]]:
+        """
+        辞書で判定できる場合は判定結果を、判定できない場合はNoneを返します。
+        """
+        self._maybe_reload()
+        rules, automaton = self._compiled
+        if not rules:
+            return None
+        text = normalize_content(content)
+
+        rejected: Optional[Rule] = None
+        approved: Optional[Rule] = None
+        for end, index in automaton.iter_matches(text):
+            rule = rules[index]
+            if not rule.matches_at(text, end):
+                continue
+            if rule.action == ACTION_REJECT:
+                if rejected is None or rule.score < rejected.score:
+                    rejected = rule
+            elif len(rule.pattern) == len(text) and end == len(text) - 1:
+                # 承認ルールはコンテンツ全体と一致した場合のみ適用する
+                approved = rule
+
+        if rejected is not None:
+            return {"result": "rejected", "reason": rejected.reason, "score": rejected.score, "source": "rules"}
+        if approved is not None:
+            return {"result": "approved", "reason": approved.reason, "score": approved.score, "source": "rules"}
+        return None
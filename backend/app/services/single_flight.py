@@ -0,0 +1,38 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+
+class SingleFlight:
+    """
+    同じキーに対する同時実行中の処理を1つにまとめます。
+    最初の呼び出しだけが処理を実行し、処理中に届いた同じキーの呼び出しはその結果を共有します。
+    """
+
+    def __init__(self):
+        self._in_flight: Dict[str, "asyncio.Task[Any]"] = {}
+        self.executions = 0
+        self.shared = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """
+        (結果, 自分が処理を実行したか) を返します。
+        結果は共有中のすべての呼び出し元で同じオブジェクトなので、変更する場合は呼び出し元でコピーしてください。
+        """
+        task = self._in_flight.get(key)
+        leader = task is None
+        if leader:
+            self.executions += 1
+            task = asyncio.get_running_loop().create_task(fn())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        else:
+            self.shared += 1
+        # 呼び出し元の1つがキャンセルされても、共有中の処理自体は止めない
+        return await asyncio.shield(task), leader
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "in_flight": len(self._in_flight),
+            "executions": self.executions,
+            "shared": self.shared,
+        }
@@ -0,0 +1,73 @@
+from typing import Any, Dict
+
+# トークン数の概算に使う係数（英数字は約4文字で1トークン、日本語などの非ASCII文字は約1文字で1トークン）
+ASCII_CHARS_PER_TOKEN = 4.0
+NON_ASCII_TOKENS_PER_CHAR = 1.0
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    テキストのトークン数を概算します。
+    文字ごとのループを避け、UTF-8のバイト数との差から非ASCII文字数を見積もります。
+    """
+    if not text:
+        return 0
+    length = len(text)
+    extra_bytes = len(text.encode("utf-8")) - length
+    # 日本語の文字はUTF-8で3バイト（1文字あたり2バイト多い）
+    non_ascii = min(length, (extra_bytes + 1) // 2)
+    ascii_chars = length - non_ascii
+    return max(1, int(ascii_chars / ASCII_CHARS_PER_TOKEN + non_ascii * NON_ASCII_TOKENS_PER_CHAR + 0.5))
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """
+    概算トークン数がmax_tokens以下になるよう、テキストの末尾を切り詰めます。
+    """
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    # 1文字は多くても1トークンなので、max_tokens文字から始めて超過分だけ縮める
+    end = min(len(text), max(0, max_tokens) * int(ASCII_CHARS_PER_TOKEN))
+    while end > 0 and estimate_tokens(text[:end]) > max_tokens:
+        over = estimate_tokens(text[:end]) - max_tokens
+        end -= max(1, over)
+    return text[:end]
+
+
+def make_usage(input_tokens: int, output_tokens: int, estimated: bool) -> Dict[str, Any]:
+    return {
+        "input_tokens": int(input_tokens),
+        "output_tokens": int(output_tokens),
+        "estimated": estimated,
+        "input_truncated": False,
+    }
+
+
+def empty_usage() -> Dict[str, Any]:
+    """
+    LLMを呼び出さなかった判定（辞書・キャッシュ）のトークン使用量。
+    """
+    return make_usage(0, 0, estimated=False)
+
+
+def split_usage(usage: Dict[str, Any], count: int) -> list:
+    """
+    一括プロンプトのトークン使用量を件数で按分します（端数は先頭に寄せます）。
+    """
+    count = max(1, count)
+    shares = []
+    for index in range(count):
+        shares.append(make_usage(
+            usage["input_tokens"] // count + (1 if index < usage["input_tokens"] % count else 0),
+            usage["output_tokens"] // count + (1 if index < usage["output_tokens"] % count else 0),
+            usage.get("estimated", False),
+        ))
+    return shares
+
+
+def sum_usage(usages: list) -> Dict[str, Any]:
+    return make_usage(
+        sum(u["input_tokens"] for u in usages),
+        sum(u["output_tokens"] for u in usages),
+        any(u.get("estimated") for u in usages),
+    )
@@ -0,0 +1,143 @@
+import hashlib
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Set, Tuple
+
+
+def normalize_content(content: str) -> str:
+    """
+    キャッシュキー用にコンテンツを正規化します。
+    全角/半角の揺れ（NFKC）、大文字小文字、連続する空白の違いを同一視します。
+    """
+    normalized = unicodedata.normalize("NFKC", content or "").lower()
+    return " ".join(normalized.split())
+
+
+def _digest(*parts: str) -> str:
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+def make_cache_key(content: str, content_type: str, model_id: str, prompt_version: str) -> str:
+    """
+    正規化済みコンテンツ・コンテンツ種別・モデルID・プロンプトバージョンからキーを生成します。
+    """
+    return _digest(normalize_content(content), content_type or "", model_id or "", prompt_version or "")
+
+
+def make_content_key(content: str, model_id: str, prompt_version: str) -> str:
+    """
+    コンテンツ種別を含まないキーを生成します（同じコンテンツのすべての種別の判定をまとめて無効化するために使う）。
+    """
+    return _digest(normalize_content(content), model_id or "", prompt_version or "")
+
+
+class VerdictCache:
+    """
+    LLMの判定結果を保持するサイズ上限付きLRUキャッシュ（TTL付き）。
+    """
+
+    def __init__(self, max_size: int = 10000, ttl_seconds: float = 3600.0):
+        self.max_size = max(0, int(max_size))
+        self.ttl_seconds = float(ttl_seconds)
+        # キー → (期限, 判定, グループ)。グループは同じコンテンツの判定をまとめて無効化するためのキー
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any], Optional[str]]]" = OrderedDict()
+        self._groups: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        キャッシュ済みの判定を返します。存在しない・期限切れの場合はNoneを返します。
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, verdict, _ = entry
+            if expires_at <= now:
+                self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return dict(verdict)
+
+    def set(self, key: str, verdict: Dict[str, Any], group: Optional[str] = None) -> None:
+        """
+        判定を保存します。groupを指定するとinvalidate_groupでまとめて削除できます。
+        上限を超えた場合は最も古く使われたものから削除します。
+        """
+        if self.max_size == 0:
+            return
+        expires_at = time.monotonic() + self.ttl_seconds
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (expires_at, dict(verdict), group)
+            if group is not None:
+                self._groups.setdefault(group, set()).add(key)
+            while len(self._entries) > self.max_size:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _remove(self, key: str) -> bool:
+        # ロックを取得した状態で呼ぶこと
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        group = entry[2]
+        if group is not None:
+            keys = self._groups.get(group)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._groups[group]
+        return True
+
+    def invalidate(self, key: str) -> bool:
+        """
+        指定したキーの判定を削除します。削除した場合はTrueを返します。
+        """
+        with self._lock:
+            return self._remove(key)
+
+    def invalidate_group(self, group: str) -> int:
+        """
+        指定したグループの判定をすべて削除し、削除件数を返します。
+        """
+        with self._lock:
+            keys = list(self._groups.get(group, ()))
+            return sum(1 for key in keys if self._remove(key))
+
+    def clear(self) -> int:
+        """
+        すべての判定を削除し、削除件数を返します。
+        """
+        with self._lock:
+            count = len(self._entries)
+            self._entries.clear()
+            self._groups.clear()
+            return count
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            size = len(self._entries)
+        lookups = self.hits + self.misses
+        return {
+            "size": size,
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups > 0 else 0,
+        }
@@ -0,0 +1,85 @@
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+from ..config import settings
+
+# boto3/botocoreは読み込みに時間がかかるため、最初にクライアントを作成する時点でimportする
+# （モックモードやローカル実装だけで動く場合はimport自体を行わず、コールドスタートを短くする）
+
+# プロセス内で共有するセッションとクライアント/リソース
+# （クライアントごとに接続プールを持つため、使い回すことでTLSハンドシェイクと接続待ちを減らす）
+_lock = threading.Lock()
+_session: Any = None
+_clients: Dict[Tuple[str, Optional[float]], Any] = {}
+_resources: Dict[Tuple[str, Optional[float]], Any] = {}
+
+
+def get_boto_config(read_timeout: Optional[float] = None) -> Any:
+    """
+    接続プール・キープアライブ・タイムアウト・リトライを設定したbotocoreのConfigを返します。
+    """
+    from botocore.config import Config
+
+    return Config(
+        region_name=settings.AWS_REGION,
+        # 専用スレッドプールの全スレッドが同時に接続を使えるよう、プールはスレッド数以上にする
+        max_pool_connections=max(
+            settings.AWS_MAX_POOL_CONNECTIONS,
+            settings.BEDROCK_MAX_CONCURRENCY,
+            settings.DYNAMODB_MAX_CONCURRENCY,
+        ),
+        tcp_keepalive=settings.AWS_TCP_KEEPALIVE,
+        connect_timeout=settings.AWS_CONNECT_TIMEOUT_SECONDS,
+        read_timeout=read_timeout if read_timeout is not None else settings.AWS_READ_TIMEOUT_SECONDS,
+        retries={"mode": settings.AWS_RETRY_MODE, "total_max_attempts": settings.AWS_MAX_ATTEMPTS},
+    )
+
+
+def _get_session() -> Any:
+    global _session
+    if _session is None:
+        import boto3
+
+        _session = boto3.session.Session(
+            region_name=settings.AWS_REGION,
+            aws_access_key_id=settings.AWS_ACCESS_KEY_ID or None,
+            aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY or None,
+        )
+    return _session
+
+
+def get_client(service_name: str, read_timeout: Optional[float] = None) -> Any:
+    """
+    サービスごとに1つだけ作成した共有クライアントを返します（クライアントはスレッドセーフです）。
+    """
+    key = (service_name, read_timeout)
+    client = _clients.get(key)
+    if client is None:
+        with _lock:
+            client = _clients.get(key)
+            if client is None:
+                client = _get_session().client(service_name, config=get_boto_config(read_timeout))
+                _clients[key] = client
+    return client
+
+
+def get_resource(service_name: str, read_timeout: Optional[float] = None) -> Any:
+    """
+    サービスごとに1つだけ作成した共有リソースを返します。
+    """
+    key = (service_name, read_timeout)
+    resource = _resources.get(key)
+    if resource is None:
+        with _lock:
+            resource = _resources.get(key)
+            if resource is None:
+                resource = _get_session().resource(service_name, config=get_boto_config(read_timeout))
+                _resources[key] = resource
+    return resource
+
+
+def resolve_credentials() -> Any:
+    """
+    認証情報を解決します（Lambdaの実行ロールなどは初回の解決に時間がかかるため、ウォームアップで先に行う）。
+    """
+    return _get_session().get_credentials()
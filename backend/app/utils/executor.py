@@ -0,0 +1,68 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
+
+from .metrics import REGISTRY
+
+T = TypeVar("T")
+
+IN_FLIGHT = REGISTRY.gauge(
+    "executor_in_flight_calls",
+    "スレッドプールで実行中・待機中の呼び出し数",
+    ("pool",),
+)
+QUEUE_WAIT = REGISTRY.histogram(
+    "executor_queue_wait_seconds",
+    "スレッドプールの空きを待った時間（秒）",
+    ("pool",),
+)
+
+
+class BoundedExecutor:
+    """
+    ブロッキングI/O（boto3呼び出しなど）をイベントループから切り離して実行する専用スレッドプール。
+    同時実行数はmax_workersで上限が決まり、超過分はキューで待機します。
+    """
+
+    def __init__(self, max_workers: int, thread_name_prefix: str):
+        self.max_workers = max(1, int(max_workers))
+        self.name = thread_name_prefix
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix=thread_name_prefix,
+        )
+        self._lock = threading.Lock()
+        self._in_flight = 0
+
+    @property
+    def in_flight(self) -> int:
+        """
+        実行中・待機中の呼び出し数を返します。
+        """
+        return self._in_flight
+
+    async def run(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """
+        fnをスレッドプール上で実行し、完了を非同期に待ちます。
+        """
+        loop = asyncio.get_running_loop()
+        submitted = time.perf_counter()
+
+        def _call() -> T:
+            QUEUE_WAIT.observe(time.perf_counter() - submitted, pool=self.name)
+            return fn(*args, **kwargs)
+
+        with self._lock:
+            self._in_flight += 1
+        IN_FLIGHT.inc(pool=self.name)
+        try:
+            return await loop.run_in_executor(self._executor, _call)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+            IN_FLIGHT.dec(pool=self.name)
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
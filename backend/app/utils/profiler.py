@@ -0,0 +1,152 @@
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+# サンプリング間隔の範囲（秒）。短すぎるとプロファイル自体がGILを取り合って処理を遅くする
+MIN_INTERVAL_SECONDS = 0.001
+MAX_INTERVAL_SECONDS = 1.0
+# 1サンプルで記録するスタックの最大の深さ（これより深い部分は根元側を省略する）
+MAX_STACK_DEPTH = 128
+# 集計する異なるスタックの最大数（超えた分は1つの行にまとめる）
+MAX_DISTINCT_STACKS = 20000
+TRUNCATED_STACK = "[truncated]"
+
+# 待機中とみなすスタック先端のPython関数（ファイル名, 関数名）
+# イベントループのselect・スレッドプールの空き待ち・Lock/Conditionの待ちなど
+# uvloop（uvicorn[standard]の既定）はループ本体がCで実装されていてselectのフレームがないため、
+# ループを実行しているasyncio.run（runners.py）が先端の場合を待機中とみなす。
+# そのためuvloopでは、ループ自体がC側で行う処理（ソケットの読み書きなど）も待機中に数えられる
+IDLE_FRAMES = frozenset({
+    ("selectors.py", "select"),
+    ("runners.py", "run"),
+    ("thread.py", "_worker"),
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("queue.py", "get"),
+})
+
+
+class ProfilerBusyError(RuntimeError):
+    """
+    プロファイルが既に実行中の場合に送出されます。
+    """
+
+
+def _frame_label(code) -> str:
+    # 折りたたみ形式の区切り文字（;）を含めないようにする
+    filename = os.path.basename(code.co_filename)
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})".replace(";", ":")
+
+
+class SamplingProfiler:
+    """
+    sys._current_frames() で全スレッドのスタックを一定間隔で取得し、
+    flamegraph.pl / speedscope で読み込める折りたたみ形式（collapsed stack）で集計します。
+    対象プロセスにフックを入れないため、有効化しても実行していない間のオーバーヘッドはありません。
+    同時に実行できるプロファイルは1つだけです。
+    """
+
+    def __init__(self, max_duration_seconds: float):
+        self.max_duration_seconds = max_duration_seconds
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._lock.locked()
+
+    def profile(self, duration_seconds: float, interval_seconds: float = 0.01, include_idle: bool = False) -> Dict[str, object]:
+        """
+        呼び出したスレッドでduration_seconds秒間サンプリングし、結果を返します（ブロッキング）。
+        実行中のプロファイルがある場合はProfilerBusyErrorを送出します。
+        """
+        if duration_seconds <= 0:
+            raise ValueError("プロファイルの時間は0より大きくしてください")
+        duration = min(duration_seconds, self.max_duration_seconds)
+        interval = min(max(interval_seconds, MIN_INTERVAL_SECONDS), MAX_INTERVAL_SECONDS)
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusyError("プロファイルは既に実行中です")
+        try:
+            return self._sample(duration, interval, include_idle)
+        finally:
+            self._lock.release()
+
+    def _sample(self, duration: float, interval: float, include_idle: bool) -> Dict[str, object]:
+        own_ident = threading.get_ident()
+        # 同じコードオブジェクトのラベルを毎回組み立てないようにキャッシュする（実行ごとに破棄する）
+        labels: Dict[object, str] = {}
+        stacks: Counter = Counter()
+        samples = idle = 0
+        started = time.perf_counter()
+        deadline = started + duration
+        next_tick = started
+        while time.perf_counter() < deadline:
+            thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+            frames = sys._current_frames()
+            for ident, frame in frames.items():
+                if ident == own_ident:
+                    continue
+                if not include_idle and self._is_idle(frame):
+                    idle += 1
+                    continue
+                thread_name = str(thread_names.get(ident, ident)).replace(";", ":")
+                key = f"{thread_name};{self._collapse(frame, labels)}"
+                if key not in stacks and len(stacks) >= MAX_DISTINCT_STACKS:
+                    key = TRUNCATED_STACK
+                stacks[key] += 1
+                samples += 1
+            # フレームへの参照を持ち続けるとローカル変数が解放されないため、すぐに手放す
+            frames = frame = None
+            next_tick += interval
+            now = time.perf_counter()
+            if next_tick > now:
+                time.sleep(min(next_tick, deadline) - now)
+            else:
+                # 処理が間に合わなかった場合は追いつこうとせず、次の間隔から再開する
+                next_tick = now
+        return {
+            "duration_seconds": round(time.perf_counter() - started, 3),
+            "interval_seconds": interval,
+            "samples": samples,
+            "idle_samples": idle,
+            "stacks": stacks,
+        }
+
+    @staticmethod
+    def _collapse(frame, labels: Dict[object, str]) -> str:
+        names: List[str] = []
+        while frame is not None and len(names) < MAX_STACK_DEPTH:
+            code = frame.f_code
+            label = labels.get(code)
+            if label is None:
+                label = labels[code] = _frame_label(code)
+            names.append(label)
+            frame = frame.f_back
+        # 折りたたみ形式は根元 → 先端の順
+        names.reverse()
+        return ";".join(names)
+
+    @staticmethod
+    def _is_idle(frame) -> bool:
+        code = frame.f_code
+        return (os.path.basename(code.co_filename), code.co_name) in IDLE_FRAMES
+
+
+def format_collapsed(stacks: Counter) -> str:
+    """
+    「スタック 回数」の行を回数の多い順に並べた文字列を返します。
+    """
+    lines: List[Tuple[str, int]] = stacks.most_common()
+    return "".join(f"{stack} {count}\n" for stack, count in lines)
+
+
+_profiler: Optional[SamplingProfiler] = None
+
+
+def get_profiler(max_duration_seconds: float) -> SamplingProfiler:
+    global _profiler
+    if _profiler is None:
+        _profiler = SamplingProfiler(max_duration_seconds)
+    return _profiler
@@ -0,0 +1,32 @@
+import json
+from typing import Any, Type
+
+from pydantic import BaseModel
+from starlette.responses import JSONResponse, Response
+
+try:
+    import orjson
+except ImportError:  # orjsonがない環境では標準のjsonを使う
+    orjson = None
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    orjsonでシリアライズするJSONレスポンス（orjsonがない場合は標準のjsonで同じ形式を出力します）。
+    """
+
+    def render(self, content: Any) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+        return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def success_response(model: Type[BaseModel], data: Any, **extra: Any) -> Response:
+    """
+    {"status": "success", "data": ...} 形式のレスポンスを返します。
+    response_model（model）で検証してからpydanticでそのままJSONにするため、FastAPIによる再検証と
+    jsonable_encoderによる変換（dictへの展開）を省きつつ、スキーマにない項目・型の違い（floatの項目の整数など）は
+    response_modelを返す場合と同じく除外・変換されます（ルートのresponse_modelには同じモデルを指定してください）。
+    """
+    body = model.model_validate({"status": "success", "data": data, **extra}).model_dump_json()
+    return Response(body, media_type="application/json")
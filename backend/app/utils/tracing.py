@@ -0,0 +1,135 @@
+import time
+import uuid
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from typing import Any, ContextManager, Dict, Iterator, List, Optional
+
+# 1リクエストで記録するスパンの上限（ループ内で大量に記録されてもメモリを使い切らない）
+MAX_SPANS_PER_TRACE = 256
+
+
+class Span:
+    __slots__ = ("name", "started", "duration", "detail")
+
+    def __init__(self, name: str, started: float, duration: float, detail: Optional[str]):
+        self.name = name
+        self.started = started
+        self.duration = duration
+        self.detail = detail
+
+
+class Trace:
+    """
+    1リクエスト分のスパン（認証・LLM呼び出し・応答の解析・DB書き込みなど）を保持します。
+    """
+
+    def __init__(self, trace_id: Optional[str] = None):
+        self.trace_id = trace_id or uuid.uuid4().hex
+        self.started = time.perf_counter()
+        self.spans: List[Span] = []
+        self.dropped = 0
+        # レスポンス完了後は記録しない（リクエスト中に起動されたバックグラウンド処理が記録し続けないように）
+        self.closed = False
+
+    def add(self, name: str, started: float, duration: float, detail: Optional[str] = None) -> None:
+        if self.closed:
+            return
+        if len(self.spans) >= MAX_SPANS_PER_TRACE:
+            self.dropped += 1
+            return
+        self.spans.append(Span(name, started, duration, detail))
+
+    def _ordered_spans(self) -> List[Span]:
+        # スパンは終了時に追加されるため、入れ子（storeの中のdbなど）が外側より先に並ぶ。開始順に並べ直す
+        return sorted(self.spans, key=lambda span: span.started)
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.started) * 1000
+
+    def server_timing(self, total_ms: float) -> str:
+        """
+        Server-Timingヘッダーの値を返します。同じ名前のスパンは合計し、2回以上の場合は回数をdescに入れます。
+        """
+        totals: Dict[str, List[float]] = {}
+        for span in self._ordered_spans():
+            entry = totals.setdefault(span.name, [0.0, 0])
+            entry[0] += span.duration
+            entry[1] += 1
+        parts = []
+        for name, (duration, count) in totals.items():
+            desc = f';desc="x{count}"' if count > 1 else ""
+            parts.append(f"{name}{desc};dur={duration * 1000:.1f}")
+        parts.append(f"total;dur={total_ms:.1f}")
+        return ", ".join(parts)
+
+    def to_log(self, total_ms: float, **fields: Any) -> Dict[str, Any]:
+        """
+        JSONログ用の辞書を返します（スパンの開始時刻はリクエスト開始からのミリ秒）。
+        """
+        spans = []
+        for span in self._ordered_spans():
+            item = {
+                "name": span.name,
+                "start_ms": round((span.started - self.started) * 1000, 2),
+                "duration_ms": round(span.duration * 1000, 2),
+            }
+            if span.detail:
+                item["detail"] = span.detail
+            spans.append(item)
+        log = {"trace_id": self.trace_id, **fields, "duration_ms": round(total_ms, 2), "spans": spans}
+        if self.dropped:
+            log["dropped_spans"] = self.dropped
+        return log
+
+
+_current_trace: ContextVar[Optional[Trace]] = ContextVar("current_trace", default=None)
+
+
+def current_trace() -> Optional[Trace]:
+    return _current_trace.get()
+
+
+@contextmanager
+def start_trace(trace_id: Optional[str] = None) -> Iterator[Trace]:
+    """
+    新しいトレースを開始し、withブロックの間だけ現在のコンテキスト（このリクエストの処理と、そこから起動したタスク）に設定します。
+    ブロックを抜けると以降のスパンは記録しません。
+    """
+    trace = Trace(trace_id)
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        trace.closed = True
+        _current_trace.reset(token)
+
+
+class _SpanContext:
+    __slots__ = ("trace", "name", "detail", "started")
+
+    def __init__(self, trace: Trace, name: str, detail: Optional[str]):
+        self.trace = trace
+        self.name = name
+        self.detail = detail
+
+    def __enter__(self) -> None:
+        self.started = time.perf_counter()
+
+    def __exit__(self, *exc_info: Any) -> bool:
+        self.trace.add(self.name, self.started, time.perf_counter() - self.started, self.detail)
+        return False
+
+
+_NOOP_SPAN = nullcontext()
+
+
+def span(name: str, detail: Optional[str] = None) -> ContextManager[None]:
+    """
+    withブロックの所要時間を現在のトレースに記録します。
+    サンプリングされていないリクエスト（トレースがない場合）は共有の空のコンテキストを返し、時刻も取得しません。
+    スレッドプールで実行される関数にはコンテキストが引き継がれないため、await する側で囲んでください。
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        return _NOOP_SPAN
+    return _SpanContext(trace, name, detail)
@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+"""
+履歴用GSIのバケット属性（history_bucket）のバックフィルスクリプト
+GSI追加前に作成された記録は/historyに表示されないため、一度だけ実行してください
+
+使い方:
+    python scripts/backfill_history_buckets.py
+"""
+
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from app.db.repositories.moderation_repository import ModerationRepository  # noqa: E402
+
+
+def main():
+    repository = ModerationRepository()
+    if repository.mock_mode:
+        print("[WARN] モックモードのため、バックフィルは不要です")
+        return
+    print("[START] history_bucketのバックフィルを実行中...")
+    updated = asyncio.run(repository.backfill_history_buckets())
+    print(f"[SUCCESS] {updated}件の記録を更新しました")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+ベンチマーク用のローカルBedrockスタブ
+invoke_modelと同じ呼び出し形式で、指定した遅延を挟んでから固定の判定結果を返します
+invoke_model_with_response_streamでは応答を一定間隔の断片に分けて返します
+verbose=Trueの場合は判定JSONの後に冗長な説明文が続き、invoke_modelは全文の生成時間分だけ待ちます
+"""
+
+import io
+import json
+import random
+import re
+import threading
+import time
+from typing import Any, Dict, Iterator
+
+# 判定JSONの後に続く冗長な説明文（ストリーミングで早期に判定できる効果を確認するため）
+VERBOSE_TRAILER = "\n\n補足: この判定はコミュニティガイドラインの各項目に照らして行いました。" * 8
+# 一括プロンプトの番号付きコンテンツ（"[1] ..." の行）
+_NUMBERED_ITEM_RE = re.compile(r"^\[(\d+)\] (.*)$", re.MULTILINE)
+
+
+class StubEventStream:
+    """botocoreのEventStreamと同じくイテレーションとclose()ができるストリーム"""
+
+    def __init__(self, events: Iterator[Dict[str, Any]]):
+        self._events = events
+        self.closed = False
+
+    def __iter__(self):
+        for event in self._events:
+            if self.closed:
+                return
+            yield event
+
+    def close(self) -> None:
+        self.closed = True
+
+
+class LatencyBedrockStub:
+    """レイテンシを注入できるbedrock-runtimeクライアントの代用品"""
+
+    def __init__(
+        self,
+        latency_ms: float = 200.0,
+        jitter_ms: float = 0.0,
+        stream_chunk_chars: int = 16,
+        stream_chunk_ms: float = 20.0,
+        verbose: bool = False,
+    ):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.stream_chunk_chars = max(1, stream_chunk_chars)
+        self.stream_chunk_ms = stream_chunk_ms
+        self.verbose = verbose
+        self._lock = threading.Lock()
+        self.call_count = 0
+        self.streamed_chunks = 0
+
+    def _sleep(self) -> None:
+        delay = self.latency_ms + random.uniform(-self.jitter_ms, self.jitter_ms)
+        # boto3と同じくスレッドをブロックする
+        time.sleep(max(0.0, delay) / 1000.0)
+
+    @staticmethod
+    def _verdict_for(text: str) -> Dict[str, Any]:
+        lowered = text.lower()
+        is_rejected = "spam" in lowered or "hate" in lowered
+        return {
+            "result": "rejected" if is_rejected else "approved",
+            "reason": "ベンチマーク用スタブの判定です",
+            "score": 0.2 if is_rejected else 0.95,
+        }
+
+    def _completion_for(self, prompt: str) -> str:
+        items = _NUMBERED_ITEM_RE.findall(prompt)
+        if items:
+            # 一括プロンプトには番号ごとの判定をJSON配列で返す
+            completion = json.dumps(
+                [{"id": int(number), **self._verdict_for(text)} for number, text in items],
+                ensure_ascii=False,
+            )
+        else:
+            completion = json.dumps(self._verdict_for(prompt), ensure_ascii=False)
+        return completion + VERBOSE_TRAILER if self.verbose else completion
+
+    def _generation_ms(self, completion: str) -> float:
+        # ストリーミング時に最後の断片が届くまでと同じ時間
+        chunks = (len(completion) + self.stream_chunk_chars - 1) // self.stream_chunk_chars
+        return max(0, chunks - 1) * self.stream_chunk_ms
+
+    def invoke_model(self, modelId: str, body: str, **kwargs: Any) -> Dict[str, Any]:
+        with self._lock:
+            self.call_count += 1
+        self._sleep()
+        prompt = json.loads(body).get("prompt", "")
+        completion = self._completion_for(prompt)
+        if self.verbose:
+            time.sleep(self._generation_ms(completion) / 1000.0)
+        payload = json.dumps({"completion": completion}).encode("utf-8")
+        return {"body": io.BytesIO(payload)}
+
+    def invoke_model_with_response_stream(self, modelId: str, body: str, **kwargs: Any) -> Dict[str, Any]:
+        with self._lock:
+            self.call_count += 1
+        prompt = json.loads(body).get("prompt", "")
+        completion = self._completion_for(prompt)
+
+        def _events() -> Iterator[Dict[str, Any]]:
+            # 最初の断片までの遅延（latency_ms）の後、stream_chunk_msごとに断片を返す
+            self._sleep()
+            for start in range(0, len(completion), self.stream_chunk_chars):
+                if start:
+                    time.sleep(self.stream_chunk_ms / 1000.0)
+                with self._lock:
+                    self.streamed_chunks += 1
+                piece = completion[start:start + self.stream_chunk_chars]
+                yield {"chunk": {"bytes": json.dumps({"completion": piece}).encode("utf-8")}}
+
+        return {"body": StubEventStream(_events())}
@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+モデレーションAPIの負荷・レイテンシベンチマーク
+FastAPIアプリをプロセス内で動かし、レイテンシを注入したBedrockスタブとローカル用DynamoDB代替実装に対して
+/check・/history・/stats（および混在ワークロード）を指定した並列度で実行し、
+スループットとp50/p95/p99レイテンシをJSONで出力します
+
+--baselineに以前の結果（--outputで保存したJSON）を渡すと、スループットの低下やp95の悪化が
+--max-regressionを超えたシナリオを報告し、終了コード1で終了します（CIでの回帰チェック用）
+
+使い方:
+    python scripts/benchmark_api.py --concurrency 50 --requests 1000 --bedrock-latency-ms 200
+    python scripts/benchmark_api.py --scenarios check,mixed --output results.json
+    python scripts/benchmark_api.py --baseline results.json --max-regression 0.2
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# サービスはモックモード（AWSに接続しない）で作成し、BedrockとDynamoDBを差し替える
+os.environ["AWS_ACCESS_KEY_ID"] = ""
+os.environ["AWS_SECRET_ACCESS_KEY"] = ""
+os.environ.setdefault("WARMUP_ON_STARTUP", "False")
+
+import httpx  # noqa: E402
+from app.main import app  # noqa: E402
+from app.config import settings  # noqa: E402
+from app.db.dynamodb import FakeDynamoDBBackend, FakeDynamoDBResource  # noqa: E402
+from app.db.repositories.moderation_repository import ModerationRepository  # noqa: E402
+from app.routes import moderation as moderation_routes  # noqa: E402
+from bedrock_stub import LatencyBedrockStub  # noqa: E402
+
+SCENARIOS = ("check", "history", "stats", "mixed")
+HEADERS = {"Authorization": "Bearer dev-token"}
+# 繰り返し投稿される定型コメント（判定キャッシュに当たるリクエスト）
+REPEATED_CONTENTS = [f"ナイスピッチ！今日もがんばれカープ {i}" for i in range(20)]
+
+
+def percentile(values, p):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p))] if ordered else 0.0
+
+
+def summarize(latencies: List[float], errors: int, elapsed: float) -> Dict[str, Any]:
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "elapsed_sec": round(elapsed, 3),
+        "requests_per_sec": round(len(latencies) / elapsed, 2) if elapsed > 0 else 0.0,
+        "latency_ms": {
+            "p50": round(percentile(latencies, 0.50), 2),
+            "p95": round(percentile(latencies, 0.95), 2),
+            "p99": round(percentile(latencies, 0.99), 2),
+            "max": round(max(latencies), 2) if latencies else 0.0,
+        },
+    }
+
+
+def median_summary(rounds: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    複数回の計測結果を、項目ごとの中央値にまとめます（1回ごとのばらつきで回帰と誤判定しないようにする）。
+    """
+    merged: Dict[str, Any] = {}
+    for key, value in rounds[0].items():
+        values = [r[key] for r in rounds if key in r]
+        if isinstance(value, dict):
+            merged[key] = median_summary(values)
+        elif isinstance(value, (int, float)):
+            merged[key] = round(statistics.median(values), 3)
+        else:
+            merged[key] = value
+    return merged
+
+
+def parse_mix(value: str) -> List[Tuple[str, int]]:
+    """
+    "check=70,history=20,stats=10" 形式の混在比率を読み込みます。
+    """
+    mix = []
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in ("check", "history", "stats"):
+            raise ValueError(f"不明なエンドポイントです: {name}")
+        mix.append((name, int(weight)))
+    return mix
+
+
+def setup(args) -> Tuple[LatencyBedrockStub, FakeDynamoDBBackend]:
+    backend = FakeDynamoDBBackend(
+        latency_ms=args.dynamodb_latency_ms,
+        throttle_rate=args.dynamodb_throttle_rate,
+        seed=args.seed,
+    )
+    backend.create_moderation_tables()
+    stub = LatencyBedrockStub(latency_ms=args.bedrock_latency_ms, jitter_ms=args.bedrock_jitter_ms)
+
+    service = moderation_routes.get_moderation_service()
+    service.moderation_repository = ModerationRepository(dynamodb=FakeDynamoDBResource(backend))
+    service.mock_mode = False
+    service.bedrock_client = stub
+    return stub, backend
+
+
+async def seed_history(count: int) -> None:
+    repository = moderation_routes.get_moderation_service().moderation_repository
+    now = int(time.time())
+    records = []
+    for i in range(count):
+        moderation_id = str(uuid.uuid4())
+        records.append({
+            "moderation_id": moderation_id,
+            "content_id": "temp-" + moderation_id,
+            "content_type": "comment" if i % 3 else "post",
+            "original_content": f"今日の試合は最高でした！カープ優勝目指して頑張れ #{i}",
+            "moderation_result": "rejected" if i % 10 == 0 else "approved",
+            "moderation_reason": "ベンチマーク用の記録です",
+            "moderation_score": 0.2 if i % 10 == 0 else 0.95,
+            "created_at": now - i,
+        })
+    for start in range(0, len(records), 100):
+        await repository.create_moderation_records(records[start:start + 100])
+
+
+def make_requests(client: httpx.AsyncClient, args, rng: random.Random) -> Dict[str, Callable[[int], Awaitable[httpx.Response]]]:
+    def check(i: int) -> Awaitable[httpx.Response]:
+        if rng.random() < args.repeat_ratio:
+            content = rng.choice(REPEATED_CONTENTS)
+        else:
+            content = f"{uuid.uuid4().hex[:8]} 今日の{rng.choice(['先発', '打線', '守備', '采配'])}について一言"
+        return client.post(
+            "/api/moderation/check",
+            json={"content": content, "content_type": "comment"},
+            headers=HEADERS,
+        )
+
+    def history(i: int) -> Awaitable[httpx.Response]:
+        return client.get(f"/api/moderation/history?limit={args.history_limit}", headers=HEADERS)
+
+    def stats(i: int) -> Awaitable[httpx.Response]:
+        return client.get("/api/moderation/stats", headers=HEADERS)
+
+    return {"check": check, "history": history, "stats": stats}
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    choose: Callable[[int], str],
+    requests: Dict[str, Callable[[int], Awaitable[httpx.Response]]],
+    total: int,
+    concurrency: int,
+) -> Dict[str, Any]:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: Dict[str, List[float]] = {}
+    errors: Dict[str, int] = {}
+
+    async def one(i: int) -> None:
+        name = choose(i)
+        async with semaphore:
+            t0 = time.perf_counter()
+            response = await requests[name](i)
+            latencies.setdefault(name, []).append((time.perf_counter() - t0) * 1000)
+            if response.status_code != 200:
+                errors[name] = errors.get(name, 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    elapsed = time.perf_counter() - start
+
+    every = [latency for values in latencies.values() for latency in values]
+    result = summarize(every, sum(errors.values()), elapsed)
+    if len(latencies) > 1:
+        result["by_endpoint"] = {
+            name: summarize(values, errors.get(name, 0), elapsed) for name, values in sorted(latencies.items())
+        }
+    return result
+
+
+async def run(args) -> Dict[str, Any]:
+    stub, backend = setup(args)
+    await seed_history(args.seed_records)
+    rng = random.Random(args.seed)
+    mix = parse_mix(args.mix)
+    weighted = [name for name, weight in mix for _ in range(weight)]
+
+    results: Dict[str, Any] = {}
+    async with httpx.AsyncClient(app=app, base_url="http://bench") as client:
+        requests = make_requests(client, args, rng)
+        for scenario in args.scenarios:
+            if scenario == "mixed":
+                choose = lambda i: rng.choice(weighted)  # noqa: E731
+            else:
+                choose = lambda i, name=scenario: name  # noqa: E731
+            # 接続・キャッシュ・スレッドプールの立ち上がりを計測に含めない
+            if args.warmup > 0:
+                await run_scenario(client, choose, requests, args.warmup, args.concurrency)
+            rounds = [
+                await run_scenario(client, choose, requests, args.requests, args.concurrency)
+                for _ in range(max(1, args.rounds))
+            ]
+            results[scenario] = {"rounds": len(rounds), **median_summary(rounds)}
+
+    await moderation_routes.shutdown_moderation_service()
+    return {
+        "config": {
+            "scenarios": list(args.scenarios),
+            "requests": args.requests,
+            "rounds": args.rounds,
+            "concurrency": args.concurrency,
+            "bedrock_latency_ms": args.bedrock_latency_ms,
+            "dynamodb_latency_ms": args.dynamodb_latency_ms,
+            "history_limit": args.history_limit,
+            "repeat_ratio": args.repeat_ratio,
+            "mix": args.mix,
+            "streaming": settings.BEDROCK_STREAMING_ENABLED,
+            "micro_batch": settings.MICRO_BATCH_ENABLED,
+            "write_behind": settings.WRITE_BEHIND_ENABLED,
+        },
+        "scenarios": results,
+        "bedrock_calls": stub.call_count,
+        "dynamodb_calls": dict(backend.call_counts),
+    }
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], max_regression: float) -> List[str]:
+    """
+    基準の結果と比べて、スループットの低下・p95の悪化がmax_regression（割合）を超えたシナリオを返します。
+    """
+    failures = []
+    for name, current in report["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if previous is None:
+            continue
+        if current["requests_per_sec"] < previous["requests_per_sec"] * (1 - max_regression):
+            failures.append(
+                f"{name}: スループットが低下しました "
+                f"({previous['requests_per_sec']} -> {current['requests_per_sec']} req/s)"
+            )
+        if current["latency_ms"]["p95"] > previous["latency_ms"]["p95"] * (1 + max_regression):
+            failures.append(
+                f"{name}: p95レイテンシが悪化しました "
+                f"({previous['latency_ms']['p95']} -> {current['latency_ms']['p95']} ms)"
+            )
+        if current["errors"] > previous["errors"]:
+            failures.append(f"{name}: エラーが増えました ({previous['errors']} -> {current['errors']})")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="モデレーションAPIの負荷・レイテンシベンチマーク")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="実行するシナリオ（カンマ区切り）")
+    parser.add_argument("--requests", type=int, default=500, help="シナリオごとのリクエスト数")
+    parser.add_argument("--rounds", type=int, default=3, help="シナリオごとの計測回数（各項目の中央値を報告する）")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--warmup", type=int, default=20, help="計測前に送るリクエスト数")
+    parser.add_argument("--bedrock-latency-ms", type=float, default=200.0)
+    parser.add_argument("--bedrock-jitter-ms", type=float, default=20.0)
+    parser.add_argument("--dynamodb-latency-ms", type=float, default=5.0)
+    parser.add_argument("--dynamodb-throttle-rate", type=float, default=0.0)
+    parser.add_argument("--seed-records", type=int, default=1000, help="事前に作成する履歴の件数")
+    parser.add_argument("--history-limit", type=int, default=50)
+    parser.add_argument("--repeat-ratio", type=float, default=0.3, help="/checkのうち定型コメント（キャッシュ対象）の割合")
+    parser.add_argument("--mix", default="check=70,history=20,stats=10", help="mixedシナリオの比率")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="結果のJSONを保存するファイル")
+    parser.add_argument("--baseline", help="比較する以前の結果のJSONファイル")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="許容する悪化の割合")
+    args = parser.parse_args()
+
+    args.scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = [name for name in args.scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"不明なシナリオです: {unknown}")
+
+    print(
+        f"[START] scenarios={','.join(args.scenarios)} requests={args.requests} "
+        f"concurrency={args.concurrency} bedrock={args.bedrock_latency_ms}ms dynamodb={args.dynamodb_latency_ms}ms",
+        file=sys.stderr,
+    )
+    report = asyncio.run(run(args))
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            failures = compare(report, json.load(f), args.max_regression)
+        for failure in failures:
+            print(f"[FAIL] {failure}", file=sys.stderr)
+        if failures:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
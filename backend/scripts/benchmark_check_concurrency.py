@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+/api/moderation/check の同時実行ベンチマーク
+レイテンシを注入したBedrockスタブに対してN並列でリクエストを送り、requests/secを計測します
+
+使い方:
+    python scripts/benchmark_check_concurrency.py --concurrency 50 --requests 500 --latency-ms 200
+    python scripts/benchmark_check_concurrency.py --mode blocking   # 旧実装（イベントループ上で同期呼び出し）との比較
+    python scripts/benchmark_check_concurrency.py --mode streaming --verbose   # 冗長な応答でのストリーミングの効果
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# リポジトリはモックモード（メモリ保存）で動かす
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "")
+
+import httpx  # noqa: E402
+from app.main import app  # noqa: E402
+from app.config import settings  # noqa: E402
+from app.routes import moderation as moderation_routes  # noqa: E402
+from bedrock_stub import LatencyBedrockStub  # noqa: E402
+
+
+def percentile(values, p):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p))] if ordered else 0.0
+
+
+def install_stub(latency_ms: float, mode: str, verbose: bool) -> LatencyBedrockStub:
+    service = moderation_routes.get_moderation_service()
+    stub = LatencyBedrockStub(latency_ms=latency_ms, verbose=verbose)
+    settings.BEDROCK_STREAMING_ENABLED = mode == "streaming"
+    service.mock_mode = False
+    service.bedrock_client = stub
+    if mode == "blocking":
+        async def _blocking(prompt, content):
+            return service._invoke_llm(prompt, content)
+        service._invoke_llm_async = _blocking
+    return stub
+
+
+async def run(concurrency: int, total: int) -> dict:
+    headers = {"Authorization": "Bearer dev-token"}
+    semaphore = asyncio.Semaphore(concurrency)
+    errors = 0
+    latencies = []
+
+    async with httpx.AsyncClient(app=app, base_url="http://bench") as client:
+        async def one(i: int) -> None:
+            nonlocal errors
+            async with semaphore:
+                t0 = time.perf_counter()
+                res = await client.post(
+                    "/api/moderation/check",
+                    json={"content": f"がんばれカープ {i}", "content_type": "comment"},
+                    headers=headers,
+                )
+                latencies.append((time.perf_counter() - t0) * 1000)
+                if res.status_code != 200:
+                    errors += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(total)))
+        elapsed = time.perf_counter() - start
+
+    return {
+        "requests": total,
+        "errors": errors,
+        "elapsed_sec": round(elapsed, 3),
+        "requests_per_sec": round(total / elapsed, 2) if elapsed > 0 else 0.0,
+        "request_latency_ms": {
+            "p50": round(percentile(latencies, 0.50), 1),
+            "p95": round(percentile(latencies, 0.95), 1),
+            "p99": round(percentile(latencies, 0.99), 1),
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="/check の同時実行ベンチマーク")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--latency-ms", type=float, default=200.0)
+    parser.add_argument("--mode", choices=["executor", "blocking", "streaming"], default="executor")
+    parser.add_argument("--verbose", action="store_true", help="判定JSONの後に冗長な説明文が続く応答にする")
+    args = parser.parse_args()
+
+    stub = install_stub(args.latency_ms, args.mode, args.verbose)
+    print(f"[START] mode={args.mode} concurrency={args.concurrency} latency={args.latency_ms}ms")
+    result = asyncio.run(run(args.concurrency, args.requests))
+    result.update({
+        "mode": args.mode,
+        "concurrency": args.concurrency,
+        "latency_ms": args.latency_ms,
+        "bedrock_calls": stub.call_count,
+    })
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+/history のレスポンス生成のベンチマーク
+モックモードで履歴を作成し、GET /api/moderation/history?limit=1000 を
+従来の経路（辞書を返してresponse_modelで再検証 + 標準のJSONResponse）と
+現在の経路（success_responseでresponse_modelを検証し、pydanticで直接JSONにする）で比較します
+
+使い方:
+    python scripts/benchmark_history_serialization.py --records 1000 --iterations 50
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+import uuid
+from typing import Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+# AWSに接続しないモックモードで計測する
+os.environ.pop("AWS_ACCESS_KEY_ID", None)
+os.environ.pop("AWS_SECRET_ACCESS_KEY", None)
+os.environ["WARMUP_ON_STARTUP"] = "False"
+
+from fastapi import Depends, FastAPI  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.middleware.auth_middleware import get_current_user  # noqa: E402
+from app.routes import moderation  # noqa: E402
+from app.schemas.moderation import ModerationHistoryResponse  # noqa: E402
+
+
+def build_app() -> FastAPI:
+    app = FastAPI()
+    app.include_router(moderation.router, prefix="/api/moderation")
+
+    # 変更前と同じ書き方のルート（辞書を返し、FastAPIがresponse_modelで検証してからシリアライズする）
+    @app.get("/legacy/history", response_model=ModerationHistoryResponse, response_class=JSONResponse)
+    async def legacy_history(current_user=Depends(get_current_user), limit: int = 10, next_token: Optional[str] = None):
+        history = await moderation.get_moderation_service().get_moderation_history(limit, next_token)
+        return {"status": "success", "data": history["items"], "next_token": history["next_token"]}
+
+    return app
+
+
+def seed(records: int) -> None:
+    repository = moderation.get_moderation_service().moderation_repository
+    now = int(time.time())
+    rows = []
+    for i in range(records):
+        moderation_id = str(uuid.uuid4())
+        rows.append({
+            "moderation_id": moderation_id,
+            "content_id": "temp-" + moderation_id,
+            "content_type": "post" if i % 3 else "comment",
+            "original_content": f"今日の試合は最高でした！カープ優勝目指して頑張れ #{i}",
+            "moderation_result": "approved" if i % 10 else "rejected",
+            "moderation_reason": "問題のない応援コメントです",
+            "moderation_score": 0.95 if i % 10 else 0.2,
+            "created_at": now - i,
+        })
+    asyncio.run(repository.create_moderation_records(rows))
+
+
+def measure(client: TestClient, path: str, iterations: int, headers):
+    latencies = []
+    body = b""
+    for _ in range(iterations):
+        start = time.perf_counter()
+        response = client.get(path, headers=headers)
+        latencies.append((time.perf_counter() - start) * 1000)
+        response.raise_for_status()
+        body = response.content
+    return latencies, body
+
+
+def main():
+    parser = argparse.ArgumentParser(description="/historyのレスポンス生成のベンチマーク")
+    parser.add_argument("--records", type=int, default=1000)
+    parser.add_argument("--limit", type=int, default=1000)
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+
+    seed(args.records)
+    client = TestClient(build_app())
+    headers = {"Authorization": "Bearer dev-token"}
+    query = f"?limit={args.limit}"
+    backend = "pydantic"
+    print(f"[START] records={args.records} limit={args.limit} iterations={args.iterations} JSON={backend}")
+
+    # 初回の読み込み・検証器の構築を除くため、1回ずつ空打ちしてから計測する
+    measure(client, "/legacy/history" + query, 1, headers)
+    measure(client, "/api/moderation/history" + query, 1, headers)
+    legacy, legacy_body = measure(client, "/legacy/history" + query, args.iterations, headers)
+    fast, fast_body = measure(client, "/api/moderation/history" + query, args.iterations, headers)
+
+    if json.loads(legacy_body) != json.loads(fast_body):
+        raise RuntimeError("従来の経路と現在の経路でレスポンスの内容が異なります")
+
+    legacy_ms = statistics.median(legacy)
+    fast_ms = statistics.median(fast)
+    print(json.dumps({
+        "json_backend": backend,
+        "items": len(json.loads(fast_body)["data"]),
+        "legacy": {"median_ms": round(legacy_ms, 2), "bytes": len(legacy_body)},
+        "fast": {"median_ms": round(fast_ms, 2), "bytes": len(fast_body)},
+        "speedup": round(legacy_ms / fast_ms, 2) if fast_ms else None,
+    }, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
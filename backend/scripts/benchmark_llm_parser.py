@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+LLM応答パーサーのマイクロベンチマーク
+実際のモデル出力に近い応答（前置き・コードブロック・後続の説明文・不正な形式を含む）のコーパスで、
+従来の解析（貪欲な正規表現 + json.loads）と app.services.llm_parser の1件あたりのレイテンシを比較します
+
+使い方:
+    python scripts/benchmark_llm_parser.py --iterations 2000 --padding 8000
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from app.services import llm_parser  # noqa: E402
+
+VERDICT = '{"result": "rejected", "reason": "誹謗中傷にあたる表現が含まれています", "score": 0.15}'
+
+
+def build_corpus(padding: int):
+    """
+    (名前, 応答, 判定を取り出せるべきか) のリストを返します。
+    paddingは長い説明文が続く応答の文字数です。
+    """
+    explanation = "この投稿は特定の選手を強く非難しており、{比較的}穏当な表現とは言えません。" * max(1, padding // 40)
+    return [
+        ("plain", VERDICT, True),
+        ("compact", '{"result":"approved","reason":"問題ありません","score":0.97}', True),
+        ("preamble", f"以下が判定結果です。\n{VERDICT}", True),
+        ("code_block", f"```json\n{VERDICT}\n```", True),
+        ("nested_braces_in_reason", '{"result": "approved", "reason": "「{}」や「}」を含む投稿ですが問題ありません", "score": 0.9}', True),
+        ("escaped_quotes", '{"result": "approved", "reason": "\\"頑張れ\\"という応援です", "score": 0.92}', True),
+        ("trailing_explanation", f"{VERDICT}\n\n補足: {explanation}", True),
+        ("two_objects", f'{VERDICT}\n{{"note": "追加の情報"}}', True),
+        ("long_preamble", f"{explanation}\n{VERDICT}", True),
+        ("truncated", '{"result": "rejected", "reason": "誹謗中傷にあたる表現が含ま', False),
+        ("missing_score", '{"result": "approved", "reason": "問題ありません"}', False),
+        ("score_out_of_range", '{"result": "approved", "reason": "問題ありません", "score": 7}', False),
+        ("score_as_string", '{"result": "approved", "reason": "問題ありません", "score": "0.9"}', False),
+        ("unknown_result", '{"result": "maybe", "reason": "判断できません", "score": 0.5}', False),
+        ("no_json", "申し訳ありませんが、このコンテンツについては判断できません。", False),
+        ("unbalanced_long", "{" * 50 + explanation, False),
+    ]
+
+
+def legacy_parse(response: str):
+    """
+    従来の_parse_llm_responseと同じ解析（比較用）。
+    """
+    json_str = response.strip()
+    if not json_str.startswith('{'):
+        json_match = re.search(r'\{.*\}', json_str, re.DOTALL)
+        if not json_match:
+            return None
+        json_str = json_match.group(0)
+    result = json.loads(json_str)
+    return {
+        "result": result.get("result", "approved"),
+        "reason": result.get("reason", "理由が提供されていません"),
+        "score": float(result.get("score", 0.5)),
+    }
+
+
+def new_parse(response: str):
+    return llm_parser.parse_verdict(response)
+
+
+def measure(parse, response: str, iterations: int):
+    """
+    1件あたりの平均レイテンシ（マイクロ秒）と、判定を取り出せたかどうかを返します。
+    """
+    try:
+        parsed = parse(response) is not None
+    except Exception:
+        parsed = False
+    start = time.perf_counter()
+    for _ in range(iterations):
+        try:
+            parse(response)
+        except Exception:
+            pass
+    return (time.perf_counter() - start) / iterations * 1e6, parsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="LLM応答パーサーのマイクロベンチマーク")
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--padding", type=int, default=8000, help="長い説明文の文字数")
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.padding)
+    backend = "orjson" if llm_parser.orjson is not None else "json"
+    print(f"[START] 応答数={len(corpus)} 反復回数={args.iterations} JSON={backend}")
+
+    rows = []
+    legacy_total = new_total = 0.0
+    correct = 0
+    for name, response, expected in corpus:
+        legacy_us, legacy_ok = measure(legacy_parse, response, args.iterations)
+        new_us, new_ok = measure(new_parse, response, args.iterations)
+        legacy_total += legacy_us
+        new_total += new_us
+        correct += new_ok == expected
+        rows.append({
+            "case": name,
+            "chars": len(response),
+            "legacy_us": round(legacy_us, 2),
+            "new_us": round(new_us, 2),
+            "legacy_parsed": legacy_ok,
+            "new_parsed": new_ok,
+            "expected": expected,
+        })
+
+    print(json.dumps({
+        "json_backend": backend,
+        "cases": rows,
+        "total_us": {"legacy": round(legacy_total, 2), "new": round(new_total, 2)},
+        "speedup": round(legacy_total / new_total, 2) if new_total else None,
+        "correct": f"{correct}/{len(corpus)}",
+    }, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
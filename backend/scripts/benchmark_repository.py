@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+ModerationRepositoryのベンチマーク（ローカル用DynamoDB代替実装を使用）
+AWSに接続せず、実際のコードパス（put/update/Query/BatchGetItem）を遅延・スロットリング付きで計測します
+
+使い方:
+    python scripts/benchmark_repository.py --records 1000 --concurrency 20 --latency-ms 5 --throttle-rate 0.01
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from app.db.dynamodb import FakeDynamoDBBackend, FakeDynamoDBResource  # noqa: E402
+from app.db.repositories.moderation_repository import ModerationRepository  # noqa: E402
+
+
+def percentile(values, p):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p))] if ordered else 0.0
+
+
+def summarize(latencies, elapsed):
+    return {
+        "operations": len(latencies),
+        "ops_per_sec": round(len(latencies) / elapsed, 2) if elapsed > 0 else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50), 3),
+        "p95_ms": round(percentile(latencies, 0.95), 3),
+        "p99_ms": round(percentile(latencies, 0.99), 3),
+    }
+
+
+async def timed_phase(count, concurrency, operation):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(i):
+        async with semaphore:
+            t0 = time.perf_counter()
+            await operation(i)
+            latencies.append((time.perf_counter() - t0) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(count)))
+    return summarize(latencies, time.perf_counter() - start)
+
+
+async def run(args):
+    backend = FakeDynamoDBBackend(latency_ms=args.latency_ms, throttle_rate=args.throttle_rate, seed=42)
+    backend.create_moderation_tables()
+    repository = ModerationRepository(dynamodb=FakeDynamoDBResource(backend))
+    now = int(time.time())
+
+    async def create(i):
+        moderation_id = str(uuid.uuid4())
+        await repository.create_moderation_record({
+            "moderation_id": moderation_id,
+            "content_id": "temp-" + moderation_id,
+            "content_type": "comment" if i % 2 else "post",
+            "original_content": f"ベンチマーク {i}",
+            "moderation_result": "rejected" if i % 5 == 0 else "approved",
+            "moderation_reason": "benchmark",
+            "moderation_score": 0.9,
+            "created_at": now - i,
+        })
+
+    async def history(i):
+        await repository.get_moderation_history(args.page_size)
+
+    async def stats(i):
+        await repository.get_moderation_counters()
+
+    results = {
+        "create": await timed_phase(args.records, args.concurrency, create),
+        "history": await timed_phase(args.reads, args.concurrency, history),
+        "stats": await timed_phase(args.reads, args.concurrency, stats),
+    }
+    results["dynamodb_calls"] = dict(backend.call_counts)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ModerationRepositoryのベンチマーク")
+    parser.add_argument("--records", type=int, default=1000)
+    parser.add_argument("--reads", type=int, default=200)
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=5.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    print(f"[START] records={args.records} concurrency={args.concurrency} latency={args.latency_ms}ms")
+    print(json.dumps(asyncio.run(run(args)), ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+モデレーション辞書（Aho-Corasick）のベンチマーク
+大量のパターン（デフォルト5万件）で辞書を構築し、1件あたりの判定レイテンシを計測します
+
+使い方:
+    python scripts/benchmark_rule_engine.py --patterns 50000 --samples 2000 --length 200
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from app.services.rule_engine import RuleEngine  # noqa: E402
+
+# ひらがな・カタカナ・よく使う漢字から擬似的な日本語を生成する
+ALPHABET = (
+    [chr(c) for c in range(0x3041, 0x3094)]
+    + [chr(c) for c in range(0x30A1, 0x30F5)]
+    + list("広島鯉赤優勝野球投手打者試合応援監督選手球場本塁打三振四球")
+)
+
+
+def random_text(rng: random.Random, length: int) -> str:
+    return "".join(rng.choice(ALPHABET) for _ in range(length))
+
+
+def percentile(values, p):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="モデレーション辞書のベンチマーク")
+    parser.add_argument("--patterns", type=int, default=50000)
+    parser.add_argument("--samples", type=int, default=2000)
+    parser.add_argument("--length", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    with tempfile.NamedTemporaryFile("w", suffix=".tsv", delete=False, encoding="utf-8") as f:
+        for i in range(args.patterns):
+            action = "reject" if i % 10 else "approve"
+            f.write(f"{random_text(rng, rng.randint(2, 8))}\t{action}\t0.1\tbenchmark\n")
+        path = f.name
+
+    try:
+        print(f"[START] パターン数={args.patterns} サンプル数={args.samples} 文字数={args.length}")
+        start = time.perf_counter()
+        engine = RuleEngine(path, reload_interval_seconds=3600)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        samples = [random_text(rng, args.length) for _ in range(args.samples)]
+        latencies = []
+        matched = 0
+        for text in samples:
+            t0 = time.perf_counter()
+            verdict = engine.evaluate(text)
+            latencies.append((time.perf_counter() - t0) * 1000)
+            if verdict is not None:
+                matched += 1
+
+        print(json.dumps({
+            "patterns": engine.rule_count,
+            "build_ms": round(build_ms, 1),
+            "samples": args.samples,
+            "matched": matched,
+            "latency_ms": {
+                "p50": round(percentile(latencies, 0.50), 4),
+                "p95": round(percentile(latencies, 0.95), 4),
+                "p99": round(percentile(latencies, 0.99), 4),
+                "max": round(max(latencies), 4),
+            },
+        }, ensure_ascii=False, indent=2))
+    finally:
+        os.unlink(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""
+モデレーション集計カウンターの再構築スクリプト
+モデレーションテーブルを全件スキャンし、集計テーブルのカウンターを実データに合わせ直します
+（全件読み込みになるため、トラフィックの少ない時間帯に定期実行してください）
+カウンターはスキャン前との差分を加算して補正します。スキャン中にカウンターが更新された場合は、
+二重に数えないよう読み込みからやり直します
+
+使い方:
+    python scripts/reconcile_moderation_stats.py
+"""
+
+import asyncio
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from app.db.repositories.moderation_repository import ModerationRepository  # noqa: E402
+
+
+def main():
+    repository = ModerationRepository()
+    if repository.mock_mode:
+        print("[WARN] モックモードでは記録の全件を保持していないため、再構築は行いません")
+    print("[START] モデレーション集計を再構築中...")
+    totals = asyncio.run(repository.reconcile_moderation_counters())
+    print("[SUCCESS] 再構築が完了しました")
+    print(json.dumps(totals, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
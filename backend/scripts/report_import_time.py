@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+コールドスタート（インポート時間）のレポートと予算チェック
+`python -X importtime` で app.main（Lambdaハンドラー）を新しいプロセスで読み込み、
+累積インポート時間・時間のかかっているモジュール・起動時に読み込まれてはいけないモジュールを報告します
+予算を超えた場合や禁止モジュールが読み込まれた場合は終了コード1で終了します（CIでの回帰チェック用）
+
+使い方:
+    python scripts/report_import_time.py --runs 5 --budget-ms 1000 --top 15
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# コールドスタートの目標（app.mainの累積インポート時間の最小値、ミリ秒）
+# 大半はfastapi自体の読み込み。遅いマシンで計測する場合はIMPORT_TIME_BUDGET_MSで明示的に変更する
+DEFAULT_BUDGET_MS = float(os.getenv("IMPORT_TIME_BUDGET_MS", "1000"))
+# 起動時には読み込まず、最初に使う時点で読み込むモジュール
+DEFAULT_FORBIDDEN = "boto3,botocore,jose,passlib,requests"
+
+
+def parse_importtime(stderr: str):
+    """
+    -X importtimeの出力を (モジュール名, 自身の時間us, 累積時間us, 深さ) のリストにします。
+    """
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        depth = (len(name) - len(name.lstrip(" "))) // 2
+        entries.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return entries
+
+
+def run_once(module: str):
+    env = dict(os.environ)
+    # Lambda上と同じく認証情報がある状態（モックモードではない）で計測する
+    env.setdefault("AWS_ACCESS_KEY_ID", "import-time-check")
+    env.setdefault("AWS_SECRET_ACCESS_KEY", "import-time-check")
+    env["DEBUG"] = "False"
+    env["PYTHONDONTWRITEBYTECODE"] = "1"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"{module}の読み込みに失敗しました:\n{result.stderr[-2000:]}")
+    return parse_importtime(result.stderr)
+
+
+def build_report(module: str = "app.main", runs: int = 5, budget_ms: float = DEFAULT_BUDGET_MS, forbid: str = DEFAULT_FORBIDDEN, top: int = 15):
+    """
+    moduleをruns回読み込んで計測し、レポートの辞書を返します（tests/test_import_time.py からも使う）。
+    """
+    totals_ms = []
+    last_entries = []
+    for _ in range(max(1, runs)):
+        entries = run_once(module)
+        module_entry = next((e for e in entries if e[0] == module), None)
+        if module_entry is None:
+            raise RuntimeError(f"{module}のインポート時間が出力に含まれていません")
+        totals_ms.append(module_entry[2] / 1000)
+        last_entries = entries
+
+    forbidden = [name.strip() for name in forbid.split(",") if name.strip()]
+    imported = {entry[0] for entry in last_entries}
+    forbidden_imported = [name for name in forbidden if name in imported]
+
+    # 対象モジュール直下の依存を累積時間順に並べると、どこに時間がかかっているかが分かる
+    # （importtimeは子モジュールを親より先に出力するため、親の行から遡って集める）
+    index = next(i for i, e in enumerate(last_entries) if e[0] == module)
+    children = []
+    for entry in reversed(last_entries[:index]):
+        if entry[3] == 0:
+            break
+        if entry[3] == 1:
+            children.append(entry)
+    direct = sorted(children, key=lambda e: e[2], reverse=True)
+    heaviest = sorted(last_entries, key=lambda e: e[1], reverse=True)
+
+    best_ms = min(totals_ms)
+    return {
+        "module": module,
+        "runs": len(totals_ms),
+        "cumulative_ms": {
+            "min": round(best_ms, 1),
+            "median": round(statistics.median(totals_ms), 1),
+            "max": round(max(totals_ms), 1),
+        },
+        "budget_ms": budget_ms,
+        "direct_imports": [
+            {"module": name, "cumulative_ms": round(cumulative / 1000, 1)}
+            for name, _, cumulative, _ in direct[:top]
+        ],
+        "heaviest_modules": [
+            {"module": name, "self_ms": round(self_us / 1000, 1)}
+            for name, self_us, _, _ in heaviest[:top]
+        ],
+        "forbidden_imported": forbidden_imported,
+        "ok": best_ms <= budget_ms and not forbidden_imported,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="コールドスタート（インポート時間）のレポート")
+    parser.add_argument("--module", default="app.main", help="計測するモジュール")
+    parser.add_argument("--runs", type=int, default=5, help="計測回数（最小値を予算と比較する）")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS, help="累積インポート時間の予算（ミリ秒）")
+    parser.add_argument("--top", type=int, default=15, help="表示する上位モジュール数")
+    parser.add_argument("--forbid", default=DEFAULT_FORBIDDEN, help="起動時に読み込まれてはいけないモジュール（カンマ区切り）")
+    args = parser.parse_args()
+
+    print(f"[START] module={args.module} runs={args.runs} budget={args.budget_ms}ms")
+    report = build_report(args.module, args.runs, args.budget_ms, args.forbid, args.top)
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+    if not report["ok"]:
+        best_ms = report["cumulative_ms"]["min"]
+        if best_ms > args.budget_ms:
+            print(f"[FAIL] インポート時間が予算を超えています: {best_ms:.1f}ms > {args.budget_ms}ms", file=sys.stderr)
+        if report["forbidden_imported"]:
+            print(f"[FAIL] 起動時に読み込まれてはいけないモジュールが読み込まれています: {report['forbidden_imported']}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,11 @@
+import os
+import sys
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+# app.config は読み込み時に環境変数を読むため、appを読み込む前にAWSに接続しないモックモードにする
+os.environ.pop("AWS_ACCESS_KEY_ID", None)
+os.environ.pop("AWS_SECRET_ACCESS_KEY", None)
+os.environ["WARMUP_ON_STARTUP"] = "False"
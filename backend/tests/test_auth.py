@@ -0,0 +1,45 @@
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.middleware.auth_middleware import get_admin_user, verify_metrics_token
+
+
+def make_client(dependency):
+    app = FastAPI()
+
+    @app.get("/protected", dependencies=[Depends(dependency)])
+    def protected():
+        return {"ok": True}
+
+    return TestClient(app)
+
+
+def test_metrics_token_is_required_when_configured(monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "scrape-secret")
+    client = make_client(verify_metrics_token)
+
+    assert client.get("/protected").status_code == 401
+    assert client.get("/protected", headers={"Authorization": "Bearer wrong"}).status_code == 401
+    assert client.get("/protected", headers={"Authorization": "Bearer scrape-secret"}).status_code == 200
+
+
+def test_metrics_without_token_configured_are_open(monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "")
+    assert make_client(verify_metrics_token).get("/protected").status_code == 200
+
+
+def test_admin_endpoints_are_forbidden_without_a_configured_token(monkeypatch):
+    monkeypatch.setattr(settings, "ADMIN_API_TOKEN", "")
+    client = make_client(get_admin_user)
+
+    assert client.get("/protected", headers={"Authorization": "Bearer dev-token"}).status_code == 403
+
+
+def test_admin_endpoints_require_the_admin_token(monkeypatch):
+    monkeypatch.setattr(settings, "ADMIN_API_TOKEN", "admin-secret")
+    client = make_client(get_admin_user)
+
+    # 一般ユーザー用の開発トークンでは呼び出せない
+    assert client.get("/protected", headers={"Authorization": "Bearer dev-token"}).status_code == 403
+    assert client.get("/protected", headers={"Authorization": "Bearer admin-secret"}).status_code == 200
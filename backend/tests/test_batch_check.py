@@ -0,0 +1,94 @@
+import asyncio
+
+from app.config import settings
+from app.services.moderation_service import ModerationService
+from app.services.token_estimator import make_usage
+
+
+def approved(content):
+    return {"result": "approved", "reason": f"{content}: 問題ありません", "score": 0.9, "usage": make_usage(10, 5, estimated=False)}
+
+
+def make_service(fail_on=()):
+    service = ModerationService()
+    service.rule_engine = None
+    calls = []
+
+    async def fake_moderate_uncached(content):
+        calls.append(content)
+        if content in fail_on:
+            raise RuntimeError("LLMの呼び出しに失敗しました")
+        return approved(content)
+
+    service._moderate_uncached = fake_moderate_uncached
+    return service, calls
+
+
+def check_batch(service, contents):
+    items = [{"content": content, "content_type": "post"} for content in contents]
+    return asyncio.run(service.check_content_batch(items))
+
+
+def test_each_item_is_prechecked_once():
+    service, calls = make_service()
+    prechecks = []
+    precheck = service._precheck_verdict
+
+    def counting_precheck(content, content_type):
+        prechecks.append(content)
+        return precheck(content, content_type)
+
+    service._precheck_verdict = counting_precheck
+
+    results = check_batch(service, ["投稿A", "投稿B", "投稿C"])
+
+    assert [r["status"] for r in results] == ["success"] * 3
+    assert sorted(prechecks) == ["投稿A", "投稿B", "投稿C"]
+    assert sorted(calls) == ["投稿A", "投稿B", "投稿C"]
+
+
+def test_a_failing_item_does_not_fail_the_others():
+    service, _ = make_service(fail_on={"壊れる投稿"})
+
+    results = check_batch(service, ["投稿A", "壊れる投稿", "投稿C"])
+
+    assert [r["status"] for r in results] == ["success", "error", "success"]
+    assert results[1]["data"] is None and "LLMの呼び出しに失敗しました" in results[1]["error"]
+    assert results[0]["data"]["reason"] == "投稿A: 問題ありません"
+    assert results[2]["error"] is None
+
+
+def test_packed_prompt_results_are_fanned_out(monkeypatch):
+    monkeypatch.setattr(settings, "BATCH_PACK_ENABLED", True)
+    service, calls = make_service()
+    packed_calls = []
+
+    async def fake_moderate_packed(contents):
+        packed_calls.append(list(contents))
+        return [approved(content) for content in contents]
+
+    service._moderate_packed = fake_moderate_packed
+
+    results = check_batch(service, ["短文1", "短文2", "短文3"])
+
+    assert packed_calls == [["短文1", "短文2", "短文3"]]
+    assert calls == []
+    assert [r["data"]["reason"] for r in results] == [f"短文{i}: 問題ありません" for i in (1, 2, 3)]
+
+
+def test_unparsable_or_failed_packed_prompt_falls_back_to_single_calls(monkeypatch):
+    monkeypatch.setattr(settings, "BATCH_PACK_ENABLED", True)
+    for outcome in (None, RuntimeError("timeout")):
+        service, calls = make_service()
+
+        async def fake_moderate_packed(contents):
+            if isinstance(outcome, Exception):
+                raise outcome
+            return outcome
+
+        service._moderate_packed = fake_moderate_packed
+
+        results = check_batch(service, ["短文1", "短文2"])
+
+        assert sorted(calls) == ["短文1", "短文2"]
+        assert [r["status"] for r in results] == ["success", "success"]
@@ -0,0 +1,41 @@
+from app.services.chunker import aggregate_verdicts, chunk_content, split_sentences
+
+
+def test_split_sentences_on_japanese_punctuation_and_newlines():
+    assert split_sentences("今日は晴れ。明日は雨！本当？\n\n「すごい！」と言った。") == [
+        "今日は晴れ。", "明日は雨！", "本当？", "「すごい！」", "と言った。",
+    ]
+
+
+def test_split_sentences_on_ascii_period_but_not_decimals_or_abbreviations():
+    text = "Pi is 3.14 today. Mr. Smith met Dr. Jones. See e.g. the U.S. team. Visit example.com now."
+    assert split_sentences(text) == [
+        "Pi is 3.14 today.",
+        " Mr. Smith met Dr. Jones.",
+        " See e.g. the U.S. team.",
+        " Visit example.com now.",
+    ]
+
+
+def test_chunk_content_keeps_sentences_together_and_preserves_text():
+    text = "First sentence here. Second one. " + "あ" * 30 + "。"
+    chunks = chunk_content(text, 25)
+
+    assert chunks[:2] == ["First sentence here.", " Second one."]
+    # max_charsを超える1文だけは文字数で分割する
+    assert chunks[2:] == [" " + "あ" * 24, "あ" * 6 + "。"]
+    assert "".join(chunks) == text
+
+
+def test_short_content_is_a_single_chunk():
+    assert chunk_content("短い投稿", 100) == ["短い投稿"]
+
+
+def test_aggregate_rejects_when_any_chunk_is_rejected():
+    verdict = aggregate_verdicts([
+        {"result": "approved", "reason": "ok", "score": 0.9},
+        {"result": "rejected", "reason": "暴言", "score": 0.2},
+        {"result": "approved", "reason": "ok", "score": 0.8, "fallback": True},
+    ])
+
+    assert verdict == {"result": "rejected", "reason": "暴言", "score": 0.2, "fallback": True}
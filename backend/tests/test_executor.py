@@ -0,0 +1,120 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.utils.executor import BoundedExecutor
+
+
+def test_in_flight_work_never_exceeds_max_workers():
+    executor = BoundedExecutor(max_workers=3, thread_name_prefix="test-bound")
+    lock = threading.Lock()
+    running = 0
+    peak = 0
+    thread_names = set()
+
+    def work(index):
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+            thread_names.add(threading.current_thread().name)
+        time.sleep(0.02)
+        with lock:
+            running -= 1
+        return index
+
+    async def run():
+        return await asyncio.gather(*(executor.run(work, i) for i in range(12)))
+
+    try:
+        results = asyncio.run(run())
+    finally:
+        executor.shutdown()
+
+    assert results == list(range(12))
+    assert peak == 3
+    assert len(thread_names) == 3
+    assert all(name.startswith("test-bound") for name in thread_names)
+
+
+def test_calls_queue_while_the_pool_is_saturated():
+    executor = BoundedExecutor(max_workers=1, thread_name_prefix="test-queue")
+    release = threading.Event()
+    started = []
+
+    def blocking(name):
+        started.append(name)
+        assert release.wait(timeout=5)
+        return name
+
+    async def run():
+        first = asyncio.ensure_future(executor.run(blocking, "first"))
+        second = asyncio.ensure_future(executor.run(blocking, "second"))
+        await asyncio.sleep(0.05)
+        # 空きがないため2件目は開始されず、待機中も含めて数える
+        snapshot = (list(started), executor.in_flight)
+        release.set()
+        return snapshot, await asyncio.gather(first, second), executor.in_flight
+
+    try:
+        (started_while_saturated, in_flight_while_saturated), results, in_flight_after = asyncio.run(run())
+    finally:
+        release.set()
+        executor.shutdown()
+
+    assert started_while_saturated == ["first"]
+    assert in_flight_while_saturated == 2
+    assert results == ["first", "second"]
+    assert in_flight_after == 0
+
+
+def test_exceptions_propagate_and_release_the_slot():
+    executor = BoundedExecutor(max_workers=1, thread_name_prefix="test-error")
+
+    def fail():
+        raise ValueError("boom")
+
+    async def run():
+        with pytest.raises(ValueError):
+            await executor.run(fail)
+        return executor.in_flight, await executor.run(lambda: "ok")
+
+    try:
+        assert asyncio.run(run()) == (0, "ok")
+    finally:
+        executor.shutdown()
+
+
+def test_shutdown_waits_for_running_work_and_rejects_new_calls():
+    executor = BoundedExecutor(max_workers=2, thread_name_prefix="test-shutdown")
+    finished = []
+
+    def slow(name):
+        time.sleep(0.05)
+        finished.append(name)
+        return name
+
+    async def run():
+        pending = asyncio.ensure_future(executor.run(slow, "running"))
+        await asyncio.sleep(0.01)
+        # 実行中の呼び出しが終わるまで待ってから止まる
+        await asyncio.get_running_loop().run_in_executor(None, executor.shutdown, True)
+        assert finished == ["running"]
+        assert await pending == "running"
+        with pytest.raises(RuntimeError):
+            await executor.run(slow, "late")
+        return executor.in_flight
+
+    assert asyncio.run(run()) == 0
+    assert finished == ["running"]
+
+
+def test_max_workers_is_at_least_one():
+    executor = BoundedExecutor(max_workers=0, thread_name_prefix="test-min")
+    try:
+        assert executor.max_workers == 1
+        assert asyncio.run(executor.run(lambda: 42)) == 42
+    finally:
+        executor.shutdown()
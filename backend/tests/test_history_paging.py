@@ -0,0 +1,85 @@
+import asyncio
+import time
+
+from app.config import settings
+from app.db.dynamodb import FakeDynamoDBBackend, FakeDynamoDBResource
+from app.db.repositories.moderation_repository import ModerationRepository
+
+
+def make_repository_with_records(count):
+    backend = FakeDynamoDBBackend()
+    backend.create_moderation_tables()
+    repository = ModerationRepository(dynamodb=FakeDynamoDBResource(backend))
+    now = int(time.time())
+    records = [
+        {
+            "moderation_id": f"id-{i:03d}",
+            "content": f"投稿{i}",
+            "content_type": "post",
+            "moderation_result": "approved",
+            "moderation_score": 0.9,
+            "created_at": now - i * 60,
+        }
+        for i in range(count)
+    ]
+    asyncio.run(repository.create_moderation_records(records))
+    return backend, repository
+
+
+def test_history_pages_follow_the_token_newest_first():
+    _, repository = make_repository_with_records(25)
+
+    seen = []
+    token = None
+    while True:
+        items, token = asyncio.run(repository.get_moderation_history(limit=10, next_token=token))
+        seen.extend(item["moderation_id"] for item in items)
+        if token is None or not items:
+            break
+
+    assert seen == [f"id-{i:03d}" for i in range(25)]
+
+
+def test_history_resumes_after_the_last_item_of_the_page_is_deleted():
+    backend, repository = make_repository_with_records(12)
+
+    first, token = asyncio.run(repository.get_moderation_history(limit=5))
+    backend.delete_item(settings.DYNAMODB_MODERATION_TABLE, {"moderation_id": first[-1]["moderation_id"]})
+    second, _ = asyncio.run(repository.get_moderation_history(limit=5, next_token=token))
+
+    assert [item["moderation_id"] for item in first] == [f"id-{i:03d}" for i in range(5)]
+    # 削除された開始キーの次（より古い記録）から続き、先頭に戻らない
+    assert [item["moderation_id"] for item in second] == [f"id-{i:03d}" for i in range(5, 10)]
+
+
+def test_scan_resumes_after_the_start_key_is_deleted():
+    backend, _ = make_repository_with_records(8)
+    table = settings.DYNAMODB_MODERATION_TABLE
+
+    first = backend.scan(table, {"Limit": 3})
+    backend.delete_item(table, first["LastEvaluatedKey"])
+    rest = backend.scan(table, {"ExclusiveStartKey": first["LastEvaluatedKey"]})
+
+    ids = [item["moderation_id"] for item in first["Items"] + rest["Items"]]
+    assert len(ids) == len(set(ids)) == 8
+
+
+def test_history_returns_integral_scores_as_floats():
+    backend = FakeDynamoDBBackend()
+    backend.create_moderation_tables()
+    repository = ModerationRepository(dynamodb=FakeDynamoDBResource(backend))
+    record = {
+        "moderation_id": "id-score",
+        "content": "がんばれ",
+        "content_type": "post",
+        "moderation_result": "approved",
+        "moderation_score": 1.0,
+        "created_at": int(time.time()),
+    }
+    asyncio.run(repository.create_moderation_record(record))
+
+    items, _ = asyncio.run(repository.get_moderation_history(limit=1))
+
+    # DynamoDBからはDecimal("1.0")で返るが、レスポンスでは1ではなく1.0のまま返す
+    assert items[0]["moderation_score"] == 1.0 and isinstance(items[0]["moderation_score"], float)
+    assert isinstance(items[0]["created_at"], int)
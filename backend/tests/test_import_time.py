@@ -0,0 +1,36 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from scripts import report_import_time
+
+# 起動時（app.mainの読み込み時）には読み込まず、最初に使う時点で読み込むモジュール
+LAZY_MODULES = ("boto3", "botocore", "app.services.rule_engine", "app.routes.admin", "app.utils.profiler")
+
+
+def test_app_main_does_not_import_lazy_modules():
+    code = f"import sys, json, app.main; print(json.dumps([m for m in {LAZY_MODULES!r} if m in sys.modules]))"
+    env = dict(os.environ, AWS_ACCESS_KEY_ID="import-check", AWS_SECRET_ACCESS_KEY="import-check", DEBUG="False")
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=report_import_time.BACKEND_DIR, env=env, capture_output=True, text=True,
+    )
+
+    assert result.returncode == 0, result.stderr[-2000:]
+    assert json.loads(result.stdout.strip().splitlines()[-1]) == []
+
+
+@pytest.mark.skipif(
+    os.getenv("RUN_IMPORT_TIME_BUDGET") != "1",
+    reason="実時間の計測は環境に左右されるため、RUN_IMPORT_TIME_BUDGET=1 の場合だけ実行する",
+)
+def test_app_main_import_within_budget_without_forbidden_modules():
+    # scripts/report_import_time.py と同じ計測（新しいプロセスで -X importtime）で予算と禁止モジュールを確認する
+    # 予算は実行のばらつきを除くため最小値と比較する。遅いマシンではIMPORT_TIME_BUDGET_MSで予算を変更する
+    report = report_import_time.build_report("app.main", runs=10)
+
+    assert report["forbidden_imported"] == []
+    assert report["cumulative_ms"]["min"] <= report["budget_ms"], report["direct_imports"]
+    assert report["ok"]
@@ -0,0 +1,92 @@
+import asyncio
+
+import pytest
+
+from app import main
+from app.config import settings
+from app.routes import moderation
+
+
+def http_event(path="/"):
+    # API Gateway（HTTP API、ペイロード形式2.0）のイベント
+    return {
+        "version": "2.0",
+        "routeKey": "$default",
+        "rawPath": path,
+        "rawQueryString": "",
+        "headers": {"host": "example.execute-api.ap-northeast-1.amazonaws.com"},
+        "requestContext": {
+            "http": {"method": "GET", "path": path, "protocol": "HTTP/1.1", "sourceIp": "127.0.0.1"},
+            "stage": "$default",
+        },
+        "isBase64Encoded": False,
+    }
+
+
+@pytest.fixture
+def lambda_env(monkeypatch):
+    calls = {"warm_up": 0, "shutdown": 0}
+
+    async def fake_warm_up():
+        calls["warm_up"] += 1
+        return {"service": 1.0}
+
+    async def fake_shutdown():
+        calls["shutdown"] += 1
+
+    monkeypatch.setattr(moderation, "warm_up_moderation_service", fake_warm_up)
+    monkeypatch.setattr(moderation, "shutdown_moderation_service", fake_shutdown)
+    monkeypatch.setattr(main, "_warmed_up", False)
+    monkeypatch.setattr(main, "_loop", None)
+    yield calls
+    if main._loop is not None:
+        main._loop.close()
+    asyncio.set_event_loop(None)
+
+
+@pytest.mark.parametrize("event, expected", [
+    ({"warmup": True}, True),
+    ({"source": "aws.events", "detail-type": "Scheduled Event"}, True),
+    ({"warmup": "true"}, False),
+    ({"source": "aws.events", "detail-type": "EC2 Instance State-change Notification"}, False),
+    (http_event(), False),
+    ([], False),
+    (None, False),
+])
+def test_is_warmup_event(event, expected):
+    assert main.is_warmup_event(event) is expected
+
+
+def test_warmup_event_short_circuits_the_asgi_app(lambda_env, monkeypatch):
+    def fail_asgi(event, context):
+        raise AssertionError("ウォームアップではアプリを呼び出さない")
+
+    monkeypatch.setattr(main, "asgi_handler", fail_asgi)
+
+    first = main.handler({"warmup": True}, None)
+    second = main.handler({"source": "aws.events", "detail-type": "Scheduled Event"}, None)
+
+    assert first == {"warmed_up": True, "timings_ms": {"service": 1.0}}
+    # 実行環境ごとに1回だけウォームアップする
+    assert second == {"warmed_up": True, "timings_ms": {}}
+    assert lambda_env == {"warm_up": 1, "shutdown": 0}
+
+
+def test_requests_warm_up_once_and_flush_after_every_invocation(lambda_env, monkeypatch):
+    monkeypatch.setattr(settings, "WARMUP_ON_STARTUP", True)
+
+    responses = [main.handler(http_event(), None) for _ in range(2)]
+
+    assert [response["statusCode"] for response in responses] == [200, 200]
+    assert lambda_env == {"warm_up": 1, "shutdown": 2}
+
+
+def test_requests_reuse_one_event_loop_per_container(lambda_env, monkeypatch):
+    monkeypatch.setattr(settings, "WARMUP_ON_STARTUP", False)
+
+    main.handler(http_event(), None)
+    loop = main._loop
+    main.handler(http_event(), None)
+
+    assert main._loop is loop and not loop.is_closed()
+    assert lambda_env == {"warm_up": 0, "shutdown": 2}
@@ -0,0 +1,73 @@
+import pytest
+
+from app.services.llm_parser import (
+    IncrementalVerdictParser,
+    VerdictParseError,
+    iter_json_values,
+    parse_verdict,
+    parse_verdict_list,
+)
+
+VERDICT = '{"result": "rejected", "reason": "誹謗中傷にあたる表現が含まれています", "score": 0.15}'
+EXPECTED = {"result": "rejected", "reason": "誹謗中傷にあたる表現が含まれています", "score": 0.15}
+EXPLANATION = "この投稿は特定の選手を強く非難しており、{比較的}穏当な表現とは言えません。" * 200
+
+
+@pytest.mark.parametrize("response", [
+    VERDICT,
+    f"以下が判定結果です。\n{VERDICT}",
+    f"```json\n{VERDICT}\n```",
+    f"{VERDICT}\n\n補足: {EXPLANATION}",
+    f'{VERDICT}\n{{"note": "追加の情報"}}',
+    f'{{"note": "追加の情報"}}\n{VERDICT}',
+    f"{EXPLANATION}\n{VERDICT}",
+])
+def test_parse_verdict_finds_the_verdict_around_other_text(response):
+    assert parse_verdict(response) == EXPECTED
+
+
+def test_parse_verdict_keeps_braces_and_escaped_quotes_in_the_reason():
+    assert parse_verdict('{"result": "approved", "reason": "「{}」や\\"}\\"を含む", "score": 1}') == {
+        "result": "approved", "reason": '「{}」や"}"を含む', "score": 1.0,
+    }
+
+
+@pytest.mark.parametrize("response", [
+    '{"result": "rejected", "reason": "誹謗中傷にあたる表現が含ま',
+    '{"result": "approved", "reason": "問題ありません"}',
+    '{"result": "approved", "reason": "問題ありません", "score": 7}',
+    '{"result": "approved", "reason": "問題ありません", "score": "0.9"}',
+    '{"result": "maybe", "reason": "判断できません", "score": 0.5}',
+    "申し訳ありませんが、このコンテンツについては判断できません。",
+    "{" * 50 + EXPLANATION,
+])
+def test_parse_verdict_rejects_malformed_responses(response):
+    with pytest.raises(VerdictParseError):
+        parse_verdict(response)
+
+
+def test_iter_json_values_resumes_after_a_failed_decode():
+    text = '{"a": 1, "b": {"c": 2} 壊れた {"d": 3} と {"e": 4}'
+    assert list(iter_json_values(text)) == [{"d": 3}, {"e": 4}]
+
+
+def test_parse_verdict_list_orders_entries_by_id():
+    response = (
+        '判定結果:\n[{"id": 2, "result": "rejected", "reason": "暴言", "score": 0.1},'
+        ' {"id": 1, "result": "approved", "reason": "応援", "score": 0.9}]'
+    )
+    assert parse_verdict_list(response, 2) == [
+        {"result": "approved", "reason": "応援", "score": 0.9},
+        {"result": "rejected", "reason": "暴言", "score": 0.1},
+    ]
+    with pytest.raises(VerdictParseError):
+        parse_verdict_list(response, 3)
+
+
+def test_incremental_parser_settles_once_result_and_score_arrive():
+    parser = IncrementalVerdictParser()
+    assert parser.feed('{"result": "rejected", "sco') is None
+    assert parser.feed('re": 0.') is None
+    verdict = parser.feed('2, "reason": "暴')
+    assert verdict == {"result": "rejected", "reason": "判定理由の受信前に判定を確定しました", "score": 0.2}
+    assert parser.feed('言"}') is None
@@ -0,0 +1,95 @@
+import asyncio
+
+from app.config import settings
+from app.db.repositories.memory_store import InMemoryModerationStore
+from app.db.repositories.moderation_repository import ModerationRepository
+
+
+def make_record(index):
+    return {
+        "moderation_id": f"id-{index}",
+        "content_id": f"content-{index}",
+        "content_type": "post",
+        "original_content": f"投稿{index}",
+        "moderation_result": "approved",
+        "moderation_reason": "問題ありません",
+        "moderation_score": 0.9,
+        "created_at": 1_700_000_000 + index,
+    }
+
+
+def ids(items):
+    return [item["moderation_id"] for item in items]
+
+
+def test_pages_are_newest_first_and_end_at_the_oldest_record():
+    store = InMemoryModerationStore(capacity=10)
+    store.extend([make_record(i) for i in range(7)])
+
+    first, next_seq = store.page(None, 3)
+    second, next_seq = store.page(next_seq, 3)
+    third, next_seq = store.page(next_seq, 3)
+
+    assert ids(first) == ["id-6", "id-5", "id-4"]
+    assert ids(second) == ["id-3", "id-2", "id-1"]
+    assert ids(third) == ["id-0"]
+    assert next_seq is None
+
+
+def test_capacity_evicts_the_oldest_records():
+    store = InMemoryModerationStore(capacity=5)
+    store.extend([make_record(i) for i in range(8)])
+
+    assert len(store) == 5
+    assert ids(store.iter_records()) == ["id-3", "id-4", "id-5", "id-6", "id-7"]
+
+
+def test_paging_across_an_eviction_skips_evicted_records_without_repeats():
+    store = InMemoryModerationStore(capacity=5)
+    store.extend([make_record(i) for i in range(5)])
+    first, next_seq = store.page(None, 2)
+
+    # ページの間に2件追加され、続きのうち古い2件（id-0, id-1）が上書きされる
+    store.extend([make_record(i) for i in range(5, 7)])
+    second, next_seq = store.page(next_seq, 2)
+
+    assert ids(first) == ["id-4", "id-3"]
+    # 残っている記録だけを返し、上書きしたスロットの新しい記録は続きのページに混ざらない
+    assert ids(second) == ["id-2"]
+    assert next_seq is None
+
+
+def test_stale_token_after_wraparound_returns_an_empty_last_page():
+    store = InMemoryModerationStore(capacity=4)
+    store.extend([make_record(i) for i in range(4)])
+    _, next_seq = store.page(None, 1)
+    assert next_seq == 2
+
+    # リングバッファが1周以上して、トークンの位置のスロットは新しい記録で上書きされている
+    store.extend([make_record(i) for i in range(4, 12)])
+    items, next_seq = store.page(next_seq, 3)
+
+    assert items == []
+    assert next_seq is None
+
+
+def test_repository_history_token_survives_wraparound_in_mock_mode(monkeypatch):
+    monkeypatch.setattr(settings, "MOCK_HISTORY_CAPACITY", 4)
+
+    async def run():
+        repository = ModerationRepository()
+        assert repository.mock_mode
+        await repository.create_moderation_records([make_record(i) for i in range(4)])
+        first, token = await repository.get_moderation_history(2)
+        await repository.create_moderation_records([make_record(i) for i in range(4, 12)])
+        second, next_token = await repository.get_moderation_history(2, token)
+        latest, _ = await repository.get_moderation_history(2)
+        return first, second, next_token, latest
+
+    first, second, next_token, latest = asyncio.run(run())
+
+    assert ids(first) == ["id-3", "id-2"]
+    # 上書きされた位置の続きは返さず、新しい記録を古いページとして返すこともない
+    assert second == []
+    assert next_token is None
+    assert ids(latest) == ["id-11", "id-10"]
@@ -0,0 +1,96 @@
+import asyncio
+
+import pytest
+
+from app.config import settings
+from app.services.micro_batcher import MicroBatcher
+from app.services.moderation_service import ModerationService
+from app.services.token_estimator import make_usage
+
+
+def verdict_for(content):
+    return {"result": "approved", "reason": content, "score": 0.9}
+
+
+def test_requests_within_the_window_share_one_call_and_get_their_own_result():
+    batches = []
+
+    async def handler(contents):
+        batches.append(list(contents))
+        return [verdict_for(content) for content in contents]
+
+    async def run():
+        batcher = MicroBatcher(handler, window_ms=20, max_size=10)
+        return await asyncio.gather(*(batcher.submit(f"投稿{i}") for i in range(3))), batcher.stats()
+
+    results, stats = asyncio.run(run())
+
+    assert batches == [["投稿0", "投稿1", "投稿2"]]
+    assert [r["reason"] for r in results] == ["投稿0", "投稿1", "投稿2"]
+    assert stats["batches_sent"] == 1 and stats["items_sent"] == 3
+
+
+def test_batches_are_sent_at_max_size_and_after_the_window():
+    batches = []
+
+    async def handler(contents):
+        batches.append(len(contents))
+        return [verdict_for(content) for content in contents]
+
+    async def run():
+        batcher = MicroBatcher(handler, window_ms=10, max_size=2)
+        await asyncio.gather(*(batcher.submit(f"投稿{i}") for i in range(5)))
+        # 窓が閉じた後の要求は次のまとまりになる
+        await batcher.submit("遅れて届いた投稿")
+
+    asyncio.run(run())
+
+    assert batches == [2, 2, 1, 1]
+
+
+@pytest.mark.parametrize("failure", ["raise", "short"])
+def test_a_failed_batch_reaches_every_waiter(failure):
+    async def handler(contents):
+        if failure == "raise":
+            raise RuntimeError("LLMの呼び出しに失敗しました")
+        return [verdict_for(contents[0])]
+
+    async def run():
+        batcher = MicroBatcher(handler, window_ms=10, max_size=10)
+        return await asyncio.gather(*(batcher.submit(f"投稿{i}") for i in range(3)), return_exceptions=True)
+
+    results = asyncio.run(run())
+
+    assert len(results) == 3
+    assert all(isinstance(result, (RuntimeError, ValueError)) for result in results)
+
+
+@pytest.mark.parametrize("response", [
+    # 件数が足りない・解析できない応答
+    '[{"id": 1, "result": "approved", "reason": "ok", "score": 0.9}]',
+    "判定できませんでした",
+])
+def test_partial_or_unparsable_packed_output_falls_back_to_single_calls(monkeypatch, response):
+    monkeypatch.setattr(settings, "MICRO_BATCH_ENABLED", True)
+    service = ModerationService()
+    service.rule_engine = None
+    service.verdict_cache = None
+    single_calls = []
+
+    async def fake_invoke_llm_batch_async(prompt, contents):
+        return response, make_usage(100, 20, estimated=False)
+
+    async def fake_moderate_uncached(content):
+        single_calls.append(content)
+        return {**verdict_for(content), "usage": make_usage(10, 5, estimated=False)}
+
+    service._invoke_llm_batch_async = fake_invoke_llm_batch_async
+    service._moderate_uncached = fake_moderate_uncached
+
+    async def run():
+        return await asyncio.gather(*(service.check_content(f"短い投稿{i}", "post") for i in range(2)))
+
+    results = asyncio.run(run())
+
+    assert sorted(single_calls) == ["短い投稿0", "短い投稿1"]
+    assert [r["reason"] for r in results] == ["短い投稿0", "短い投稿1"]
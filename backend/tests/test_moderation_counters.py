@@ -0,0 +1,180 @@
+import asyncio
+import time
+import uuid
+
+import pytest
+
+from app.config import settings
+from app.db.dynamodb import FakeDynamoDBBackend, FakeDynamoDBResource
+from app.db.repositories.moderation_repository import ModerationRepository
+from app.services.moderation_service import ModerationService
+
+
+def make_repository(backend=None):
+    if backend is None:
+        backend = FakeDynamoDBBackend()
+        backend.create_moderation_tables()
+    return ModerationRepository(dynamodb=FakeDynamoDBResource(backend))
+
+
+def make_record(result):
+    return {
+        "moderation_id": str(uuid.uuid4()),
+        "content": "テスト",
+        "content_type": "post",
+        "moderation_result": result,
+        "moderation_score": 0.5,
+        "created_at": int(time.time()),
+    }
+
+
+def test_reconcile_repairs_drifted_counters():
+    async def run():
+        repository = make_repository()
+        await repository.create_moderation_records([make_record("approved"), make_record("rejected")])
+        # 加算に失敗したなどでずれた状態を作る
+        repository._add_to_counter_shard(1, {"total_count": 5, "approved_count": 5, "rejected_count": 0})
+        totals = await repository.reconcile_moderation_counters(segments=2)
+        return totals, await repository.get_moderation_counters()
+
+    totals, counters = asyncio.run(run())
+
+    expected = {"total_count": 2, "approved_count": 1, "rejected_count": 1}
+    assert totals == expected
+    assert counters == expected
+
+
+def test_reconcile_keeps_increments_made_during_the_scan():
+    async def run():
+        repository = make_repository()
+        await repository.create_moderation_records([make_record("approved")])
+        count_segment = repository._count_segment
+
+        def count_segment_with_concurrent_write(segment, total_segments):
+            totals = count_segment(segment, total_segments)
+            if segment == 0:
+                # スキャンの後に別のリクエストがカウンターへ加算した場合
+                repository._apply_counter_deltas({"total_count": 1, "approved_count": 0, "rejected_count": 1})
+            return totals
+
+        repository._count_segment = count_segment_with_concurrent_write
+        await repository.reconcile_moderation_counters(segments=1)
+        return await repository.get_moderation_counters()
+
+    counters = asyncio.run(run())
+
+    assert counters == {"total_count": 2, "approved_count": 1, "rejected_count": 1}
+
+
+def test_reconcile_retries_when_a_record_is_saved_during_the_scan():
+    async def run():
+        repository = make_repository()
+        await repository.create_moderation_records([make_record("approved")])
+        count_segment = repository._count_segment
+        scans = []
+
+        def count_segment_after_a_concurrent_save(segment, total_segments):
+            if not scans:
+                # カウンターを読んだ後・スキャンの前に、別のリクエストが記録を保存してカウンターへ加算した場合
+                record = make_record("approved")
+                repository._put_records([record])
+                repository._apply_counter_deltas(repository._counter_deltas([record]))
+            scans.append(segment)
+            return count_segment(segment, total_segments)
+
+        repository._count_segment = count_segment_after_a_concurrent_save
+        totals = await repository.reconcile_moderation_counters(segments=1)
+        return totals, await repository.get_moderation_counters(), scans
+
+    totals, counters, scans = asyncio.run(run())
+
+    # 1回目はスキャン前に読んだ値からカウンターが変わっているため補正せず、読み込みからやり直す
+    assert scans == [0, 0]
+    expected = {"total_count": 2, "approved_count": 2, "rejected_count": 0}
+    assert totals == expected
+    # 保存された記録を二重に数えない
+    assert counters == expected
+
+
+def test_reconcile_gives_up_when_the_counters_keep_changing():
+    async def run():
+        repository = make_repository()
+        await repository.create_moderation_records([make_record("approved")])
+        repository._add_to_counter_shard(1, {"total_count": 5, "approved_count": 5, "rejected_count": 0})
+        count_segment = repository._count_segment
+
+        def count_segment_with_constant_writes(segment, total_segments):
+            repository._apply_counter_deltas({"total_count": 1, "approved_count": 1, "rejected_count": 0})
+            return count_segment(segment, total_segments)
+
+        repository._count_segment = count_segment_with_constant_writes
+        await repository.reconcile_moderation_counters(segments=1, max_attempts=3)
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(run())
+
+
+def test_reconcile_is_skipped_in_mock_mode():
+    async def run():
+        repository = ModerationRepository()
+        assert repository.mock_mode
+        await repository.create_moderation_record(make_record("approved"))
+        # メモリ上のカウンターだけがずれていても、リングバッファの記録からは再構築しない
+        repository._apply_counter_deltas({"total_count": 5, "approved_count": 5, "rejected_count": 0})
+        return await repository.reconcile_moderation_counters(), await repository.get_moderation_counters()
+
+    totals, counters = asyncio.run(run())
+
+    assert totals == counters == {"total_count": 6, "approved_count": 6, "rejected_count": 0}
+
+
+def test_rollups_are_read_with_a_single_query():
+    backend = FakeDynamoDBBackend()
+    backend.create_moderation_tables()
+    queries = []
+
+    async def run():
+        repository = make_repository(backend)
+        query_rollups = repository._query_rollups
+
+        def counting_query_rollups(*args):
+            queries.append(args[0])
+            return query_rollups(*args)
+
+        repository._query_rollups = counting_query_rollups
+        records = [make_record("approved") for _ in range(30)] + [make_record("rejected") for _ in range(10)]
+        now = int(time.time())
+        for record in records:
+            record["created_at"] = now
+            await repository.create_moderation_record(record)
+        return await repository.get_moderation_rollups("hour", now, now)
+
+    points = asyncio.run(run())
+
+    assert len(points) == 1
+    assert {field: points[0][field] for field in ("total_count", "approved_count", "rejected_count")} == {
+        "total_count": 40, "approved_count": 30, "rejected_count": 10,
+    }
+    stat_keys = {
+        item["stat_key"] for item in backend.table_items(settings.DYNAMODB_MODERATION_STATS_TABLE)
+        if item["stat_key"].startswith("rollup#hour#")
+    }
+    assert stat_keys == {"rollup#hour#*", "rollup#hour#post"}
+    assert queries == ["rollup#hour#*"]
+
+
+def test_rollup_read_errors_are_raised_instead_of_an_empty_series():
+    async def run():
+        service = ModerationService()
+        repository = make_repository()
+
+        def failing_query(**kwargs):
+            raise ConnectionError("dynamodb unavailable")
+
+        repository.stats_table.query = failing_query
+        service.moderation_repository = repository
+        now = int(time.time())
+        await service.get_moderation_timeseries("hour", now - 7200, now)
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(run())
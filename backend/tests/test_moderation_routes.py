@@ -0,0 +1,50 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.main import app
+
+USER_HEADERS = {"Authorization": "Bearer dev-token"}
+ADMIN_HEADERS = {"Authorization": "Bearer admin-secret"}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(settings, "ADMIN_API_TOKEN", "admin-secret")
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.mark.parametrize("method, path", [
+    ("get", "/api/moderation/cache/stats"),
+    ("post", "/api/moderation/cache/invalidate"),
+    ("get", "/api/moderation/write-behind/stats"),
+    ("get", "/api/moderation/usage/stats"),
+])
+def test_operational_endpoints_require_the_admin_token(client, method, path):
+    kwargs = {"json": {}} if method == "post" else {}
+
+    assert getattr(client, method)(path, headers=USER_HEADERS, **kwargs).status_code == 403
+    assert getattr(client, method)(path, headers=ADMIN_HEADERS, **kwargs).status_code == 200
+
+
+def test_batch_route_returns_one_result_per_item(client):
+    response = client.post(
+        "/api/moderation/check/batch",
+        json={"items": [{"content": "がんばれカープ", "content_type": "post"}, {"content": "今日は勝った", "content_type": "comment"}]},
+        headers=USER_HEADERS,
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["status"] == "success"
+    assert [item["index"] for item in body["data"]] == [0, 1]
+    assert all(item["status"] == "success" and item["error"] is None for item in body["data"])
+
+
+def test_batch_route_rejects_too_many_items(client):
+    items = [{"content": "投稿", "content_type": "post"}] * (settings.MODERATION_BATCH_MAX_ITEMS + 1)
+
+    response = client.post("/api/moderation/check/batch", json={"items": items}, headers=USER_HEADERS)
+
+    assert response.status_code == 400
@@ -0,0 +1,44 @@
+import threading
+from types import SimpleNamespace
+
+from app.utils.profiler import SamplingProfiler
+
+
+def fake_frame(filename, name):
+    return SimpleNamespace(f_code=SimpleNamespace(co_filename=filename, co_name=name))
+
+
+def test_waiting_threads_are_counted_as_idle_and_busy_threads_are_sampled():
+    stop = threading.Event()
+
+    def waiting():
+        stop.wait()
+
+    def busy_loop_for_profile():
+        while not stop.is_set():
+            sum(range(1000))
+
+    threads = [
+        threading.Thread(target=waiting, name="waiting-thread"),
+        threading.Thread(target=busy_loop_for_profile, name="busy-thread"),
+    ]
+    for thread in threads:
+        thread.start()
+    try:
+        result = SamplingProfiler(max_duration_seconds=1).profile(0.1, interval_seconds=0.005)
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+    stacks = "".join(result["stacks"])
+    assert "busy_loop_for_profile" in stacks
+    assert "waiting-thread" not in stacks
+    assert result["idle_samples"] > 0
+
+
+def test_uvloop_run_frame_is_idle():
+    # uvloopはループ本体がCのため、待機中のスタック先端はループを実行しているasyncio.runになる
+    assert SamplingProfiler._is_idle(fake_frame("/usr/lib/python3.11/asyncio/runners.py", "run"))
+    assert SamplingProfiler._is_idle(fake_frame("/usr/lib/python3.11/selectors.py", "select"))
+    assert not SamplingProfiler._is_idle(fake_frame("/app/services/moderation_service.py", "run"))
@@ -0,0 +1,76 @@
+import json
+
+import pytest
+
+from app.config import settings
+from app.services.moderation_service import ModerationService
+from app.services.prompts import get_model_family
+
+
+@pytest.mark.parametrize("model_id, family", [
+    ("anthropic.claude-v2", "anthropic-completion"),
+    ("anthropic.claude-v2:1", "anthropic-completion"),
+    ("anthropic.claude-instant-v1", "anthropic-completion"),
+    ("anthropic.claude-3-haiku-20240307-v1:0", "anthropic-messages"),
+    ("us.anthropic.claude-3-5-sonnet-20240620-v1:0", "anthropic-messages"),
+    ("amazon.titan-text-express-v1", "titan"),
+    ("unknown.model", "anthropic-completion"),
+    ("", "anthropic-completion"),
+])
+def test_model_family_is_selected_from_the_model_id(model_id, family):
+    assert get_model_family(model_id).name == family
+
+
+def test_completion_family_wraps_the_prompt_in_human_assistant_turns():
+    family = get_model_family("anthropic.claude-v2")
+    prompt = family.single_template.render("テスト投稿")
+
+    assert prompt.startswith("\n\nHuman: ")
+    assert prompt.endswith("\n\nAssistant:")
+    assert "<content>テスト投稿</content>" in prompt
+    body = json.loads(family.build_body(prompt, 300))
+    assert body["prompt"] == prompt
+    assert body["max_tokens_to_sample"] == 300
+
+
+def test_messages_family_sends_the_prompt_as_a_user_message():
+    family = get_model_family("anthropic.claude-3-haiku-20240307-v1:0")
+    prompt = family.single_template.render("テスト投稿")
+
+    assert "Human:" not in prompt
+    body = json.loads(family.build_body(prompt, 300))
+    assert body["messages"] == [{"role": "user", "content": prompt}]
+    assert body["max_tokens"] == 300
+    assert family.extract_completion({"content": [{"type": "text", "text": "{}"}]}) == "{}"
+    assert family.extract_stream_text({"type": "content_block_delta", "delta": {"text": "abc"}}) == "abc"
+    assert family.extract_stream_text({"type": "message_start"}) == ""
+
+
+def test_titan_family_uses_its_own_turn_markers_and_usage_fields():
+    family = get_model_family("amazon.titan-text-express-v1")
+    prompt = family.single_template.render("テスト投稿")
+
+    assert prompt.startswith("User: ") and prompt.endswith("\nBot:")
+    body = json.loads(family.build_body(prompt, 300))
+    assert body["inputText"] == prompt
+    assert body["textGenerationConfig"]["maxTokenCount"] == 300
+    payload = {"inputTextTokenCount": 12, "results": [{"outputText": "{}", "tokenCount": 3}]}
+    assert family.extract_completion(payload) == "{}"
+    assert family.extract_usage(payload) == {"input_tokens": 12, "output_tokens": 3}
+
+
+def test_batch_template_numbers_every_content():
+    family = get_model_family("anthropic.claude-v2")
+    prompt = family.batch_template.render("1. 投稿A\n2. 投稿B")
+
+    assert "1. 投稿A\n2. 投稿B" in prompt
+    assert "JSON配列" in prompt
+
+
+def test_service_uses_the_family_of_the_configured_model(monkeypatch):
+    monkeypatch.setattr(settings, "BEDROCK_MODEL_ID", "anthropic.claude-3-haiku-20240307-v1:0")
+    service = ModerationService()
+
+    assert service.model_family.name == "anthropic-messages"
+    assert service._create_moderation_prompt("テスト投稿") == service.model_family.single_template.render("テスト投稿")
+    assert service.get_token_usage_stats()["prompt_family"] == "anthropic-messages"
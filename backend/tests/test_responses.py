@@ -0,0 +1,38 @@
+import json
+
+import pytest
+from pydantic import ValidationError
+
+from app.schemas.moderation import ModerationHistoryResponse, ModerationStatsResponse
+from app.utils.responses import success_response
+
+
+def history_item(**overrides):
+    item = {
+        "moderation_id": "id-1",
+        "content_id": "temp-id-1",
+        "content_type": "post",
+        "original_content": "がんばれ",
+        "moderation_result": "approved",
+        "moderation_reason": "応援です",
+        "moderation_score": 1,
+        "created_at": 1700000000,
+    }
+    item.update(overrides)
+    return item
+
+
+def test_success_response_applies_the_response_model():
+    response = success_response(ModerationHistoryResponse, [history_item(history_bucket="0001")], next_token=None)
+    body = json.loads(response.body)
+
+    assert response.media_type == "application/json"
+    # floatの項目は整数でも1.0で返し、スキーマにない項目は返さない
+    assert body["data"][0]["moderation_score"] == 1.0 and isinstance(body["data"][0]["moderation_score"], float)
+    assert "history_bucket" not in body["data"][0]
+    assert body["next_token"] is None
+
+
+def test_success_response_rejects_data_that_does_not_match_the_schema():
+    with pytest.raises(ValidationError):
+        success_response(ModerationStatsResponse, {"total_count": 1, "approved_count": None})
@@ -0,0 +1,69 @@
+from app.config import settings
+from app.services.moderation_service import ModerationService
+from app.services.rule_engine import RuleEngine
+
+
+def _engine(tmp_path, lines):
+    path = tmp_path / "rules.tsv"
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return RuleEngine(str(path), reload_interval_seconds=3600)
+
+
+def test_ascii_patterns_match_on_word_boundaries_only(tmp_path):
+    engine = _engine(tmp_path, ["hate\treject\t0.3\t差別的な表現が含まれています"])
+
+    assert engine.evaluate("whatever, nice game") is None
+    assert engine.evaluate("chateau") is None
+    assert engine.evaluate("hatem") is None
+    verdict = engine.evaluate("I HATE this team")
+    assert verdict == {"result": "rejected", "reason": "差別的な表現が含まれています", "score": 0.3, "source": "rules"}
+    # 日本語に続く場合や記号で区切られた場合も単語の境界として扱う
+    assert engine.evaluate("本当にhate!") is not None
+
+
+def test_japanese_patterns_match_as_substrings(tmp_path):
+    engine = _engine(tmp_path, ["死ね\treject\t0.05\t暴力的な表現が含まれています"])
+
+    assert engine.evaluate("お前もう死ねよ")["result"] == "rejected"
+    assert engine.evaluate("死んでも応援する") is None
+
+
+def test_lowest_reject_score_wins_and_approve_needs_full_match(tmp_path):
+    engine = _engine(tmp_path, [
+        "# コメント行",
+        "死ね\treject\t0.05\t暴力",
+        "殺すぞ\treject\t0.01\t脅迫",
+        "がんばれカープ\tapprove\t0.95\t応援",
+    ])
+
+    assert engine.rule_count == 3
+    assert engine.evaluate("死ね、殺すぞ")["reason"] == "脅迫"
+    assert engine.evaluate("ガンバレカープ") is None
+    assert engine.evaluate("がんばれカープ")["result"] == "approved"
+    assert engine.evaluate("がんばれカープ！明日も勝つ") is None
+
+
+def test_reload_picks_up_dictionary_changes(tmp_path):
+    engine = _engine(tmp_path, ["死ね\treject"])
+    (tmp_path / "rules.tsv").write_text("spam\treject\n", encoding="utf-8")
+
+    assert engine.reload()
+    assert engine.evaluate("死ね") is None
+    assert engine.evaluate("buy now spam")["score"] == 0.1
+
+
+def test_default_dictionary_does_not_reject_harmless_posts():
+    engine = RuleEngine(settings.MODERATION_RULES_PATH)
+
+    for content in ("whatever, nice game", "chateau", "spammer? no, a fan", "今日の試合は最高でした！"):
+        assert engine.evaluate(content) is None
+    assert engine.evaluate("お前なんか死ね")["result"] == "rejected"
+
+
+def test_mock_verdict_does_not_depend_on_rule_engine():
+    service = ModerationService()
+    service.rule_engine = None
+
+    assert service._mock_verdict("this is spam")["result"] == "rejected"
+    assert service._mock_verdict("ナイスゲーム")["result"] == "approved"
+    assert service._mock_verdict("whatever, nice game")["result"] == "approved"
@@ -0,0 +1,52 @@
+import asyncio
+
+from app.services.moderation_service import ModerationService
+from app.services.single_flight import SingleFlight
+from app.services.token_estimator import make_usage
+
+
+def test_concurrent_calls_share_one_execution():
+    async def run():
+        flight = SingleFlight()
+        calls = 0
+
+        async def work():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return {"value": 1}
+
+        results = await asyncio.gather(*(flight.do("key", work) for _ in range(5)))
+        return flight, calls, results
+
+    flight, calls, results = asyncio.run(run())
+
+    assert calls == 1
+    assert [leader for _, leader in results].count(True) == 1
+    assert all(value == {"value": 1} for value, _ in results)
+    assert flight.stats() == {"in_flight": 0, "executions": 1, "shared": 4}
+
+
+def test_followers_do_not_report_the_leaders_token_usage():
+    service = ModerationService()
+    service.rule_engine = None
+    service.verdict_cache = None
+    llm_calls = 0
+
+    async def fake_moderate_uncached(content):
+        nonlocal llm_calls
+        llm_calls += 1
+        await asyncio.sleep(0.02)
+        return {"result": "approved", "reason": "問題ありません", "score": 0.9, "usage": make_usage(120, 30, estimated=False)}
+
+    service._moderate_uncached = fake_moderate_uncached
+
+    async def run():
+        return await asyncio.gather(*(service.check_content("同時に届いた同じ投稿", "post") for _ in range(4)))
+
+    results = asyncio.run(run())
+
+    assert llm_calls == 1
+    assert sum(result["usage"]["input_tokens"] for result in results) == 120
+    assert sum(result["usage"]["output_tokens"] for result in results) == 30
+    assert len({id(result["usage"]) for result in results}) == len(results)
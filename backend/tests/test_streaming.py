@@ -0,0 +1,176 @@
+import asyncio
+import json
+import threading
+
+import pytest
+
+from app.config import settings
+from app.services.llm_parser import IncrementalVerdictParser
+from app.services.moderation_service import ModerationService
+
+
+def chunk_event(text, **extra):
+    return {"chunk": {"bytes": json.dumps({"completion": text, **extra}).encode()}}
+
+
+class FakeEventStream:
+    """
+    invoke_model_with_response_streamの応答本文（EventStream）の代わり。
+    読み進めたイベント数とclose()の呼び出しを記録します。
+    """
+
+    def __init__(self, events, fail_after=None, gate=None, gate_after=None):
+        self.events = events
+        self.fail_after = fail_after
+        self.gate = gate
+        self.gate_after = gate_after
+        self.consumed = 0
+        self.closed = False
+
+    def __iter__(self):
+        for index, event in enumerate(self.events):
+            if index == self.fail_after:
+                raise ConnectionError("stream reset")
+            if index == self.gate_after:
+                # 呼び出し元が判定を受け取るまで残りの受信を止める
+                assert self.gate.wait(timeout=5)
+            self.consumed += 1
+            yield event
+
+    def close(self):
+        self.closed = True
+
+
+class FakeBedrockClient:
+    def __init__(self, stream):
+        self.stream = stream
+        self.calls = 0
+
+    def invoke_model_with_response_stream(self, modelId, body):
+        self.calls += 1
+        return {"body": self.stream}
+
+
+VERDICT_EVENTS = [
+    chunk_event('{"result": "rej'),
+    chunk_event('ected", "score": 0.'),
+    chunk_event('2, "reason": "誹謗中傷'),
+    chunk_event('を含みます"}'),
+    chunk_event("\n補足の説明文が続きます。", **{
+        "amazon-bedrock-invocationMetrics": {"inputTokenCount": 120, "outputTokenCount": 40},
+    }),
+]
+
+
+@pytest.fixture
+def make_service(monkeypatch):
+    monkeypatch.setattr(settings, "BEDROCK_STREAMING_ENABLED", True)
+    monkeypatch.setattr(settings, "BEDROCK_MODEL_ID", "anthropic.claude-v2")
+
+    def _make(stream):
+        service = ModerationService()
+        service.mock_mode = False
+        service.bedrock_client = FakeBedrockClient(stream)
+        return service
+
+    return _make
+
+
+def moderate(service, content="テスト投稿"):
+    verdict = asyncio.run(service._moderate_uncached(content))
+    # 判定は受信スレッドの終了を待たずに返るので、ストリームの後始末まで待ってから確認する
+    service._llm_executor.shutdown(wait=True)
+    return verdict
+
+
+def test_parser_confirms_once_result_and_a_terminated_score_arrive():
+    parser = IncrementalVerdictParser()
+
+    assert parser.feed('説明 {"result": "approved", "score": 0.') is None
+    # 区切り文字が来るまでスコアは確定しない（"0.9" が "0." の時点で一致しない）
+    assert parser.feed("9") is None
+    verdict = parser.feed(", ")
+
+    assert verdict == {"result": "approved", "reason": "判定理由の受信前に判定を確定しました", "score": 0.9}
+    assert parser.feed('"reason": "問題ありません"}') is None
+
+
+def test_confident_verdict_stops_reading_the_stream(make_service, monkeypatch):
+    monkeypatch.setattr(settings, "BEDROCK_STREAM_CANCEL_REMAINDER", True)
+    stream = FakeEventStream(VERDICT_EVENTS)
+    service = make_service(stream)
+
+    verdict = moderate(service)
+
+    assert verdict["result"] == "rejected"
+    assert verdict["score"] == 0.2
+    assert verdict["reason"] == "判定理由の受信前に判定を確定しました"
+    assert "fallback" not in verdict
+    # 判定が確定した3件目で受信を打ち切り、ストリームを閉じる
+    assert stream.consumed == 3
+    assert stream.closed
+    # 途中で返すので使用量は受信済みの出力からの概算
+    assert verdict["usage"]["estimated"] is True
+
+
+def test_verdict_is_returned_before_the_remainder_is_read(make_service, monkeypatch):
+    monkeypatch.setattr(settings, "BEDROCK_STREAM_CANCEL_REMAINDER", False)
+    gate = threading.Event()
+    stream = FakeEventStream(VERDICT_EVENTS, gate=gate, gate_after=3)
+    service = make_service(stream)
+
+    async def run():
+        verdict = await service._moderate_uncached("テスト投稿")
+        consumed_at_return = stream.consumed
+        gate.set()
+        # 残りの受信は専用プール上で続き、最後まで読み切ってから閉じる
+        await asyncio.get_running_loop().run_in_executor(None, service._llm_executor.shutdown, True)
+        return verdict, consumed_at_return
+
+    verdict, consumed_at_return = asyncio.run(run())
+
+    assert verdict["result"] == "rejected"
+    assert consumed_at_return == 3
+    assert stream.consumed == len(VERDICT_EVENTS)
+    assert stream.closed
+
+
+def test_stream_error_before_the_verdict_falls_back_to_approval(make_service):
+    stream = FakeEventStream(VERDICT_EVENTS, fail_after=1)
+    service = make_service(stream)
+
+    verdict = moderate(service)
+
+    assert verdict["result"] == "approved"
+    assert verdict["score"] == 0.5
+    assert verdict["fallback"] is True
+    assert stream.closed
+
+
+def test_stream_error_after_the_verdict_keeps_the_verdict(make_service, monkeypatch):
+    monkeypatch.setattr(settings, "BEDROCK_STREAM_CANCEL_REMAINDER", False)
+    stream = FakeEventStream(VERDICT_EVENTS, fail_after=4)
+    service = make_service(stream)
+
+    verdict = moderate(service)
+
+    assert verdict["result"] == "rejected"
+    assert "fallback" not in verdict
+    assert stream.closed
+
+
+def test_stream_that_never_completes_the_json_falls_back(make_service):
+    events = [
+        chunk_event('{"result": "rejected", '),
+        chunk_event('"reason": "途中で途切れ'),
+    ]
+    stream = FakeEventStream(events)
+    service = make_service(stream)
+
+    verdict = moderate(service)
+
+    # scoreが届かないので判定は確定せず、応答全体の解析にも失敗してデフォルトで承認する
+    assert verdict["result"] == "approved"
+    assert verdict["fallback"] is True
+    assert stream.consumed == len(events)
+    assert stream.closed
@@ -0,0 +1,80 @@
+import asyncio
+
+import pytest
+
+from app.config import settings
+from app.services.moderation_service import ModerationService
+from app.services.token_estimator import estimate_tokens, make_usage, truncate_to_tokens
+
+
+def test_ascii_is_about_four_characters_per_token():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("a") == 1
+    assert estimate_tokens("abcd" * 10) == 10
+
+
+def test_japanese_is_about_one_character_per_token():
+    assert estimate_tokens("カープ最高") == 5
+    # 全角の記号・数字も非ASCII文字として数える
+    assert estimate_tokens("３連勝！") == 4
+
+
+def test_mixed_japanese_and_ascii_counts_each_part():
+    # ASCII 8文字（2トークン）+ 日本語 4文字（4トークン）
+    assert estimate_tokens("Carp WIN広島優勝") == 6
+    assert estimate_tokens("abcd日本") == 3
+
+
+@pytest.mark.parametrize("text", [
+    "a" * 1000,
+    "あ" * 1000,
+    "Carp ファン最高！ " * 200,
+    "広島" * 300 + "x" * 700,
+], ids=["ascii", "japanese", "mixed", "japanese-then-ascii"])
+def test_truncate_keeps_the_estimate_within_the_budget(text):
+    truncated = truncate_to_tokens(text, 100)
+
+    assert estimate_tokens(truncated) <= 100
+    assert text.startswith(truncated)
+    # 上限のほぼいっぱいまでは残す
+    assert estimate_tokens(truncated) >= 95
+
+
+def test_truncate_returns_text_within_the_budget_unchanged():
+    assert truncate_to_tokens("短い投稿", 100) == "短い投稿"
+    assert truncate_to_tokens("abc", 0) == ""
+
+
+def test_oversize_content_is_truncated_before_the_llm_call(monkeypatch):
+    monkeypatch.setattr(settings, "MODERATION_MAX_INPUT_TOKENS", 50)
+    monkeypatch.setattr(settings, "MODERATION_OVERSIZE_STRATEGY", "truncate")
+    monkeypatch.setattr(settings, "MODERATION_CHUNK_ENABLED", False)
+    monkeypatch.setattr(settings, "MICRO_BATCH_ENABLED", False)
+    service = ModerationService()
+    seen = []
+
+    async def fake_uncached(content):
+        seen.append(content)
+        return {"result": "approved", "reason": "問題ありません", "score": 0.9, "usage": make_usage(50, 10, estimated=True)}
+
+    monkeypatch.setattr(service, "_moderate_uncached", fake_uncached)
+    content = "広島カープの投稿です。" * 20
+
+    result = asyncio.run(service._moderate_and_store(content, "post"))
+
+    assert len(seen) == 1
+    assert content.startswith(seen[0]) and len(seen[0]) < len(content)
+    assert estimate_tokens(seen[0]) <= 50
+    assert result["usage"]["input_truncated"] is True
+
+
+def test_content_within_the_budget_is_not_marked_truncated(monkeypatch):
+    monkeypatch.setattr(settings, "MODERATION_MAX_INPUT_TOKENS", 50)
+    monkeypatch.setattr(settings, "MODERATION_OVERSIZE_STRATEGY", "truncate")
+    monkeypatch.setattr(settings, "MODERATION_CHUNK_ENABLED", False)
+    monkeypatch.setattr(settings, "MICRO_BATCH_ENABLED", False)
+    service = ModerationService()
+
+    result = asyncio.run(service._moderate_and_store("短い投稿です", "post"))
+
+    assert result["usage"]["input_truncated"] is False
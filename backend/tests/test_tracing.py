@@ -0,0 +1,103 @@
+import asyncio
+import uuid
+
+import httpx
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.main import app
+from app.middleware.tracing_middleware import TracingMiddleware
+from app.utils import tracing
+
+USER_HEADERS = {"Authorization": "Bearer dev-token"}
+
+
+def traced_app(sample_rate):
+    # main.pyと同じくアプリ全体の外側にミドルウェアを置く
+    return TracingMiddleware(app, sample_rate=sample_rate)
+
+
+def check(client):
+    return client.post(
+        "/api/moderation/check",
+        json={"content": f"がんばれカープ {uuid.uuid4()}", "content_type": "post"},
+        headers=USER_HEADERS,
+    )
+
+
+def server_timing_names(header):
+    return [part.split(";", 1)[0].strip() for part in header.split(",")]
+
+
+def test_sampled_requests_get_a_server_timing_header(monkeypatch):
+    monkeypatch.setattr(settings, "TRACING_SAMPLE_RATE", 1.0)
+    with TestClient(traced_app(settings.TRACING_SAMPLE_RATE)) as client:
+        response = check(client)
+
+    assert response.status_code == 200
+    names = server_timing_names(response.headers["Server-Timing"])
+    assert {"auth", "precheck", "llm", "parse", "store"} <= set(names)
+    assert names[-1] == "total"
+
+
+def test_unsampled_requests_have_no_server_timing_header(monkeypatch):
+    monkeypatch.setattr(settings, "TRACING_SAMPLE_RATE", 0.0)
+    with TestClient(traced_app(settings.TRACING_SAMPLE_RATE)) as client:
+        response = check(client)
+
+    assert response.status_code == 200
+    assert "Server-Timing" not in response.headers
+
+
+def test_app_without_tracing_configured_has_no_server_timing_header():
+    # テスト環境ではTRACING_SAMPLE_RATEの既定値0のままなので、ミドルウェア自体が登録されていない
+    assert not any(m.cls is TracingMiddleware for m in app.user_middleware)
+    with TestClient(app) as client:
+        response = check(client)
+
+    assert response.status_code == 200
+    assert "Server-Timing" not in response.headers
+
+
+def test_spans_do_not_leak_between_concurrent_requests():
+    inner = FastAPI()
+    both_started = asyncio.Event()
+    started = []
+
+    @inner.get("/work/{name}")
+    async def work(name: str):
+        with tracing.span(f"before-{name}"):
+            started.append(name)
+            if len(started) == 2:
+                both_started.set()
+            # 2つのリクエストの処理を交互に進める
+            await asyncio.wait_for(both_started.wait(), timeout=5)
+        with tracing.span(f"after-{name}"):
+            await asyncio.sleep(0)
+        return {"name": name}
+
+    async def run():
+        transport = httpx.ASGITransport(app=TracingMiddleware(inner, sample_rate=1.0))
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            responses = await asyncio.gather(client.get("/work/a"), client.get("/work/b"))
+        return responses, tracing.current_trace()
+
+    (first, second), trace_after = asyncio.run(run())
+
+    assert server_timing_names(first.headers["Server-Timing"]) == ["before-a", "after-a", "total"]
+    assert server_timing_names(second.headers["Server-Timing"]) == ["before-b", "after-b", "total"]
+    # リクエストの外側のコンテキストにはトレースが残らない
+    assert trace_after is None
+
+
+def test_spans_after_the_response_are_not_recorded():
+    with tracing.start_trace() as trace:
+        with tracing.span("inside"):
+            pass
+    with tracing.span("outside"):
+        pass
+    trace.add("late", 0.0, 0.0)
+
+    assert [span.name for span in trace.spans] == ["inside"]
+    assert tracing.current_trace() is None
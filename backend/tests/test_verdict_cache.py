@@ -0,0 +1,50 @@
+from app.services.verdict_cache import VerdictCache, make_cache_key, make_content_key
+
+VERDICT = {"result": "approved", "reason": "問題ありません", "score": 0.9}
+
+
+def _key(content, content_type):
+    return make_cache_key(content, content_type, "model", "1")
+
+
+def _group(content):
+    return make_content_key(content, "model", "1")
+
+
+def test_invalidate_group_removes_every_content_type():
+    cache = VerdictCache(max_size=10)
+    for content_type in ("post", "comment"):
+        cache.set(_key("頑張れカープ", content_type), VERDICT, group=_group("頑張れカープ"))
+    cache.set(_key("別の投稿", "post"), VERDICT, group=_group("別の投稿"))
+
+    # 正規化（全角・大文字小文字・空白）後に同じコンテンツならまとめて削除される
+    assert cache.invalidate_group(_group(" 頑張れカープ ")) == 2
+    assert cache.get(_key("頑張れカープ", "post")) is None
+    assert cache.get(_key("頑張れカープ", "comment")) is None
+    assert cache.get(_key("別の投稿", "post")) == VERDICT
+    assert cache.invalidate_group(_group("頑張れカープ")) == 0
+
+
+def test_eviction_and_invalidate_keep_group_index_consistent():
+    cache = VerdictCache(max_size=2)
+    cache.set(_key("a", "post"), VERDICT, group=_group("a"))
+    cache.set(_key("a", "comment"), VERDICT, group=_group("a"))
+    cache.set(_key("b", "post"), VERDICT, group=_group("b"))
+
+    assert cache.evictions == 1
+    assert cache.invalidate(_key("a", "comment"))
+    assert cache.invalidate_group(_group("a")) == 0
+    assert cache.invalidate_group(_group("b")) == 1
+    assert cache.stats()["size"] == 0
+
+
+def test_service_invalidates_content_without_content_type():
+    from app.services.moderation_service import ModerationService
+
+    service = ModerationService()
+    service._store_cached_verdict("ナイスゲーム", "post", VERDICT)
+    service._store_cached_verdict("ナイスゲーム", "comment", VERDICT)
+
+    assert service.invalidate_verdict_cache("ナイスゲーム", "comment") == 1
+    assert service.invalidate_verdict_cache("ナイスゲーム") == 1
+    assert service._get_cached_verdict("ナイスゲーム", "post") is None
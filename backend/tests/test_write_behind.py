@@ -0,0 +1,140 @@
+import asyncio
+import time
+
+from app.config import settings
+from app.db.dynamodb import FakeDynamoDBBackend, FakeDynamoDBResource
+from app.db.repositories.moderation_repository import ModerationRepository
+from app.db.repositories.write_behind import WriteBehindBuffer
+
+
+def make_records(count):
+    return [{"moderation_id": f"id-{i:03d}"} for i in range(count)]
+
+
+def test_close_flushes_queued_records_in_batches():
+    batches = []
+    flushed = []
+
+    async def write_batch(records):
+        batches.append([r["moderation_id"] for r in records])
+        return []
+
+    async def on_flushed(records):
+        flushed.extend(r["moderation_id"] for r in records)
+
+    async def run():
+        buffer = WriteBehindBuffer(write_batch, on_flushed=on_flushed, flush_interval_ms=60000)
+        for record in make_records(30):
+            await buffer.put(record)
+        await buffer.close()
+        return buffer
+
+    buffer = asyncio.run(run())
+
+    assert [len(batch) for batch in batches] == [25, 5]
+    assert flushed == [f"id-{i:03d}" for i in range(30)]
+    assert buffer.queue_depth == 0
+    assert buffer.stats()["flushed_records"] == 30
+
+
+def test_flushes_after_the_interval_without_close():
+    written = []
+
+    async def write_batch(records):
+        written.extend(records)
+        return []
+
+    async def run():
+        buffer = WriteBehindBuffer(write_batch, flush_interval_ms=10)
+        for record in make_records(3):
+            await buffer.put(record)
+        await asyncio.sleep(0.1)
+        count = len(written)
+        await buffer.close()
+        return count
+
+    assert asyncio.run(run()) == 3
+
+
+def test_unprocessed_records_are_retried():
+    attempts = []
+
+    async def write_batch(records):
+        attempts.append(len(records))
+        # 1回目は後半を未処理として返す
+        return records[2:] if len(attempts) == 1 else []
+
+    async def run():
+        buffer = WriteBehindBuffer(write_batch, flush_interval_ms=60000, base_backoff_ms=1)
+        for record in make_records(5):
+            await buffer.put(record)
+        await buffer.close()
+        return buffer.stats()
+
+    stats = asyncio.run(run())
+
+    assert attempts == [5, 3]
+    assert stats["retry_count"] == 1
+    assert stats["flushed_records"] == 5
+    assert stats["failed_records"] == 0
+
+
+def test_records_that_keep_failing_are_counted_and_not_reported_as_flushed():
+    flushed = []
+
+    async def write_batch(records):
+        if any(r["moderation_id"] == "id-001" for r in records):
+            raise RuntimeError("throttled")
+        return []
+
+    async def on_flushed(records):
+        flushed.extend(records)
+
+    async def run():
+        buffer = WriteBehindBuffer(
+            write_batch, on_flushed=on_flushed, batch_size=1, flush_interval_ms=60000,
+            max_retries=2, base_backoff_ms=1,
+        )
+        for record in make_records(3):
+            await buffer.put(record)
+        await buffer.close()
+        return buffer.stats()
+
+    stats = asyncio.run(run())
+
+    assert stats["failed_records"] == 1
+    assert stats["retry_count"] == 2
+    assert [r["moderation_id"] for r in flushed] == ["id-000", "id-002"]
+
+
+def test_repository_write_behind_survives_throttling(monkeypatch):
+    monkeypatch.setattr(settings, "WRITE_BEHIND_ENABLED", True)
+    # 再送の上限で失敗しないよう十分に再送させる（スロットリングの発生は乱数のため）
+    monkeypatch.setattr(settings, "WRITE_BEHIND_MAX_RETRIES", 10)
+    backend = FakeDynamoDBBackend(throttle_rate=0.3, seed=7)
+    backend.create_moderation_tables()
+    now = int(time.time())
+    records = [
+        {
+            "moderation_id": f"id-{i:03d}",
+            "content": "テスト",
+            "content_type": "post",
+            "moderation_result": "rejected" if i % 4 == 0 else "approved",
+            "moderation_score": 0.5,
+            "created_at": now,
+        }
+        for i in range(40)
+    ]
+
+    async def run():
+        repository = ModerationRepository(dynamodb=FakeDynamoDBResource(backend))
+        for record in records:
+            assert await repository.create_moderation_record(record)
+        await repository.flush()
+        return repository.get_write_behind_stats()
+
+    stats = asyncio.run(run())
+
+    assert stats["failed_records"] == 0
+    assert stats["retry_count"] > 0
+    assert len(backend.table_items(settings.DYNAMODB_MODERATION_TABLE)) == 40
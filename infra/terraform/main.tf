@@ -21,6 +21,7 @@ module "dynamodb" {
   post_table_name       = "${var.project_name}-posts"
   comment_table_name    = "${var.project_name}-comments"
   moderation_table_name = "${var.project_name}-moderation"
+  moderation_stats_table_name = "${var.project_name}-moderation-stats"
   
   tags = var.tags
 }
@@ -36,7 +37,8 @@ module "iam" {
     module.dynamodb.board_table_arn,
     module.dynamodb.post_table_arn,
     module.dynamodb.comment_table_arn,
-    module.dynamodb.moderation_table_arn
+    module.dynamodb.moderation_table_arn,
+    module.dynamodb.moderation_stats_table_arn
   ]
   
   bedrock_model_id = var.bedrock_model_id
@@ -57,8 +59,13 @@ module "lambda" {
     DYNAMODB_POST_TABLE       = module.dynamodb.post_table_name
     DYNAMODB_COMMENT_TABLE    = module.dynamodb.comment_table_name
     DYNAMODB_MODERATION_TABLE = module.dynamodb.moderation_table_name
+    DYNAMODB_MODERATION_STATS_TABLE = module.dynamodb.moderation_stats_table_name
+    DYNAMODB_MODERATION_HISTORY_INDEX = module.dynamodb.moderation_history_index_name
     BEDROCK_MODEL_ID          = var.bedrock_model_id
+    MODERATION_CHUNK_ENABLED  = var.moderation_chunk_enabled ? "True" : "False"
   }
+
+  warmup_schedule_expression = var.lambda_warmup_schedule_expression
   
   tags = var.tags
 }
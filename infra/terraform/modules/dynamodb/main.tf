@@ -60,5 +60,43 @@ resource "aws_dynamodb_table" "moderation_table" {
     type = "S"
   }
   
+  attribute {
+    name = "history_bucket"
+    type = "S"
+  }
+  
+  attribute {
+    name = "created_at"
+    type = "N"
+  }
+  
+  # 履歴を新しい順にページングするためのインデックス（日単位バケット + created_at）
+  global_secondary_index {
+    name            = var.moderation_history_index_name
+    hash_key        = "history_bucket"
+    range_key       = "created_at"
+    projection_type = "ALL"
+  }
+  
+  tags = var.tags
+} 
+
+# モデレーション集計テーブル（書き込み時に更新するカウンター）
+resource "aws_dynamodb_table" "moderation_stats_table" {
+  name           = var.moderation_stats_table_name
+  billing_mode   = "PAY_PER_REQUEST"
+  hash_key       = "stat_key"
+  range_key      = "bucket"
+  
+  attribute {
+    name = "stat_key"
+    type = "S"
+  }
+  
+  attribute {
+    name = "bucket"
+    type = "S"
+  }
+  
   tags = var.tags
-} 
\ No newline at end of file
+}
@@ -23,6 +23,16 @@ output "moderation_table_name" {
   value       = aws_dynamodb_table.moderation_table.name
 }
 
+output "moderation_history_index_name" {
+  description = "モデレーション履歴用GSI名"
+  value       = var.moderation_history_index_name
+}
+
+output "moderation_stats_table_name" {
+  description = "モデレーション集計テーブル名"
+  value       = aws_dynamodb_table.moderation_stats_table.name
+}
+
 output "user_table_arn" {
   description = "ユーザーテーブルのARN"
   value       = aws_dynamodb_table.user_table.arn
@@ -46,4 +56,9 @@ output "comment_table_arn" {
 output "moderation_table_arn" {
   description = "モデレーションテーブルのARN"
   value       = aws_dynamodb_table.moderation_table.arn
-} 
\ No newline at end of file
+} 
+
+output "moderation_stats_table_arn" {
+  description = "モデレーション集計テーブルのARN"
+  value       = aws_dynamodb_table.moderation_stats_table.arn
+}
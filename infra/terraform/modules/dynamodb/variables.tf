@@ -23,6 +23,17 @@ variable "moderation_table_name" {
   type        = string
 }
 
+variable "moderation_history_index_name" {
+  description = "モデレーション履歴用GSI名"
+  type        = string
+  default     = "history-created_at-index"
+}
+
+variable "moderation_stats_table_name" {
+  description = "モデレーション集計テーブル名"
+  type        = string
+}
+
 variable "tags" {
   description = "リソースに付与するタグ"
   type        = map(string)
@@ -70,7 +70,8 @@ resource "aws_iam_policy" "dynamodb_policy" {
           "dynamodb:Query",
           "dynamodb:Scan",
           "dynamodb:BatchGetItem",
-          "dynamodb:BatchWriteItem"
+          "dynamodb:BatchWriteItem",
+          "dynamodb:ConditionCheckItem"
         ]
         Resource = [
           "arn:aws:dynamodb:ap-northeast-1:${data.aws_caller_identity.current.account_id}:table/carp-connect-moderation-*"
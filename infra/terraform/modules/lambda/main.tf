@@ -24,4 +24,29 @@ resource "aws_lambda_function" "main" {
 resource "aws_lambda_function_url" "main" {
   function_name      = aws_lambda_function.main.function_name
   authorization_type = "NONE"
-} 
\ No newline at end of file
+} 
+
+# ウォームアップ用の定期呼び出し（warmup_schedule_expressionが空の場合は作成しない）
+resource "aws_cloudwatch_event_rule" "warmup" {
+  count               = var.warmup_schedule_expression == "" ? 0 : 1
+  name                = "${var.project_name}-warmup"
+  description         = "Lambda関数のウォームアップ"
+  schedule_expression = var.warmup_schedule_expression
+
+  tags = var.tags
+}
+
+resource "aws_cloudwatch_event_target" "warmup" {
+  count = var.warmup_schedule_expression == "" ? 0 : 1
+  rule  = aws_cloudwatch_event_rule.warmup[0].name
+  arn   = aws_lambda_function.main.arn
+}
+
+resource "aws_lambda_permission" "warmup" {
+  count         = var.warmup_schedule_expression == "" ? 0 : 1
+  statement_id  = "AllowWarmupFromEventBridge"
+  action        = "lambda:InvokeFunction"
+  function_name = aws_lambda_function.main.function_name
+  principal     = "events.amazonaws.com"
+  source_arn    = aws_cloudwatch_event_rule.warmup[0].arn
+}
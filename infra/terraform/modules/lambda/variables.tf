@@ -16,4 +16,10 @@ variable "environment_variables" {
 variable "tags" {
   description = "リソースに付与するタグ"
   type        = map(string)
-} 
\ No newline at end of file
+} 
+
+variable "warmup_schedule_expression" {
+  description = "ウォームアップ用に関数を定期実行するスケジュール式（例: rate(5 minutes)。空の場合は作成しない）"
+  type        = string
+  default     = ""
+}
@@ -11,6 +11,7 @@ output "dynamodb_table_names" {
     post_table       = module.dynamodb.post_table_name
     comment_table    = module.dynamodb.comment_table_name
     moderation_table = module.dynamodb.moderation_table_name
+    moderation_stats_table = module.dynamodb.moderation_stats_table_name
   }
 }
 
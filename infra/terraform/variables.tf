@@ -30,4 +30,16 @@ variable "tags" {
     Environment = "dev"
     ManagedBy   = "terraform"
   }
-} 
\ No newline at end of file
+} 
+
+variable "lambda_warmup_schedule_expression" {
+  description = "Lambda関数のウォームアップ用スケジュール式（例: rate(5 minutes)。空の場合は無効）"
+  type        = string
+  default     = ""
+}
+
+variable "moderation_chunk_enabled" {
+  description = "長文を文の区切りで分割して塊ごとに判定するか（有効にするとLLMの呼び出し回数が増える）"
+  type        = bool
+  default     = false
+}